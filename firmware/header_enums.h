@@ -0,0 +1,790 @@
+/*
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2022-2023 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+*/
+
+// generated by tools/generate_headers.py from tools/header_spec.json - do not edit by hand
+
+#ifndef HEADER_ENUMS_H
+#define HEADER_ENUMS_H
+#include <cstdint>
+
+/*
+ the packet header are byte that identifies the instruction to be executed by the uC
+*/
+enum inPacketHeader : uint8_t {
+  /*
+   This packet is used to align the communication protocol between the PC and the uC
+   it is send by the PC and the uC will respond with the same sequence:
+   the sequence is 9 bytes of 255U followed by 1 byte of 0U
+   the 9 bytes are needed so that one of them is interpreted as the header
+  */
+  IN_ALIGN_COMMUNICATION_PROTOCOL = 255U,
+  /*
+   this packet is used to software reset the uC (clear the config), no harware reset is performed
+  */
+  IN_RESET = 254U,
+  /*
+   read all availiable output packets out of the output buffer, and clear the buffer afterwards
+   uses data:
+    - value is ignored
+  */
+  IN_READ = 0U,
+  /*
+   read only the last package, does not remove this package from the ring buffer
+   - value is ignored
+  */
+  IN_READ_LAST = 4U,
+  /*
+   return the current execution time to the output buffer
+   uses data
+    - value is ignored
+  */
+  IN_READ_TIME = 2U,
+  /*
+   read all availiable input packets out of the input buffer that have not been processed
+   uses data
+    - value is ignored
+  */
+  IN_READ_INSTRUCTIONS = 3U,
+  /*
+   this packet is used to request how many free spots there are in the instruction ring buffer
+  */
+  IN_FREE_INSTRUCTION_SPOTS = 5U,
+  /*
+   legacy mode: turn off automatic sending of the output buffer
+   uses config
+   - value 1 for read on request (legacy)
+   - value 0 for continous read (default)
+       @todo move to sub config
+  */
+  IN_CONF_READ_ON_REQUEST = 6U,
+  /*
+   set the execution time, if set to 0 recording and exec are halted
+   if set to 1 (or bigger) exec and recoding will be started from timestep 1 (or bigger)
+   uses data
+    - value is the time current to be set, maximum experiment time is 2^32 usec
+  */
+  IN_SET_TIME = 1U,
+  /*
+   sends an 32bit word on the SPI0 interface
+   uses data32
+   - value is the 32bit to be send
+  */
+  IN_SPI0 = 20U,
+  /*
+   sends an 32bit word on the SPI1 interface
+   uses data32
+   - value is the 32bit to be send
+  */
+  IN_SPI1 = 21U,
+  /*
+   sends an 32bit word on the SPI2 interface
+   uses data32
+   - value is the 32bit to be send
+  */
+  IN_SPI2 = 22U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP0 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP0 = 30U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP1 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP1 = 31U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP2 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP2 = 32U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP3 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP3 = 33U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP4 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP4 = 34U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP5 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP5 = 35U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP6 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP6 = 36U,
+  /*
+   sends an 0-32bit word on the ASYNC_TO_CHIP7 interface
+   uses data
+    - value is the word to be send, if the width is configured to >32 the MS bits are ignored
+  */
+  IN_ASYNC_TO_CHIP7 = 37U,
+  /*
+   in mapper key switches into sequence transmission mode,
+   the next packet is considered the key all subsequent packages
+   are considdered values until IN_MAPPER_END.
+  */
+  IN_MAPPER_KEY = 190U,
+  /*
+   In mapper end switches back to normal packet exec mode.
+  */
+  IN_MAPPER_END = 191U,
+  /*
+   send a modify output pin command
+   uses pin
+    - pin is the pin number
+    - value is 0 or 1 for low or high
+  */
+  IN_PIN = 10U,
+  /*
+   send a read input pin command
+   uses pin
+    - pin is the pin number
+    - value is ignored
+  */
+  IN_PIN_READ = 11U,
+  /*
+   sends an 8 or 16 bit word or recives a specified number of bytes on the I2C interface
+   uses data_i2c
+   - device_address is the 7bit (MS) address of the device and the LSB indicates Read(1)/Write(0) following the i2c standard
+   - register_address is the 8bit register address
+   - value_ms is the MS 8bit to be send
+   - value_ls is the LS 8bit to be send or the number of bytes to read
+  */
+  IN_I2C0 = 25U,
+  /*
+   sends an 8 or 16 bit word or recives a specified number of bytes on the I2C interface
+   uses data_i2c
+   - device_address is the 7bit (MS) address of the device and the LSB indicates Read(1)/Write(0) following the i2c standard
+   - register_address is the 8bit register address
+   - value_ms is the MS 8bit to be send
+   - value_ls is the LS 8bit to be send or the number of bytes to read
+  */
+  IN_I2C1 = 26U,
+  /*
+   sends an 8 or 16 bit word or recives a specified number of bytes on the I2C interface
+   uses data_i2c
+   - device_address is the 7bit (MS) address of the device and the LSB indicates Read(1)/Write(0) following the i2c standard
+   - register_address is the 8bit register address
+   - value_ms is the MS 8bit to be send
+   - value_ls is the LS 8bit to be send or the number of bytes to read
+  */
+  IN_I2C2 = 27U,
+  /*
+   sets the pin configuration
+   uses config
+    - config/sub header is the config state to be applied the pin
+    - value is the pin id
+  */
+  IN_CONF_PIN = 50U,
+  /*
+   sets the spi0 configuration
+   uses config
+    - config/sub header is the config state to be applied the spi
+    - value is used according to the config sub header
+  */
+  IN_CONF_SPI0 = 60U,
+  /*
+   sets the spi1 configuration
+    uses config
+     - config/sub header is the config state to be applied the spi
+     - value is used according to the config sub header
+  */
+  IN_CONF_SPI1 = 61U,
+  /*
+   sets the spi2 configuration
+   uses config
+    - config/sub header is the config state to be applied the spi
+    - value is used according to the config sub header
+  */
+  IN_CONF_SPI2 = 62U,
+  /*
+   sets the i2c0 configuration
+   uses config
+    - config/sub header is the config state to be applied the spi
+    - value is used according to the config sub header
+  */
+  IN_CONF_I2C0 = 65U,
+  /*
+   sets the i2c1 configuration
+    uses config
+     - config/sub header is the config state to be applied the spi
+     - value is used according to the config sub header
+  */
+  IN_CONF_I2C1 = 66U,
+  /*
+   sets the i2c2 configuration
+   uses config
+    - config/sub header is the config state to be applied the spi
+    - value is used according to the config sub header
+  */
+  IN_CONF_I2C2 = 67U,
+  /*
+   sets the ASYNC_TO_CHIP0 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP0 = 70U,
+  /*
+   sets the ASYNC_TO_CHIP1 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP1 = 71U,
+  /*
+   sets the ASYNC_TO_CHIP2 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP2 = 72U,
+  /*
+   sets the ASYNC_TO_CHIP3 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP3 = 73U,
+  /*
+   sets the ASYNC_TO_CHIP4 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP4 = 74U,
+  /*
+   sets the ASYNC_TO_CHIP5 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP5 = 75U,
+  /*
+   sets the ASYNC_TO_CHIP6 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP6 = 76U,
+  /*
+   sets the ASYNC_TO_CHIP7 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_TO_CHIP7 = 77U,
+  /*
+   sets the ASYNC_FROM_CHIP0 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP0 = 80U,
+  /*
+   sets the ASYNC_FROM_CHIP1 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP1 = 81U,
+  /*
+   sets the ASYNC_FROM_CHIP2 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP2 = 82U,
+  /*
+   sets the ASYNC_FROM_CHIP3 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP3 = 83U,
+  /*
+   sets the ASYNC_FROM_CHIP4 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP4 = 84U,
+  /*
+   sets the ASYNC_FROM_CHIP5 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP5 = 85U,
+  /*
+   sets the ASYNC_FROM_CHIP6 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP6 = 86U,
+  /*
+   sets the ASYNC_FROM_CHIP7 configuration
+   uses config
+    - config/sub header is the config state to be applied the aer interface
+    - value is used according to the config sub header
+  */
+  IN_CONF_ASYNC_FROM_CHIP7 = 87U,
+  /*
+   chip config to free up main headers
+  */
+  IN_CONF_UC = 99U,
+};
+
+/*
+ the packet header is byte that identifies the information to be read by the host
+*/
+enum outPacketHeader : uint8_t {
+  /*
+   this packet is used to report how many free spots there are in the instruction ring buffer
+  */
+  OUT_FREE_INSTRUCTION_SPOTS = 101U,
+  /*
+   responce to the READ_TIME packet
+   uses data
+    - exec_time the current run time
+    - value the system_time (without run time offset)
+  */
+  OUT_TIME = 100U,
+  /*
+   responce to the IN_SPI0_32 packet
+   uses data32
+    - exec_time the current run time
+    - value the 32bit word that was read on the SPI
+  */
+  OUT_SPI0 = 120U,
+  /*
+   responce to the IN_SPI1_32 packet
+   uses data32
+    - exec_time the current run time
+    - value the 32bit word that was read on the SPI
+  */
+  OUT_SPI1 = 121U,
+  /*
+   responce to the IN_SPI2_32 packet
+   uses data32
+    - exec_time the current run time
+    - value the 32bit word that was read on the SPI
+  */
+  OUT_SPI2 = 122U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP0
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP0 = 130U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP1
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP1 = 131U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP2
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP2 = 132U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP3
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP3 = 133U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP4
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP4 = 134U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP5
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP5 = 135U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP6
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP6 = 136U,
+  /*
+   a event was reseved on ASYNC_FROM_CHIP7
+   uses data
+    - exec_time the current run time
+    - value the 0-32bit word that was read on the AER
+  */
+  OUT_ASYNC_FROM_CHIP7 = 137U,
+  /*
+   After a input pin change this records the change
+   uses pin
+    - exec_time the time the change occured
+    - pin the pin id
+    - value the new state
+  */
+  OUT_PIN_LOW = 110U,
+  /*
+   After a input pin change this records the change
+   uses pin
+    - exec_time the time the change occured
+    - pin the pin id
+    - value the new state
+  */
+  OUT_PIN_HIGH = 111U,
+  /*
+   responce to the IN_SPI0 packet
+   uses data_i2c
+    - exec_time the current run time
+    - value the 8bit word that was read on the SPI
+  */
+  OUT_I2C0 = 125U,
+  /*
+   responce to the IN_SPI1 packet
+   uses data_i2c
+    - exec_time the current run time
+    - value the 8bit word that was read on the SPI
+  */
+  OUT_I2C1 = 126U,
+  /*
+   responce to the IN_SPI2 packet
+   uses data_i2c
+    - exec_time the current run time
+    - value the 8bit word that was read on the SPI
+  */
+  OUT_I2C2 = 127U,
+  /*
+   unspecified error.
+  */
+  OUT_ERROR = 200U,
+  /*
+   This means your interface / pin that you are activating
+   is trying to use a pin that is already in use by an other interface
+   or you already configured the pin before.
+
+   if you want to reconfigure the uC, call reset on the uC_api and create
+   a new uC_api object after to reestablish a new connection after the uC reset.
+  */
+  OUT_ERROR_PIN_ALREADY_INUSE = 201U,
+  /*
+   this means you are trying to use a pin via the pin interface that is not configured yet,
+   please call pin[X].activate(<options>) before useing the pin or send the required config packets.
+  */
+  OUT_ERROR_PIN_NOT_CONFIGURED = 202U,
+  /*
+   this means that the timed instruction buffer is full,
+   and you cant send more instructions, the instruction send will be discarded
+  */
+  OUT_ERROR_INPUT_FULL = 203U,
+  /*
+   the output buffer is full, and pakets are being dropped
+   the number of packets dropped you can read as value
+  */
+  OUT_ERROR_OUTPUT_FULL = 204U,
+  /*
+   This means your interface you are activating is already configured and active.
+
+   if you want to reconfigure the uC, call reset on the uC_api and create
+   a new uC_api object after to reestablish a new connection after the uC reset.
+  */
+  OUT_ERROR_INTERFACE_ALREADY_ACTIVE = 205U,
+  /*
+   the header (packet) you send is not
+   known or does not make sense to the uC in that combination
+
+   maybe your API and firmware verions are out of sync
+  */
+  OUT_ERROR_UNKNOWN_INSTRUCTION = 206U,
+  /*
+   You are trying to use an interface that is not configured yet,
+   please call <interface>[X].activate(<options>) before useing the
+   interface or send the required configuration packets
+  */
+  OUT_ERROR_INTERFACE_NOT_ACTIVE = 207U,
+  /*
+   the config header you send is not
+   known or does not make sense to the uC in that combination
+
+   maybe your API and firmware verions are out of sync
+  */
+  OUT_ERROR_UNKNOWN_CONFIGURATION = 208U,
+  /*
+   the async sending interface did not get an acknowlage for a while,
+   it reset the request so you should take care off restarting/resetting the DuT
+  */
+  OUT_ERROR_ASYNC_HS_TIMEOUT = 209U,
+  /*
+   this error is thrown when a peripheral interface is not ready
+   For example: the I2C for the MCP23017 is not ready
+   uses
+  */
+  OUT_ERROR_PERIPHERAL_INTERFACE_NOT_READY = 210U,
+  /*
+   the configuration id you send is out of bounds of the available uC resources
+   uses error_package
+   - id is the wrong id
+  */
+  OUT_ERROR_CONFIGURATION_OUT_OF_BOUNDS = 211U,
+  /*
+   the data you send is larger the the configured bit/byte width of the interface
+   uses error_package
+     - the wrong data
+  */
+  OUT_ERROR_DATA_OUT_OF_BOUNDS = 212U,
+  /*
+   the data collection is taking up to much time (to many requests)
+   the uC does not have time to ship the data to the PC.
+   from now on whenever this happens the uC will pause data collection
+   for a moment and transmit ~ 10 pakages to the PC before it resumes
+   data collection. this warning only send once.
+  */
+  OUT_WARNING_DATA_COLLECTION_SQUEUED = 213U,
+  /*
+   responce to alignment request, as the first communication is an alignment
+   confirms the connection with the uC.
+   also sends the firmware version - to see if the correct version is running
+   uses error_package
+    - org_header - major version - 8bit
+    - sub_header - minor version - 8bit
+    - value - patch version - 32bit
+  */
+  OUT_ALIGN_SUCCESS_VERSION = 253U,
+};
+
+/*
+ the config sub header identifies the configuration of an interface, used by the IN_CONF_* instructions
+*/
+enum confPacketHeader : uint8_t {
+  /*
+   set an interface to active, after activation the pins/width cant be changed anymore
+   works for spi and aer, activation will fail if pins are already used for other interfaces
+   @TODO deactivation not implemented yet sould be new header for compatebility
+   uses config
+    - value is ignored
+  */
+  CONF_ACTIVE = 60U,
+  /*
+   set a pin to output to be able to write on it
+   uses config
+    - value is ID of pin
+  */
+  CONF_OUTPUT = 61U,
+  /*
+   set a pin to input, it registers an interupt service
+   to record all incomming changes
+   uses config
+    - value is ID of pin
+  */
+  CONF_INPUT = 62U,
+  /*
+   sets the Req pin for the given AER interface
+   uses config
+       - value is ID of pin
+  */
+  CONF_REQ = 70U,
+  /*
+   sets the Ack pin for the given AER interface
+   uses config
+       - value is ID of pin
+  */
+  CONF_ACK = 71U,
+  /*
+   sets the bit width of the given AER interface
+   uses config
+    - value is width 0-32
+  */
+  CONF_WIDTH = 72U,
+  /*
+   set the delay on the request line
+   uses config
+    - value the delay in multiple of 20ns
+  */
+  CONF_REQ_DELAY = 73U,
+  /*
+   interface_order
+    - value LSFIRST = 0 and MSFIRST = 1 - default is 0
+  */
+  CONF_BYTE_ORDER = 74U,
+  /*
+   interface speed class se interface doc
+  */
+  CONF_SPEED_CLASS = 75U,
+  /*
+   interface_type
+   - value type id (see interface doc) - default is 0
+  */
+  CONF_TYPE = 76U,
+  /*
+   indication of no sub category
+  */
+  CONF_NONE = 253U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL0 = 0U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL1 = 1U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL2 = 2U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL3 = 3U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL4 = 4U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL5 = 5U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL6 = 6U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL7 = 7U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL8 = 8U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL9 = 9U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL10 = 10U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL11 = 11U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL12 = 12U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL13 = 13U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL14 = 14U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL15 = 15U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL16 = 16U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL17 = 17U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL18 = 18U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL19 = 19U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL20 = 20U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL21 = 21U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL22 = 22U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL23 = 23U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL24 = 24U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL25 = 25U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL26 = 26U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL27 = 27U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL28 = 28U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL29 = 29U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL30 = 30U,
+  /*
+   setting the pin for Async data channel
+  */
+  CONF_CHANNEL31 = 31U,
+};
+
+#endif
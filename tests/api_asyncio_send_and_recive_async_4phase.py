@@ -0,0 +1,36 @@
+import sys, asyncio, logging
+
+sys.path.append('../')
+sys.path.append('./')
+
+from uC_api import *
+
+logging.basicConfig(level=logging.INFO)
+
+async def main():
+    async with AsyncUC('/dev/ttyACM0') as uc:
+        # configure the interfaces and wait for the acknowledgements of the uC
+        for header, req_pin, ack_pin, data_pins in ((ConfigMainHeader.IN_CONF_ASYNC_TO_CHIP0, 8, 10, [0,1]), (ConfigMainHeader.IN_CONF_ASYNC_FROM_CHIP0, 9, 11, [4,5])):
+            await uc.configure(ConfigPacket(header = header, config_header = ConfigSubHeader.CONF_TYPE, value = 0), timeout = 1)
+            await uc.configure(ConfigPacket(header = header, config_header = ConfigSubHeader.CONF_ACK, value = ack_pin), timeout = 1)
+            await uc.configure(ConfigPacket(header = header, config_header = ConfigSubHeader.CONF_REQ, value = req_pin), timeout = 1)
+            await uc.configure(ConfigPacket(header = header, config_header = ConfigSubHeader.CONF_WIDTH, value = len(data_pins)), timeout = 1)
+            for pin in range(len(data_pins)):
+                await uc.configure(ConfigPacket(header = header, config_header = ConfigSubHeader(pin), value = data_pins[pin]), timeout = 1)
+            await uc.configure(ConfigPacket(header = header, config_header = ConfigSubHeader.CONF_REQ_DELAY, value = 0), timeout = 1)
+            await uc.configure(ConfigPacket(header = header, config_header = ConfigSubHeader.CONF_ACTIVE, value = 0), timeout = 1)
+
+        await uc.start_experiment()
+        await uc.send_many([Data32bitPacket(header = Data32bitHeader.IN_ASYNC_TO_CHIP0, value = 2, time = 10),
+                            Data32bitPacket(header = Data32bitHeader.IN_ASYNC_TO_CHIP0, value = 3, time = 20)])
+
+        # print the words received from the chip, stop after 1 second without a word
+        try:
+            while True:
+                word, time = await asyncio.wait_for(uc.async_from_chip[0].get(), 1)
+                print("received", word, "at", time, "us")
+        except asyncio.TimeoutError:
+            pass
+        print(uc)
+
+asyncio.run(main())
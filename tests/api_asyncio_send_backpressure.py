@@ -0,0 +1,97 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# test of the backpressure of AsyncUC.send() on the timed packets, no uC needed (linux/mac only)
+# a minimal uC stand-in runs in a child process on a pty, it reports a few free spots per request, so the timed packets drain slowly
+# send() waits while more than max_waiting_timed timed packets wait for free spots, it has to resume as soon as they are back
+# at the limit, while the scheduler still holds packets for the uC, not only once all of them were send
+# exits with an error if a waiting send() only resumed after the scheduler was empty
+
+import asyncio, os, pty, struct, sys, time, tty
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_PACKETS = 5000
+MAX_WAITING_TIMED = 1000
+FREE_SPOTS_PER_REQUEST = 100
+
+def fake_uC(master):
+    # aligns, reports the firmware version and answers the free spot requests with a few free spots after a short delay
+    received = bytearray()
+    while True:
+        try:
+            received += os.read(master, 65536)
+        except OSError:
+            os._exit(0)
+        reply = bytearray()
+        while len(received) > 0:
+            if received[0] == 0xff:
+                alignment = len(received) - len(received.lstrip(b'\xff'))
+                if alignment == len(received):
+                    break
+                del received[:alignment]
+                reply += b'\xff'*9
+                continue
+            if len(received) < 9:
+                break
+            if received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                reply += struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                     FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0)
+            elif received[0] == Data32bitHeader.IN_FREE_INSTRUCTION_SPOTS:
+                time.sleep(0.001)
+                reply += struct.pack("<BII", Data32bitHeader.OUT_FREE_INSTRUCTION_SPOTS, 0, FREE_SPOTS_PER_REQUEST)
+            del received[:9]
+        os.write(master, reply)
+
+async def main(serial_port_path):
+    async with AsyncUC(serial_port_path, max_waiting_timed = MAX_WAITING_TIMED, credit_prediction = False) as uc:
+        blocked = 0
+        resumed_empty = 0
+        for packet_id in range(NUMBER_OF_PACKETS):
+            waiting_before = packet_id - uc.timed_write_batches.total()
+            await uc.send(Data32bitPacket(Data32bitHeader.IN_ASYNC_TO_CHIP0, value = packet_id, time = 1000 + packet_id))
+            if waiting_before >= MAX_WAITING_TIMED:
+                # this send() had to wait, the timed packets waiting now show when it resumed
+                blocked += 1
+                if packet_id + 1 - uc.timed_write_batches.total() == 0:
+                    resumed_empty += 1
+        # wait until the uC took all timed packets
+        while uc.timed_write_batches.total() < NUMBER_OF_PACKETS:
+            await asyncio.sleep(0.01)
+        print('> {} of {} sends waited, {} of them resumed only after all timed packets were send'.format(blocked, NUMBER_OF_PACKETS, resumed_empty))
+        return blocked > 0 and resumed_empty == 0
+
+master, slave = pty.openpty()
+tty.setraw(master)
+tty.setraw(slave)
+child = os.fork()
+if child == 0:
+    os.close(slave)
+    fake_uC(master)
+os.close(master)
+
+passed = asyncio.run(main(os.ttyname(slave)))
+
+os.kill(child, 9)
+os.waitpid(child, 0)
+os.close(slave)
+if not passed:
+    sys.exit(1)
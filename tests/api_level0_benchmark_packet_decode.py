@@ -0,0 +1,74 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of the packet decoding, no uC needed
+# reports the memory per decoded packet and the decoded packets per second
+
+import sys, time, tracemalloc
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_PACKETS = 200000
+
+# recorded AER events and pin changes as they arrive from the uC
+raw_packets = []
+for i in range(NUMBER_OF_PACKETS):
+    if i % 10 == 0:
+        raw_packets.append(PinPacket(header = PinHeader.OUT_PIN_HIGH, pin_id = 13, value = 1, time = i+1).to_bytearray())
+    else:
+        raw_packets.append(Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = i, time = i+1).to_bytearray())
+
+def bytes_per_packet(decode):
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    packets = [decode(raw_packet) for raw_packet in raw_packets[:20000]]
+    used = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(start, 'filename'))
+    tracemalloc.stop()
+    # do not count the list holding the packets
+    return (used - sys.getsizeof(packets)) / len(packets)
+
+def packets_per_second(decode):
+    start = time.perf_counter()
+    for raw_packet in raw_packets:
+        decode(raw_packet)
+    return NUMBER_OF_PACKETS / (time.perf_counter() - start)
+
+def checked_decode(raw_packet):
+    # the decode path with all range checks of the normal constructor
+    unpacked = packet.DATA32BIT_STRUCT.unpack(raw_packet)
+    if unpacked[0] in packet.Data32bitPacket._HEADERS:
+        return Data32bitPacket(header = Data32bitHeader(unpacked[0]), value = unpacked[2], time = unpacked[1])
+    unpacked = packet.PIN_STRUCT.unpack(raw_packet)
+    return PinPacket(header = PinHeader(unpacked[0]), pin_id = unpacked[2], value = unpacked[3], time = unpacked[1])
+
+print('> checked constructor:           {:8.1f} bytes/packet {:10.0f} packets/s'.format(bytes_per_packet(checked_decode), packets_per_second(checked_decode)))
+print('> Packet.from_bytearray:         {:8.1f} bytes/packet {:10.0f} packets/s'.format(bytes_per_packet(Packet.from_bytearray), packets_per_second(Packet.from_bytearray)))
+print('> PacketView (lazy):             {:8.1f} bytes/packet {:10.0f} packets/s'.format(bytes_per_packet(PacketView), packets_per_second(PacketView)))
+
+try:
+    from uC_api import batch
+    raw_buffer = b"".join(raw_packets)
+    start = time.perf_counter()
+    events, event_times = batch.decode_many(raw_buffer).async_from_chip(0)
+    print('> batch.decode_many (numpy):     {:8.1f} bytes/packet {:10.0f} packets/s'.format(
+        (events.nbytes + event_times.nbytes) / len(events), NUMBER_OF_PACKETS / (time.perf_counter() - start)))
+except ImportError:
+    print('> numpy not installed, skipping batch decode')
@@ -0,0 +1,94 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of the serial receive path against a pty loopback, no uC needed (linux/mac only)
+# compares reading 9 bytes per read (as before) with one bulk read into the FrameDecoder
+# reports the received packets per second
+
+import os, pty, sys, threading, time, tty
+import serial
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+from uC_api.framing import FrameDecoder
+
+NUMBER_OF_PACKETS = 200000
+
+# recorded AER events as they arrive from the uC, with some alignment padding in between
+raw_stream = bytearray()
+for i in range(NUMBER_OF_PACKETS):
+    if i % 50000 == 0:
+        raw_stream += b'\xff'*9
+    raw_stream += Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = i, time = i+1).to_bytearray()
+
+def send_stream(master):
+    # plays the uC, sends the whole stream as fast as the pty accepts it
+    stream = memoryview(raw_stream)
+    while len(stream) > 0:
+        stream = stream[os.write(master, stream[:4096]):]
+
+def per_packet_read(connection, decode):
+    # the reader as it was: up to 20 reads of 9 bytes per loop, each stripped of alignment bytes
+    received = 0
+    while received < NUMBER_OF_PACKETS:
+        for i in range(20):
+            if connection.in_waiting >= 9:
+                byte_packet = connection.read(size = 9).lstrip(b'\xff')
+                if len(byte_packet) < 9:
+                    continue
+                decode(byte_packet)
+                received += 1
+            else:
+                break
+
+def bulk_read(connection, decode):
+    # the reader with one read of all availible bytes, cut into frames by the FrameDecoder
+    frame_decoder = FrameDecoder()
+    received = 0
+    while received < NUMBER_OF_PACKETS:
+        if connection.in_waiting > 0:
+            frames = frame_decoder.read_from(connection)
+            for frame_offset in range(0, len(frames), 9):
+                decode(frames[frame_offset:frame_offset+9])
+            received += len(frames) // 9
+
+def packets_per_second(reader, decode):
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    connection = serial.Serial(os.ttyname(slave), 115200, timeout = None)
+    sender = threading.Thread(target = send_stream, args = (master,))
+    start = time.perf_counter()
+    sender.start()
+    reader(connection, decode)
+    duration = time.perf_counter() - start
+    sender.join()
+    connection.close()
+    os.close(master)
+    os.close(slave)
+    return NUMBER_OF_PACKETS / duration
+
+def no_decode(byte_packet):
+    pass
+
+for name, decode in (("frames only", no_decode), ("PacketView", PacketView), ("Packet.from_bytearray", Packet.from_bytearray)):
+    old = packets_per_second(per_packet_read, decode)
+    new = packets_per_second(bulk_read, decode)
+    print('> {:22s} read(9): {:10.0f} packets/s   FrameDecoder: {:10.0f} packets/s   speedup: {:5.1f}x'.format(name, old, new, new / old))
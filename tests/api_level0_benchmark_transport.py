@@ -0,0 +1,112 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of the receive path over every transport, no uC needed (linux/mac only)
+# a thread plays the uC and sends a stream of packets into the other side of the transport,
+# the reader waits on the file descriptor and reads all availible bytes into the FrameDecoder as the API does
+# reports the received packets per second per transport
+
+import os, pty, select, socket, sys, threading, time, tty
+import serial
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+from uC_api.framing import FrameDecoder
+from uC_api.transport import RawTransport, PtyTransport, SocketTransport, open_transport
+
+NUMBER_OF_PACKETS = 200000
+
+stream = b"".join(Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = i, time = i+1).to_bytearray() for i in range(NUMBER_OF_PACKETS))
+
+def send_stream(write):
+    # plays the uC, sends the whole stream as fast as the other side accepts it
+    byte_buffer = memoryview(stream)
+    while len(byte_buffer) > 0:
+        byte_buffer = byte_buffer[write(byte_buffer[:4096]):]
+
+def packets_per_second(transport, write):
+    try:
+        file_descriptor = transport.fileno()
+    except (AttributeError, OSError):
+        file_descriptor = None
+    frame_decoder = FrameDecoder()
+    sender = threading.Thread(target = send_stream, args = (write,))
+    received = 0
+    start = time.perf_counter()
+    sender.start()
+    while received < NUMBER_OF_PACKETS:
+        if transport.in_waiting > 0:
+            received += len(frame_decoder.read_from(transport)) // 9
+        elif file_descriptor is not None:
+            select.select([file_descriptor], [], [], 0.1)
+    duration = time.perf_counter() - start
+    sender.join()
+    return NUMBER_OF_PACKETS / duration
+
+def pty_pair():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    return master, os.ttyname(slave), slave
+
+results = []
+
+# pyserial and the raw file descriptor on the slave side of a pty, the uC writes to the master side
+for name, open_connection in (("pyserial", lambda path: serial.Serial(path, 115200, timeout = None, write_timeout = 0)),
+                              ("raw://", RawTransport)):
+    master, path, slave = pty_pair()
+    transport = open_connection(path)
+    results.append((name, packets_per_second(transport, lambda byte_buffer: os.write(master, byte_buffer))))
+    transport.close()
+    os.close(master)
+    os.close(slave)
+
+# a new pty, the uC stand-in opens the peer
+transport = PtyTransport()
+peer = os.open(transport.peer_name(), os.O_RDWR | os.O_NOCTTY)
+results.append(("pty://", packets_per_second(transport, lambda byte_buffer: os.write(peer, byte_buffer))))
+transport.close()
+os.close(peer)
+
+# TCP over the loopback interface
+server = socket.socket()
+server.bind(("127.0.0.1", 0))
+server.listen(1)
+transport = open_transport("tcp://127.0.0.1:"+str(server.getsockname()[1]))
+peer = server.accept()[0]
+results.append(("tcp://", packets_per_second(transport, peer.send)))
+transport.close()
+peer.close()
+server.close()
+
+# unix domain socket
+transport_socket, peer = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+transport = SocketTransport(transport_socket)
+results.append(("unix://", packets_per_second(transport, peer.send)))
+transport.close()
+peer.close()
+
+# pyserial URL handler, the loop back writes into its own receive buffer
+transport = open_transport("loop://")
+results.append(("loop:// (serial_for_url)", packets_per_second(transport, transport.write)))
+transport.close()
+
+for name, rate in results:
+    print('> {:26s} {:10.0f} packets/s'.format(name, rate))
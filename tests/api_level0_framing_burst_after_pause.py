@@ -0,0 +1,59 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# test of the FrameDecoder with a short burst of packets after a long pause, no uC needed
+# the time jumps forward by more than TIME_WINDOW_US, which the decoder checks like a slip,
+# the few packets of the burst have to be delivered at once, not held back until more bytes arrive,
+# also if the pause arrives in the same read as the packets before it
+# the same bytes shifted by a few bytes (a real slip) are held back
+# exits with an error if a burst is held back or the shifted bytes are delivered
+
+import sys
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+from uC_api.framing import FrameDecoder, TIME_WINDOW_US
+
+def stream(times):
+    return b"".join(Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = i, time = time).to_bytearray() for i, time in enumerate(times))
+
+failed = False
+for burst_size in (1, 2, 3):
+    frame_decoder = FrameDecoder()
+    frame_decoder.feed(stream(range(100, 1100, 100)))
+    burst = stream([1000 + 2*TIME_WINDOW_US + 10*i for i in range(burst_size)])
+    delivered = len(frame_decoder.feed(burst)) // 9
+    # the shifted burst after the same pause
+    shifted_decoder = FrameDecoder()
+    shifted_decoder.feed(stream(range(100, 1100, 100)))
+    shifted = len(shifted_decoder.feed(burst[4:] + burst[:4])) // 9
+    print('> burst of {} packets after a pause: {} delivered, shifted by 4 bytes: {} delivered'.format(burst_size, delivered, shifted))
+    failed = failed or delivered != burst_size or shifted != 0
+
+for before, burst_size in ((2, 1), (99, 2)):
+    # the packets before and after the pause in one read
+    frame_decoder = FrameDecoder()
+    delivered = len(frame_decoder.feed(stream([100*(i+1) for i in range(before)] + [2*TIME_WINDOW_US + 10*i for i in range(burst_size)]))) // 9
+    delivered += len(frame_decoder.decode()) // 9
+    print('> {} packets, a pause and {} packets in one read: {} delivered, pending bytes: {}'.format(before, burst_size, delivered, frame_decoder.pending()))
+    failed = failed or delivered != before + burst_size or frame_decoder.pending() != 0
+
+if failed:
+    sys.exit(1)
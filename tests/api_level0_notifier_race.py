@@ -0,0 +1,96 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# test of the notifier waking up the communication thread, no uC needed
+# first notify() is called exactly in the middle of clear(), while it consumes the wake ups
+# then one thread notifies in a loop, as the main thread does after every send, while the waiting thread consumes the wake ups
+# afterwards the waiting thread has to be woken up by a single notify(), a lost wake up would leave it waiting for the timeout
+# reports the lost wake ups, exits with an error if there are any
+
+import sys, threading, time
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api.notifier import Notifier
+
+NUMBER_OF_ROUNDS = 50
+ROUND_DURATION = 0.05
+WAKE_UP_TIMEOUT = 0.5
+
+# switch threads as often as possible, so they interleave inside notify() and clear()
+sys.setswitchinterval(1e-6)
+
+def notify_loop(notifier, stop):
+    while not stop.is_set():
+        notifier.notify()
+
+def wait_loop(notifier, stop):
+    while not stop.is_set():
+        notifier.wait(0)
+
+def woken_up(notifier):
+    # consume what is left, then one notify() has to wake up the waiting thread
+    notifier.wait(0)
+    notifier.notify()
+    return notifier.wait(WAKE_UP_TIMEOUT)
+
+class NotifyDuringClear:
+    """ the receiving socket of the notifier, the main thread notifies while clear() reads from it the first time
+    """
+    def __init__(self, notifier):
+        self.notifier = notifier
+        self.receiver = notifier._receiver
+        self.notified = False
+
+    def recv(self, size):
+        if not self.notified:
+            self.notified = True
+            self.notifier.notify()
+        return self.receiver.recv(size)
+
+    def fileno(self):
+        return self.receiver.fileno()
+
+notifier = Notifier()
+notifier.notify()
+receiver = notifier._receiver
+notifier._receiver = NotifyDuringClear(notifier)
+notifier.clear()
+notifier._receiver = receiver
+lost_wake_ups = 0 if woken_up(notifier) else 1
+print('> notify during clear: lost wake ups: {}'.format(lost_wake_ups))
+notifier.close()
+
+for round_id in range(NUMBER_OF_ROUNDS):
+    notifier = Notifier()
+    stop = threading.Event()
+    threads = [threading.Thread(target = notify_loop, args = (notifier, stop)), threading.Thread(target = wait_loop, args = (notifier, stop))]
+    for thread in threads:
+        thread.start()
+    time.sleep(ROUND_DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if not woken_up(notifier):
+        lost_wake_ups += 1
+    notifier.close()
+
+print('> lost wake ups: {} of {} rounds and the notify during clear'.format(lost_wake_ups, NUMBER_OF_ROUNDS))
+if lost_wake_ups > 0:
+    sys.exit(1)
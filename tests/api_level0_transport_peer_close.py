@@ -0,0 +1,70 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# test of a connection closed by the other side, no uC needed (linux/mac only)
+# a minimal uC stand-in behind a unix socket aligns, reports the firmware version and then closes the socket,
+# like a bridge that lost its serial port, the API has to close its side of the connection on its own
+# exits with an error if the communication threads are still running afterwards, or close_connection() does not return
+
+import os, socket, struct, sys, tempfile, threading, time
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+CLOSE_TIMEOUT = 2.0
+
+def fake_uC(server):
+    # aligns and reports the firmware version, then closes the connection
+    connection, _ = server.accept()
+    received = bytearray()
+    while True:
+        received += connection.recv(65536)
+        received = received.lstrip(b'\xff')
+        if len(received) >= 9 and received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+            break
+    connection.sendall(b'\xff'*9 + struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                               FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0))
+    time.sleep(0.2)
+    connection.close()
+
+socket_path = os.path.join(tempfile.mkdtemp(), "uC.sock")
+server = socket.socket(socket.AF_UNIX)
+server.bind(socket_path)
+server.listen(1)
+uc_thread = threading.Thread(target=fake_uC, args=(server,))
+uc_thread.start()
+
+uc = uC_api("unix://"+socket_path)
+uc_thread.join()
+# the reader notices the closed socket and the writer closes the connection, without a call to close_connection()
+deadline = time.time() + CLOSE_TIMEOUT
+while threading.active_count() > 1 and time.time() < deadline:
+    time.sleep(0.01)
+threads_left = threading.active_count() - 1
+closer = threading.Thread(target=uc.close_connection)
+close_start = time.time()
+closer.start()
+closer.join(CLOSE_TIMEOUT)
+print('> {} communication threads left after the peer closed, close_connection() took {:.3f} s'.format(threads_left, time.time()-close_start))
+
+server.close()
+os.unlink(socket_path)
+if threads_left != 0 or closer.is_alive():
+    os._exit(1)
@@ -0,0 +1,90 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# microbenchmark of the buffers between the main thread and the communication threads, no uC needed
+# one thread puts 1M packets, another thread takes them out, as the reader thread and update_state do
+# compares queue.Queue (as before, put/get/task_done per packet) with the BatchQueue
+# reports the packets per second
+
+import sys, threading, time
+from queue import Queue
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+from uC_api.batch_queue import BatchQueue
+
+NUMBER_OF_PACKETS = 1000000
+# packets per read of the reader thread
+READ_SIZE = 256
+
+packet = Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = 1, time = 1)
+read = [packet]*READ_SIZE
+
+def queue_producer(buffer):
+    for i in range(NUMBER_OF_PACKETS//READ_SIZE):
+        for read_packet in read:
+            buffer.put(read_packet)
+
+def queue_consumer(buffer):
+    received = 0
+    while received < NUMBER_OF_PACKETS:
+        while not buffer.empty():
+            buffer.get()
+            buffer.task_done()
+            received += 1
+
+def batch_queue_producer(buffer):
+    for i in range(NUMBER_OF_PACKETS//READ_SIZE):
+        for read_packet in read:
+            buffer.put(read_packet)
+
+def batch_queue_consumer(buffer):
+    received = 0
+    while received < NUMBER_OF_PACKETS:
+        while not buffer.empty():
+            buffer.get()
+            received += 1
+
+def batch_queue_many_producer(buffer):
+    for i in range(NUMBER_OF_PACKETS//READ_SIZE):
+        buffer.put_many(read)
+
+def batch_queue_many_consumer(buffer):
+    received = 0
+    while received < NUMBER_OF_PACKETS:
+        for read_packet in buffer.get_many():
+            received += 1
+
+def packets_per_second(buffer, producer, consumer):
+    consumer_thread = threading.Thread(target = consumer, args = (buffer,))
+    start = time.perf_counter()
+    consumer_thread.start()
+    producer(buffer)
+    consumer_thread.join()
+    return NUMBER_OF_PACKETS / (time.perf_counter() - start)
+
+NUMBER_OF_PACKETS = (NUMBER_OF_PACKETS//READ_SIZE)*READ_SIZE
+print("packets: "+str(NUMBER_OF_PACKETS)+", put in reads of "+str(READ_SIZE))
+reference = packets_per_second(Queue(), queue_producer, queue_consumer)
+print("queue.Queue put/get/task_done:        {:10.0f} packets/s".format(reference))
+for name, producer, consumer in (("BatchQueue put/get:                  ", batch_queue_producer, batch_queue_consumer),
+                                 ("BatchQueue put_many/get_many:        ", batch_queue_many_producer, batch_queue_many_consumer)):
+    result = packets_per_second(BatchQueue(), producer, consumer)
+    print(name+"{:10.0f} packets/s, {:.1f}x".format(result, result/reference))
@@ -0,0 +1,107 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of the CPU time used by the API, no uC needed (linux/mac only)
+# a minimal uC stand-in runs in a child process on a pty and echoes every packet
+# reports the CPU time while idle, the CPU time per 1M echoed packets and the round trip latency
+
+import os, pty, select, struct, sys, time, tty
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_PACKETS = 200000
+NUMBER_OF_ROUND_TRIPS = 1000
+IDLE_TIME = 2.0
+
+def fake_uC(master):
+    # aligns, reports the firmware version and echoes every other packet
+    # like the uC it keeps reading while its replies are not yet send
+    os.set_blocking(master, False)
+    received = bytearray()
+    reply = bytearray()
+    while True:
+        readable, writable, _ = select.select([master], [master] if len(reply) > 0 else [], [])
+        if writable:
+            del reply[:os.write(master, reply)]
+        if not readable:
+            continue
+        try:
+            received += os.read(master, 65536)
+        except OSError:
+            os._exit(0)
+        while len(received) > 0:
+            if received[0] == 0xff:
+                # alignment request, answer with the alignment padding and the version
+                alignment = len(received) - len(received.lstrip(b'\xff'))
+                if alignment == len(received):
+                    break
+                del received[:alignment]
+                reply += b'\xff'*9
+                continue
+            if len(received) < 9:
+                break
+            if received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                reply += struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                     FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0)
+            elif received[0] != Data32bitHeader.IN_RESET:
+                reply += received[:9]
+            del received[:9]
+
+master, slave = pty.openpty()
+tty.setraw(master)
+tty.setraw(slave)
+child = os.fork()
+if child == 0:
+    os.close(slave)
+    fake_uC(master)
+os.close(master)
+
+uC = uC_api(os.ttyname(slave), api_level = 1)
+time.sleep(0.5)
+
+start = time.process_time()
+time.sleep(IDLE_TIME)
+print('> idle:       {:8.1f} % of one core'.format(100 * (time.process_time() - start) / IDLE_TIME))
+
+events = b"".join(Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = i).to_bytearray() for i in range(1000))
+start = time.process_time()
+start_wall = time.perf_counter()
+for i in range(NUMBER_OF_PACKETS // 1000):
+    uC.send_encoded(events, timed = False)
+for i in range(NUMBER_OF_PACKETS):
+    uC.read_packet()
+cpu_time = time.process_time() - start
+print('> throughput: {:8.2f} s CPU time per 1M packets ({:.0f} packets/s)'.format(
+    cpu_time * 1000000 / NUMBER_OF_PACKETS, NUMBER_OF_PACKETS / (time.perf_counter() - start_wall)))
+
+round_trips = []
+for i in range(NUMBER_OF_ROUND_TRIPS):
+    start = time.perf_counter()
+    uC.send_packet(Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = i))
+    uC.read_packet()
+    round_trips.append(time.perf_counter() - start)
+round_trips.sort()
+print('> latency:    {:8.1f} us median round trip, {:.1f} us 99th percentile'.format(
+    1e6 * round_trips[len(round_trips)//2], 1e6 * round_trips[int(len(round_trips)*0.99)]))
+
+uC.close_connection()
+os.kill(child, 9)
+os.waitpid(child, 0)
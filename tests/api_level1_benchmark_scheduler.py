@@ -0,0 +1,56 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# microbenchmark of the time ordered release of the timed packets, no uC needed
+# k producers create 200k timed packets sorted in time each, they are queued interleaved in blocks,
+# the scheduler releases them in batches of 1024 as the writer thread does
+# reports the packets per second and checks that they are released in time order
+
+import sys, struct, time
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+from uC_api.scheduler import TimedScheduler
+
+NUMBER_OF_PACKETS = 200000
+# packets each producer queues at once
+BLOCK_SIZE = 16
+WRITE_BATCH = 1024
+
+for producers in (1, 2, 8, 64):
+    # producer k drives async interface k%8, its packets are 10us apart and shifted by k us against the others
+    streams = [[Data32bitPacket(header = Data32bitHeader.IN_ASYNC_TO_CHIP0 + producer%8, value = packet_id, time = 1 + packet_id*100 + producer)
+                for packet_id in range(NUMBER_OF_PACKETS//producers)] for producer in range(producers)]
+    queued = []
+    for block in range(0, NUMBER_OF_PACKETS//producers, BLOCK_SIZE):
+        # the last producer queues first, so the blocks are not in time order
+        for producer in reversed(range(producers)):
+            queued.extend(streams[producer][block:block+BLOCK_SIZE])
+    scheduler = TimedScheduler()
+    released = []
+    start = time.perf_counter()
+    for packet in queued:
+        scheduler.push(packet)
+    while scheduler:
+        released.extend(scheduler.pop(WRITE_BATCH)[0])
+    duration = time.perf_counter() - start
+    times = [struct.unpack_from("<I", encoded_packet, 1)[0] for encoded_packet in released]
+    print("producers: {:3d}   {:10.0f} packets/s   runs: {:3d}   in time order: {}".format(
+        producers, len(queued)/duration, scheduler.max_runs(), times == sorted(times)))
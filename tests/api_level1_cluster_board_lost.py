@@ -0,0 +1,87 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# test of a uC_cluster losing one board, no uC needed (linux/mac only)
+# two minimal uC stand-ins behind unix sockets align and report the firmware version,
+# then the first closes its socket, like an unplugged board, and the second keeps sending packets
+# the I/O thread shared by the boards has to close only the lost board and keep serving the other one
+# exits with an error if the second board stops receiving, or close_connection() does not return
+
+import os, socket, struct, sys, tempfile, threading, time
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_PACKETS = 10
+CLOSE_TIMEOUT = 2.0
+
+def fake_uC(server, lost):
+    # aligns and reports the firmware version, then closes the connection or sends a packet every 50 ms
+    connection, _ = server.accept()
+    received = bytearray()
+    while True:
+        received += connection.recv(65536)
+        received = received.lstrip(b'\xff')
+        if len(received) >= 9 and received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+            break
+    connection.sendall(b'\xff'*9 + struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                               FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0))
+    time.sleep(0.2)
+    if lost:
+        connection.close()
+        return
+    for packet_id in range(NUMBER_OF_PACKETS):
+        time.sleep(0.05)
+        try:
+            connection.sendall(struct.pack("<BII", Data32bitHeader.OUT_ASYNC_FROM_CHIP2, packet_id, packet_id))
+        except OSError:
+            break
+
+socket_directory = tempfile.mkdtemp()
+servers = []
+uc_threads = []
+for board_id in range(2):
+    server = socket.socket(socket.AF_UNIX)
+    server.bind(os.path.join(socket_directory, "uC{}.sock".format(board_id)))
+    server.listen(1)
+    servers.append(server)
+    uc_threads.append(threading.Thread(target=fake_uC, args=(server, board_id == 0)))
+    uc_threads[-1].start()
+
+cluster = uC_cluster(["unix://"+server.getsockname() for server in servers], api_level=1)
+for uc_thread in uc_threads:
+    uc_thread.join()
+time.sleep(0.1)
+received = []
+while cluster[1].has_packet():
+    packet = cluster[1].read_packet()
+    if packet.header() == Data32bitHeader.OUT_ASYNC_FROM_CHIP2:
+        received.append(packet.value())
+closer = threading.Thread(target=cluster.close_connection)
+close_start = time.time()
+closer.start()
+closer.join(CLOSE_TIMEOUT)
+print('> {} of {} packets received by the remaining board, close_connection() took {:.3f} s'.format(len(received), NUMBER_OF_PACKETS, time.time()-close_start))
+
+for server in servers:
+    os.unlink(server.getsockname())
+    server.close()
+if received != list(range(NUMBER_OF_PACKETS)) or closer.is_alive():
+    os._exit(1)
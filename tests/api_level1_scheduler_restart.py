@@ -0,0 +1,87 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# regression test of the timed scheduler over two experiments, no uC needed (linux/mac only)
+# a minimal uC stand-in runs in a child process on a pty, it confirms the experiment state and always reports free spots,
+# the first experiment sends timed packets up to 100ms, then stop_experiment() and start_experiment() restart the uC clock,
+# the timed packets of the second experiment start at 1ms again, they must not be counted as late by the scheduler
+# exits with an error if any packet is counted as late
+
+import os, pty, select, struct, sys, time, tty
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+def fake_uC(master):
+    # aligns, reports the firmware version, confirms IN_SET_TIME and answers the free spot requests
+    received = bytearray()
+    while True:
+        try:
+            received += os.read(master, 65536)
+        except OSError:
+            os._exit(0)
+        reply = bytearray()
+        while len(received) > 0:
+            if received[0] == 0xff:
+                alignment = len(received) - len(received.lstrip(b'\xff'))
+                if alignment == len(received):
+                    break
+                del received[:alignment]
+                reply += b'\xff'*9
+                continue
+            if len(received) < 9:
+                break
+            if received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                reply += struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                     FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0)
+            elif received[0] == Data32bitHeader.IN_FREE_INSTRUCTION_SPOTS:
+                reply += struct.pack("<BII", Data32bitHeader.OUT_FREE_INSTRUCTION_SPOTS, 0, 511)
+            elif received[0] == Data32bitHeader.IN_SET_TIME:
+                reply += received[:9]
+            del received[:9]
+        os.write(master, reply)
+
+master, slave = pty.openpty()
+tty.setraw(master)
+tty.setraw(slave)
+child = os.fork()
+if child == 0:
+    os.close(slave)
+    fake_uC(master)
+os.close(master)
+
+uC = uC_api(os.ttyname(slave), api_level = 1, credit_prediction = False)
+uC.wait_for_connection()
+for experiment in range(2):
+    uC.start_experiment()
+    uC.send_many([Data32bitPacket(Data32bitHeader.IN_ASYNC_TO_CHIP0, value = i, time = 1000*(i+1)) for i in range(100)])
+    # wait until the writer released all timed packets
+    while len(uC.timed_scheduler) > 0 or uC.timed_water_marks.waiting() > 0:
+        time.sleep(0.01)
+    uC.stop_experiment()
+    time.sleep(0.1)
+print('> late packets after stop_experiment() and start_experiment(): {}'.format(uC.timed_scheduler.late()))
+late = uC.timed_scheduler.late()
+
+uC.close_connection()
+os.kill(child, 9)
+os.waitpid(child, 0)
+if late > 0:
+    sys.exit(1)
@@ -0,0 +1,66 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# sends 200k timed pin toggles (20 s at 10 kHz) with bounded write buffers,
+# the send loop is held back at the high water mark, so only a few thousand packets wait on the PC at any time
+
+import sys, time, queue, logging
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+from uC_api.flow_control import SendPolicy
+
+logging.basicConfig(level=logging.INFO)
+
+NUMBER_OF_PACKETS = 200000
+HIGH_WATER_MARK = 4096
+
+for send_policy in (SendPolicy.BLOCK, SendPolicy.RAISE, SendPolicy.FUTURE):
+    uc = uC_api('/dev/ttyACM0', 1, high_water_mark=HIGH_WATER_MARK, send_policy=send_policy)
+    uc.send_packet(ConfigPacket(ConfigMainHeader.IN_CONF_PIN, ConfigSubHeader.CONF_OUTPUT, 13))  # LED on Teensy as output
+    uc.start_experiment()
+    time.sleep(0.1)
+
+    full = 0
+    start = time.perf_counter()
+    packet_id = 0
+    while packet_id < NUMBER_OF_PACKETS:
+        try:
+            drained = uc.send_packet(PinPacket(PinHeader.IN_PIN, 13, packet_id % 2, time=100000 + packet_id*100))
+        except queue.Full:
+            # SendPolicy.RAISE: the packet was not queued, try again later
+            full += 1
+            time.sleep(0.01)
+            continue
+        if drained is not None and not drained.done():
+            # SendPolicy.FUTURE: the packet was queued, wait before creating more
+            full += 1
+            drained.result()
+        packet_id += 1
+    duration = time.perf_counter() - start
+
+    print("> "+send_policy.name+": send loop took {:.1f}s, full {} times".format(duration, full))
+    print("> "+str(uc.timed_water_marks))
+    if uc.timed_water_marks.max_waiting() > HIGH_WATER_MARK:
+        print("> [error] more packets waiting than the high water mark")
+
+    uc.stop_experiment()
+    time.sleep(0.1)
+    uc.close_connection()
@@ -0,0 +1,142 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of the dispatch of the received packets to the level 2 interfaces in update_state, no uC needed (linux/mac only)
+# a minimal uC stand-in runs in a child process on a pty and echoes a mix of async, pin and spi packets,
+# compares the linear scan over the interfaces (as before) with the routing table of update_state
+# reports the dispatched packets per second
+
+import os, pty, select, struct, sys, time, tty
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_PACKETS = 200000
+
+def fake_uC(master):
+    # aligns, reports the firmware version and echoes every other packet
+    # like the uC it keeps reading while its replies are not yet send
+    os.set_blocking(master, False)
+    received = bytearray()
+    reply = bytearray()
+    while True:
+        readable, writable, _ = select.select([master], [master] if len(reply) > 0 else [], [])
+        if writable:
+            del reply[:os.write(master, reply)]
+        if not readable:
+            continue
+        try:
+            received += os.read(master, 65536)
+        except OSError:
+            os._exit(0)
+        while len(received) > 0:
+            if received[0] == 0xff:
+                # alignment request, answer with the alignment padding and the version
+                alignment = len(received) - len(received.lstrip(b'\xff'))
+                if alignment == len(received):
+                    break
+                del received[:alignment]
+                reply += b'\xff'*9
+                continue
+            if len(received) < 9:
+                break
+            if received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                reply += struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                     FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0)
+            elif received[0] != Data32bitHeader.IN_RESET:
+                reply += received[:9]
+            del received[:9]
+
+def start_fake_uC():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    child = os.fork()
+    if child == 0:
+        os.close(slave)
+        fake_uC(master)
+    os.close(master)
+    return child, slave
+
+def scan_dispatch(uC, packet_to_process):
+    # update_state as it was: a linear scan over the interfaces, then the pin headers
+    if isinstance(packet_to_process, ErrorPacket):
+        header_for_sorting = packet_to_process.original_header()
+    else:
+        header_for_sorting = packet_to_process.header()
+    if header_for_sorting == Data32bitHeader.IN_SET_TIME:
+        return
+    for interface in uC.async_to_chip + uC.async_from_chip + uC.spi + uC.i2c:
+        if header_for_sorting in interface.header():
+            interface.process_packet(packet_to_process)
+            return
+    if header_for_sorting == uC.pin[0].header()[0]:
+        uC.pin[packet_to_process.value()].process_packet(packet_to_process)
+    elif header_for_sorting in uC.pin[0].header():
+        uC.pin[packet_to_process.pin_id()].process_packet(packet_to_process)
+    else:
+        uC.errors.append(str(packet_to_process))
+
+# events of the 8 async interfaces, pin changes of all pins and spi transfers, as a recording might contain them
+# the times move forward like the uC clock, otherwise the receiver takes the stream for slipped
+mix = []
+for i in range(NUMBER_OF_PACKETS):
+    if i % 4 == 0:
+        mix.append(PinPacket(PinHeader.OUT_PIN_HIGH if i % 8 == 0 else PinHeader.OUT_PIN_LOW, i % 55, time = i+1))
+    elif i % 4 == 1:
+        mix.append(Data32bitPacket(header = Data32bitHeader.OUT_SPI0 + (i//4) % 3, value = i, time = i+1))
+    else:
+        mix.append(Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0 + i % 8, value = i, time = i+1))
+events = b"".join(packet.to_bytearray() for packet in mix)
+
+# the same packets through a level 1 connection, dispatched with the scan
+child_1, slave_1 = start_fake_uC()
+uC_level1 = uC_api(os.ttyname(slave_1), api_level = 1)
+# the level 2 connection, update_state dispatches with the routing table
+child_2, slave_2 = start_fake_uC()
+uC_level2 = uC_api(os.ttyname(slave_2), api_level = 2)
+uC_level1.wait_for_connection()
+uC_level2.wait_for_connection()
+
+uC_level1.send_encoded(events, timed = False)
+received = [uC_level1.read_packet() for i in range(NUMBER_OF_PACKETS)]
+start = time.perf_counter()
+for packet_to_process in received:
+    scan_dispatch(uC_level2, packet_to_process)
+scan_rate = NUMBER_OF_PACKETS / (time.perf_counter() - start)
+
+frames_before = uC_level2.frame_decoder().frames()
+uC_level2.send_encoded(events, timed = False)
+while uC_level2.frame_decoder().frames() < frames_before + NUMBER_OF_PACKETS:
+    time.sleep(0.01)
+time.sleep(0.1)
+start = time.perf_counter()
+uC_level2.update_state()
+table_rate = NUMBER_OF_PACKETS / (time.perf_counter() - start)
+
+print('> linear scan:   {:10.0f} packets/s'.format(scan_rate))
+print('> routing table: {:10.0f} packets/s (update_state)   speedup: {:4.1f}x'.format(table_rate, table_rate / scan_rate))
+if uC_level2.errors:
+    print('> [error] '+str(len(uC_level2.errors))+' packets were not routed')
+
+for uC, child in ((uC_level1, child_1), (uC_level2, child_2)):
+    uC.close_connection()
+    os.kill(child, 9)
+    os.waitpid(child, 0)
@@ -0,0 +1,128 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of the latency of received words with a callback (on_events) and with polling update_state, no uC needed (linux/mac only)
+# a minimal uC stand-in runs in a child process on a pty and echoes every packet, so every word send to the async interface comes back,
+# first one word at a time: the time from send() until the main thread has the echoed word,
+# then a stream of words delivered in batches of min_batch, with max_latency_us for the last incomplete batch
+# reports the median and 99th percentile latency and the words per second of the stream
+
+import os, pty, select, struct, sys, threading, time, tty
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_ROUND_TRIPS = 2000
+NUMBER_OF_WORDS = 100000
+
+def fake_uC(master):
+    # aligns, reports the firmware version and echoes every other packet
+    # like the uC it keeps reading while its replies are not yet send
+    os.set_blocking(master, False)
+    received = bytearray()
+    reply = bytearray()
+    while True:
+        readable, writable, _ = select.select([master], [master] if len(reply) > 0 else [], [])
+        if writable:
+            del reply[:os.write(master, reply)]
+        if not readable:
+            continue
+        try:
+            received += os.read(master, 65536)
+        except OSError:
+            os._exit(0)
+        while len(received) > 0:
+            if received[0] == 0xff:
+                # alignment request, answer with the alignment padding and the version
+                alignment = len(received) - len(received.lstrip(b'\xff'))
+                if alignment == len(received):
+                    break
+                del received[:alignment]
+                reply += b'\xff'*9
+                continue
+            if len(received) < 9:
+                break
+            if received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                reply += struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                     FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0)
+            elif received[0] != Data32bitHeader.IN_RESET:
+                reply += received[:9]
+            del received[:9]
+
+def start_fake_uC():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    child = os.fork()
+    if child == 0:
+        os.close(slave)
+        fake_uC(master)
+    os.close(master)
+    return os.ttyname(slave), child
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+path, child = start_fake_uC()
+uC = uC_api(path, api_level = 2)
+uC.wait_for_connection()
+uC.async_to_chip[0].activate(req_pin = 0, ack_pin = 1, data_width = 2, data_pins = [2, 3])
+
+# polling: the main thread processes the read buffer until the word is there
+latencies = []
+for i in range(NUMBER_OF_ROUND_TRIPS):
+    start = time.perf_counter()
+    uC.async_to_chip[0].send(i % 4)
+    while len(uC.async_to_chip[0].data_to_chip_and_clear()[0]) == 0:
+        pass
+    latencies.append(time.perf_counter() - start)
+print('> polling update_state:          median {:7.1f} us   99% {:7.1f} us'.format(*percentiles(latencies)))
+
+# callback: the communication thread delivers every word as it arrives, the main thread waits for it
+received = threading.Event()
+subscription = uC.async_to_chip[0].on_events(lambda words, times: received.set())
+latencies = []
+for i in range(NUMBER_OF_ROUND_TRIPS):
+    received.clear()
+    start = time.perf_counter()
+    uC.async_to_chip[0].send(i % 4)
+    received.wait()
+    latencies.append(time.perf_counter() - start)
+print('> on_events(min_batch = 1):      median {:7.1f} us   99% {:7.1f} us'.format(*percentiles(latencies)))
+uC.unsubscribe(subscription)
+
+# stream: the words arrive in batches, the last incomplete batch is delivered after max_latency_us
+words = []
+done = threading.Event()
+def record(values, times):
+    words.extend(values)
+    if len(words) >= NUMBER_OF_WORDS:
+        done.set()
+subscription = uC.async_to_chip[0].on_events(record, min_batch = 256, max_latency_us = 500)
+start = time.perf_counter()
+uC.send_many([Data32bitPacket(Data32bitHeader.IN_ASYNC_TO_CHIP0, value = i % 4) for i in range(NUMBER_OF_WORDS)])
+done.wait()
+duration = time.perf_counter() - start
+print('> on_events(min_batch = 256, max_latency_us = 500): {:8.0f} words/s in {} batches'.format(NUMBER_OF_WORDS / duration, subscription.batches()))
+
+uC.close_connection()
+os.kill(child, 9)
+os.waitpid(child, 0)
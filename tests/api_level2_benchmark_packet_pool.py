@@ -0,0 +1,80 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of the garbage collector load of the received packets with and without the packet pool, no uC needed
+# a reader thread decodes packets into a queue like the communication thread of uC_api,
+# the main thread processes them like update_state and gives them back to the pool
+
+import sys, time, gc, threading
+from queue import Queue
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_PACKETS = 500000
+
+raw_packets = [Data32bitPacket(header = Data32bitHeader.OUT_ASYNC_FROM_CHIP0, value = i, time = i+1).to_bytearray() for i in range(1000)]
+
+# long lived objects of a running analysis make the full collections expensive
+long_lived = [[i] for i in range(300000)]
+
+gc_pauses = {0: 0, 1: 0, 2: 0}
+gc_time = [0.0]
+gc_start = [0.0]
+
+def gc_callback(phase, info):
+    if phase == "start":
+        gc_start[0] = time.perf_counter()
+    else:
+        gc_time[0] += time.perf_counter() - gc_start[0]
+        gc_pauses[info["generation"]] += 1
+
+def run(pool):
+    read_buffer = Queue(maxsize=10000)
+    def reader():
+        for i in range(NUMBER_OF_PACKETS):
+            raw_packet = raw_packets[i % len(raw_packets)]
+            read_buffer.put(pool.decode(raw_packet) if pool is not None else Packet.from_bytearray(raw_packet))
+    data_from_chip = []
+    data_from_chip_times = []
+    for generation in gc_pauses:
+        gc_pauses[generation] = 0
+    gc_time[0] = 0.0
+    gc.collect()
+    gc.callbacks.append(gc_callback)
+    start = time.perf_counter()
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    for i in range(NUMBER_OF_PACKETS):
+        received_packet = read_buffer.get()
+        data_from_chip.append(received_packet.value())
+        data_from_chip_times.append(received_packet.time())
+        if pool is not None:
+            pool.release(received_packet)
+    reader_thread.join()
+    duration = time.perf_counter() - start
+    gc.callbacks.remove(gc_callback)
+    print('> {:12s} gen0/1/2 collections: {:5d} {:4d} {:3d}   gc time: {:7.1f} ms   total: {:6.0f} packets/s'.format(
+        "with pool" if pool is not None else "without pool", gc_pauses[0], gc_pauses[1], gc_pauses[2], gc_time[0]*1000, NUMBER_OF_PACKETS/duration))
+
+run(None)
+pool = PacketPool()
+run(pool)
+print('> '+str(pool))
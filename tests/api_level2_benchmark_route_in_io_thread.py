@@ -0,0 +1,91 @@
+"""
+    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+    Copyright (C) 2024 Ole Richter - University of Groningen
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# benchmark of a level 2 stimulus loop with and without routing in the communication thread (route_in_io_thread), no uC needed (linux/mac only)
+# a minimal uC stand-in runs in a child process on a pty and echoes every packet, so every send produces a packet to process,
+# every send() calls update(), which processes the read buffer in the main thread unless the communication thread already did
+# reports the sends per second
+
+import os, pty, select, struct, sys, time, tty
+
+sys.path.append('..')
+sys.path.append('.')
+
+from uC_api import *
+
+NUMBER_OF_SENDS = 100000
+
+def fake_uC(master):
+    # aligns, reports the firmware version and echoes every other packet
+    # like the uC it keeps reading while its replies are not yet send
+    os.set_blocking(master, False)
+    received = bytearray()
+    reply = bytearray()
+    while True:
+        readable, writable, _ = select.select([master], [master] if len(reply) > 0 else [], [])
+        if writable:
+            del reply[:os.write(master, reply)]
+        if not readable:
+            continue
+        try:
+            received += os.read(master, 65536)
+        except OSError:
+            os._exit(0)
+        while len(received) > 0:
+            if received[0] == 0xff:
+                # alignment request, answer with the alignment padding and the version
+                alignment = len(received) - len(received.lstrip(b'\xff'))
+                if alignment == len(received):
+                    break
+                del received[:alignment]
+                reply += b'\xff'*9
+                continue
+            if len(received) < 9:
+                break
+            if received[0] == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                reply += struct.pack("<BBIBBB", ErrorHeader.OUT_ALIGN_SUCCESS_VERSION, FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR,
+                                     FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH, FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR, 0, 0)
+            elif received[0] != Data32bitHeader.IN_RESET:
+                reply += received[:9]
+            del received[:9]
+
+for route_in_io_thread in (False, True):
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    child = os.fork()
+    if child == 0:
+        os.close(slave)
+        fake_uC(master)
+    os.close(master)
+
+    uC = uC_api(os.ttyname(slave), api_level = 2, route_in_io_thread = route_in_io_thread)
+    uC.wait_for_connection()
+    uC.async_to_chip[0].activate(req_pin = 0, ack_pin = 1, data_width = 2, data_pins = [2, 3])
+
+    start = time.perf_counter()
+    for i in range(NUMBER_OF_SENDS):
+        uC.async_to_chip[0].send(i % 4)
+    duration = time.perf_counter() - start
+    time.sleep(0.5)
+    data, times = uC.async_to_chip[0].data_to_chip_and_clear()
+    print('> route_in_io_thread = {:5s}: {:8.0f} sends/s   {} words echoed'.format(str(route_in_io_thread), NUMBER_OF_SENDS / duration, len(data)))
+
+    uC.close_connection()
+    os.kill(child, 9)
+    os.waitpid(child, 0)
@@ -0,0 +1,39 @@
+import serial, sys, time, struct, logging
+from enum import Enum
+
+sys.path.append('../')
+sys.path.append('./')
+
+from uC_api import *
+
+logging.basicConfig(level=logging.INFO)
+
+# two boards served by one I/O thread, the LEDs of both blink in sync
+cluster = uC_cluster(['/dev/ttyACM0', '/dev/ttyACM1'], api_level=2)
+
+for uc in cluster:
+    uc.pin[13].activate("OUTPUT") #LED on Tennsy
+    uc.pin[12].activate("INPUT") # wired up to one of the others
+
+for uc in cluster:
+    toggle = 1
+    for step in range(100,10000000, 1000000):
+        uc.pin[13].send(value=toggle, time=step)
+        toggle = not toggle
+
+# the start packets are written to all boards in one pass
+cluster.start_experiment()
+
+time.sleep(10)
+cluster.update_state()
+
+for board_id, uc in enumerate(cluster):
+    print("board "+str(board_id))
+    print(uc.pin[13])
+    print(uc.pin[12])
+
+per_board, total = cluster.throughput()
+print("throughput per board (send/s, received/s): "+str(per_board)+", total: "+str(total))
+print(cluster)
+
+cluster.close_connection()
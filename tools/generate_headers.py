@@ -0,0 +1,198 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2022-2023 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+generates the header enums and lookup tables from the single header spec tools/header_spec.json
+
+ - uC_api/header.py: the part between the generated markers (enums, membership sets, packet kind table)
+ - firmware/header_enums.h: the header enums of the firmware (inPacketHeader, outPacketHeader, confPacketHeader),
+   a header is placed in the enum whose prefix its name starts with
+
+headers with "firmware": false are only generated for python, headers with "python": false only for the firmware,
+"firmware_value" is the value of a header in the firmware if it differs from the one on the host (the value on the wire
+the deployed firmware uses, changing it needs a new firmware version)
+
+usage: python tools/generate_headers.py [--check]
+  --check only compares the generated code with the files and fails if they are out of date
+"""
+
+import json, os, sys
+
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPEC_PATH = os.path.join(REPO_PATH, "tools", "header_spec.json")
+PYTHON_PATH = os.path.join(REPO_PATH, "uC_api", "header.py")
+FIRMWARE_PATH = os.path.join(REPO_PATH, "firmware", "header_enums.h")
+
+PYTHON_BEGIN = "# >>> generated by tools/generate_headers.py from tools/header_spec.json - do not edit by hand\n"
+PYTHON_END = "# <<< end of generated code\n"
+
+
+def indent(text, prefix):
+    return "\n".join((prefix + line).rstrip() if line.strip() else "" for line in text.split("\n"))
+
+def python_headers(header_class):
+    return [header for header in header_class["headers"] if header.get("python", True)]
+
+def firmware_headers(header_class):
+    return [header for header in header_class["headers"] if header.get("firmware", True)]
+
+def firmware_value(header):
+    return header.get("firmware_value", header["value"])
+
+def firmware_enum_of(spec, header):
+    """ the firmware enum whose prefix the name of the header starts with, None if there is none
+    """
+    for firmware_enum in spec["firmware_enums"]:
+        if header["name"].startswith(firmware_enum["prefix"]):
+            return firmware_enum["name"]
+    return None
+
+def header_kind_table(spec):
+    """ the packet kind of every header byte, the first header class in kind_priority wins
+    """
+    kinds = spec["packet_kinds"]
+    table = [0]*256
+    for kind in reversed(spec["kind_priority"]):
+        for header_class in spec["header_classes"]:
+            if header_class["kind"] != kind:
+                continue
+            for header in python_headers(header_class):
+                table[header["value"]] = kinds.index(kind)
+    return table
+
+def check_spec(spec):
+    """ makes sure that headers of unique header classes are unique and fit in one byte,
+        and that every firmware header belongs to exactly one firmware enum, in which its value is unique
+        (a header listed in several header classes, e.g. IN_CONF_READ_ON_REQUEST, is one entry of the firmware enum)
+    """
+    firmware_values = dict((firmware_enum["name"], {}) for firmware_enum in spec["firmware_enums"])
+    for header_class in spec["header_classes"]:
+        for header in header_class["headers"]:
+            for value in (header["value"], firmware_value(header)):
+                if value < 0 or value > 255:
+                    raise ValueError(header_class["name"]+": header "+str(value)+" does not fit in one byte")
+        values = [header["value"] for header in python_headers(header_class)]
+        if header_class["unique"] and len(set(values)) != len(values):
+            raise ValueError(header_class["name"]+": header values are not unique")
+        for header in firmware_headers(header_class):
+            firmware_enum = firmware_enum_of(spec, header)
+            if firmware_enum is None:
+                raise ValueError(header_class["name"]+": header "+header["name"]+" does not start with the prefix of a firmware enum")
+            if firmware_values[firmware_enum].setdefault(header["name"], firmware_value(header)) != firmware_value(header):
+                raise ValueError(firmware_enum+": header "+header["name"]+" has different values")
+        if header_class["kind"] is not None and header_class["kind"] not in spec["kind_priority"]:
+            raise ValueError(header_class["name"]+": unknown packet kind "+str(header_class["kind"]))
+    for firmware_enum, values in firmware_values.items():
+        if len(set(values.values())) != len(values):
+            raise ValueError(firmware_enum+": header values are not unique")
+
+def render_python(spec):
+    code = [PYTHON_BEGIN]
+    for header_class in spec["header_classes"]:
+        if header_class["unique"]:
+            code.append("@enum.unique\n")
+        code.append("class "+header_class["name"]+"(enum.IntEnum) :\n")
+        code.append('    """\n'+indent(header_class["doc"], "    ")+'\n    """\n\n')
+        code.append('    def __new__(cls, value, doc=None):\n'
+                    '      """\n'
+                    '      overwrite to enable __doc__ strings for enum elements as second argument.\n'
+                    '      """\n'
+                    '      self = int.__new__(cls, value)  # calling super().__new__(value) here would fail\n'
+                    '      self._value_ = value\n'
+                    '      if doc is not None:\n'
+                    '          self.__doc__ = doc\n'
+                    '      return self\n\n')
+        for header in python_headers(header_class):
+            code.append("    "+header["name"]+" = "+str(header["value"])+', """\n'+indent(header["doc"], "    ")+'\n    """\n\n')
+        code.append("\n")
+
+    code.append('"""\npacket kinds as used in the HEADER_KIND lookup table\n"""\n')
+    for kind_id, kind in enumerate(spec["packet_kinds"]):
+        code.append("KIND_"+kind+" = "+str(kind_id)+"\n")
+    code.append('\n"""\nflat membership sets of the header classes, checking these is much cheaper than the in operator on the enum classes\n"""\n')
+    for header_class in spec["header_classes"]:
+        values = sorted(header["value"] for header in python_headers(header_class))
+        code.append(header_class["set_name"]+" = frozenset(("+", ".join(str(value) for value in values)+",))\n")
+    code.append('\n"""\npacket kind of every possible header byte, use HEADER_KIND[header] as lookup\nif a header value is used in more than one header class the order of priority is: '+", ".join(spec["kind_priority"])+'\n"""\n')
+    table = header_kind_table(spec)
+    code.append("HEADER_KIND = bytes((\n")
+    for row in range(0, 256, 32):
+        code.append("    "+", ".join(str(kind) for kind in table[row:row+32])+",\n")
+    code.append("))\n")
+    code.append(PYTHON_END)
+    return "".join(code)
+
+def render_firmware(spec):
+    code = ["/*\n"
+            "    This file is part of the Firmware project to interface with small Async or Neuromorphic chips\n"
+            "    Copyright (C) 2022-2023 Ole Richter - University of Groningen\n\n"
+            "    This program is free software: you can redistribute it and/or modify\n"
+            "    it under the terms of the GNU General Public License as published by\n"
+            "    the Free Software Foundation, either version 3 of the License, or\n"
+            "    (at your option) any later version.\n\n"
+            "    This program is distributed in the hope that it will be useful,\n"
+            "    but WITHOUT ANY WARRANTY; without even the implied warranty of\n"
+            "    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the\n"
+            "    GNU General Public License for more details.\n\n"
+            "    You should have received a copy of the GNU General Public License\n"
+            "    along with this program.  If not, see <https://www.gnu.org/licenses/>.\n"
+            "*/\n\n"
+            "// generated by tools/generate_headers.py from tools/header_spec.json - do not edit by hand\n\n"
+            "#ifndef HEADER_ENUMS_H\n"
+            "#define HEADER_ENUMS_H\n"
+            "#include <cstdint>\n"]
+    for firmware_enum in spec["firmware_enums"]:
+        code.append("\n/*\n"+indent(firmware_enum["doc"], " ")+"\n*/\n"
+                    "enum "+firmware_enum["name"]+" : uint8_t {\n")
+        generated = set()
+        for header_class in spec["header_classes"]:
+            for header in firmware_headers(header_class):
+                if firmware_enum_of(spec, header) != firmware_enum["name"] or header["name"] in generated:
+                    continue
+                generated.add(header["name"])
+                code.append("  /*\n"+indent(header["doc"], "   ")+"\n  */\n"
+                            "  "+header["name"]+" = "+str(firmware_value(header))+"U,\n")
+        code.append("};\n")
+    code.append("\n#endif\n")
+    return "".join(code)
+
+def replace_generated(text, generated):
+    begin = text.index(PYTHON_BEGIN)
+    end = text.index(PYTHON_END) + len(PYTHON_END)
+    return text[:begin] + generated + text[end:]
+
+def main(check=False):
+    with open(SPEC_PATH) as spec_file:
+        spec = json.load(spec_file)
+    check_spec(spec)
+    with open(PYTHON_PATH) as python_file:
+        python_text = python_file.read()
+    outputs = {PYTHON_PATH: replace_generated(python_text, render_python(spec)), FIRMWARE_PATH: render_firmware(spec)}
+    out_of_date = []
+    for path, text in outputs.items():
+        current = open(path).read() if os.path.exists(path) else None
+        if current == text:
+            continue
+        out_of_date.append(path)
+        if not check:
+            with open(path, "w") as output_file:
+                output_file.write(text)
+    for path in out_of_date:
+        print(("out of date: " if check else "generated: ") + os.path.relpath(path, REPO_PATH))
+    return 1 if (check and out_of_date) else 0
+
+if __name__ == "__main__":
+    sys.exit(main(check="--check" in sys.argv[1:]))
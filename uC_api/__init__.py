@@ -1,7 +1,24 @@
 from .uC import *
+from .uC_asyncio import AsyncUC, EventStream
+from .uC_cluster import uC_cluster
 from . import header
 from . import packet
+from . import framing
+from . import statistics
+from . import notifier
+from . import link
+from . import batch_queue
+from . import flow_control
+from . import scheduler
+from . import process_io
+from . import transport
+from . import subscription
 from . import interface_async
 from . import interface_pin
 from . import interface_spi
 from . import interface_i2c
+try:
+    # the batch api needs numpy, which is optional for the rest of the api
+    from . import batch
+except ImportError:
+    pass
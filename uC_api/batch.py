@@ -0,0 +1,257 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import logging
+import numpy as np
+from .header import *
+from .packet import *
+
+"""
+columnar (batch) access to the 9 byte packets used for the communication with the uC,
+instead of creating one Packet object per received packet, a whole buffer of N*9 bytes
+is reinterpreted as a numpy structured array, so the fields are available as columns.
+
+the dtypes are packed (no padding) and little endian, exactly like the packet_t in datatypes.h
+"""
+
+PACKET_SIZE = 9
+
+"""
+generic layout <header><exec_time><value> shared by all packets except the ErrorPacket
+"""
+DATA32BIT_DTYPE = np.dtype([("header", "u1"), ("exec_time", "<u4"), ("value", "<u4")])
+
+"""
+layout <header><exec_time><device_address+read><register_address><value_ms><value_ls> of the DataI2CPacket
+"""
+DATAI2C_DTYPE = np.dtype([("header", "u1"), ("exec_time", "<u4"), ("device_address_read", "u1"),
+                          ("register_address", "u1"), ("value_ms", "u1"), ("value_ls", "u1")])
+
+"""
+layout <header><exec_time><pin_id><value><padding> of the PinPacket
+"""
+PIN_DTYPE = np.dtype([("header", "u1"), ("exec_time", "<u4"), ("pin_id", "u1"), ("value", "u1"), ("padding", "<u2")])
+
+"""
+layout <header><exec_time><config_header><value><padding> of the ConfigPacket
+"""
+CONFIG_DTYPE = np.dtype([("header", "u1"), ("exec_time", "<u4"), ("config_header", "u1"), ("value", "u1"), ("padding", "<u2")])
+
+"""
+layout <header><org_header><value><org_sub_header><padding> of the ErrorPacket, it carries no execution time
+"""
+ERROR_DTYPE = np.dtype([("header", "u1"), ("original_header", "u1"), ("value", "<u4"),
+                        ("original_sub_header", "u1"), ("padding", "<u2")])
+
+"""
+numpy view of the generated header -> packet kind lookup (KIND_* constants in header.py)
+"""
+HEADER_KIND_ARRAY = np.frombuffer(HEADER_KIND, dtype=np.uint8)
+
+
+def decode_many(byte_buffer):
+    """ decodes a contiguous buffer of N*9 bytes without creating any Packet object
+        the buffer is not copied, the returned batch is a view on it
+        @param byte_buffer: (bytes, bytearray or memoryview) the received bytes, trailing incomplete packets are ignored
+        @return: PacketBatch with one record per packet
+    """
+    number_of_packets = len(byte_buffer) // PACKET_SIZE
+    if len(byte_buffer) % PACKET_SIZE != 0:
+        logging.error("batch decode: "+str(len(byte_buffer) % PACKET_SIZE)+" trailing bytes are not a complete packet and are ignored")
+    return PacketBatch(np.frombuffer(byte_buffer, dtype=DATA32BIT_DTYPE, count=number_of_packets))
+
+
+class PacketBatch:
+    """ PacketBatch is the columnar counterpart of the Packet class,
+        it holds N packets in a structured array with the generic <header><exec_time><value> layout
+        and offers views reinterpreting the records in the layout of the individual packet classes
+    """
+    def __init__(self, records):
+        """ constructor for the PacketBatch
+        @param records: (numpy structured array of DATA32BIT_DTYPE) the packet records
+        """
+        self._records = records
+
+    def __len__(self):
+        return len(self._records)
+
+    def __str__(self):
+        return "[PacketBatch]: "+ str(len(self._records)) +" packets"
+
+    def records(self):
+        """ getter method for the raw records
+            @return: structured array in the generic DATA32BIT_DTYPE layout
+        """
+        return self._records
+
+    def header(self):
+        """ getter method for the header column
+            @return: (numpy uint8 array) the header of every packet
+        """
+        return self._records["header"]
+
+    def time(self):
+        """ getter method for the execution time column, not meaningful for error packets
+            @return: (numpy uint32 array) the time of every packet
+        """
+        return self._records["exec_time"]
+
+    def value(self):
+        """ getter method for the 32bit value column, not meaningful for the packets with sub fields
+            @return: (numpy uint32 array) the value of every packet
+        """
+        return self._records["value"]
+
+    def kind(self):
+        """ getter method for the packet kind column (KIND_DATA32BIT, KIND_PIN, ...)
+            @return: (numpy uint8 array) the kind of every packet
+        """
+        return HEADER_KIND_ARRAY[self._records["header"]]
+
+    def select(self, headers):
+        """ selects all packets with one of the given headers
+            @param headers: (header or list of headers) the headers to keep
+            @return: PacketBatch containing only the matching packets in arrival order
+        """
+        if isinstance(headers, int):
+            mask = self._records["header"] == headers
+        else:
+            mask = np.isin(self._records["header"], np.asarray([int(header) for header in headers], dtype=np.uint8))
+        return PacketBatch(self._records[mask])
+
+    def _view_kind(self, kind, dtype):
+        """ selects all packets of one kind and reinterprets them in the layout of that packet class
+        """
+        return self._records[self.kind() == kind].view(dtype)
+
+    def data32bit(self):
+        """ @return: all Data32bitPacket records as structured array of DATA32BIT_DTYPE
+        """
+        return self._view_kind(KIND_DATA32BIT, DATA32BIT_DTYPE)
+
+    def data_i2c(self):
+        """ @return: all DataI2CPacket records as structured array of DATAI2C_DTYPE
+        """
+        return self._view_kind(KIND_DATAI2C, DATAI2C_DTYPE)
+
+    def pin(self):
+        """ @return: all PinPacket records as structured array of PIN_DTYPE
+        """
+        return self._view_kind(KIND_PIN, PIN_DTYPE)
+
+    def config(self):
+        """ @return: all ConfigPacket records as structured array of CONFIG_DTYPE
+        """
+        return self._view_kind(KIND_CONFIG, CONFIG_DTYPE)
+
+    def error(self):
+        """ @return: all ErrorPacket records as structured array of ERROR_DTYPE
+        """
+        return self._view_kind(KIND_ERROR, ERROR_DTYPE)
+
+    def async_from_chip(self, interface_id):
+        """ the words recorded on one ASYNC_FROM_CHIP interface, same format as Interface_Async.data_from_chip
+            @param interface_id: (int) the id of the interface 0-7
+            @return: (numpy uint32 array, numpy uint32 array) the words and the times they were recorded
+        """
+        records = self._records[self._records["header"] == Data32bitHeader.OUT_ASYNC_FROM_CHIP0 + interface_id]
+        return (records["value"], records["exec_time"])
+
+    def pin_changes(self, pin_id=None):
+        """ the recorded input pin changes (OUT_PIN_LOW and OUT_PIN_HIGH)
+            @param pin_id: (int) only return the changes of this pin (optional, default = None all pins)
+            @return: structured array of PIN_DTYPE
+        """
+        headers = self._records["header"]
+        records = self._records[(headers == PinHeader.OUT_PIN_LOW) | (headers == PinHeader.OUT_PIN_HIGH)].view(PIN_DTYPE)
+        if pin_id is not None:
+            records = records[records["pin_id"] == pin_id]
+        return records
+
+
+def _as_column(values, number_of_packets, name):
+    """ broadcasts a scalar or array like argument of encode_many to an int64 column of length number_of_packets
+    """
+    column = np.asarray(values, dtype=np.int64)
+    if column.ndim == 0:
+        return np.full(number_of_packets, column, dtype=np.int64)
+    if len(column) != number_of_packets:
+        logging.error("encode_many: "+name+" has "+str(len(column))+" entries but there are "+str(number_of_packets)+" headers")
+        raise ValueError("encode_many: "+name+" has the wrong length")
+    return column
+
+def _check_range(column, valid, name, limit_str):
+    """ vectorized range check, logs and raises on the first invalid entry
+    """
+    if not np.all(valid):
+        invalid = np.flatnonzero(~valid)
+        logging.error("encode_many: "+str(len(invalid))+" entries of "+name+" are not "+limit_str+", first at index "+str(invalid[0])+": "+str(column[invalid[0]]))
+        raise ValueError("encode_many: "+name+" out of range")
+
+def encode_many(headers, times=0, values=0, pin_ids=0, config_headers=0, out=None):
+    """ encodes N Data32bitPacket, PinPacket or ConfigPacket packets (can be mixed) directly into one contiguous buffer,
+        without creating Packet objects. every argument can be a scalar (same for all packets) or an array like of length N,
+        the kind of every packet is determined by its header.
+        the result can be passed to uC_api.send_encoded
+        @param headers: (array like of Data32bitHeader, PinHeader or ConfigMainHeader) the header of every packet
+        @param times: (array like of uint_32) the time of execution of every packet (optional, default = 0)
+        @param values: (array like) the value, uint_32 for Data32bitPacket, uint_8 for PinPacket and ConfigPacket (optional, default = 0)
+        @param pin_ids: (array like of uint_8) the pin id, only used for PinPacket (optional, default = 0)
+        @param config_headers: (array like of ConfigSubHeader) the sub header, only used for ConfigPacket (optional, default = 0)
+        @param out: (writeable buffer) if given the packets are written into it instead of a new bytes object (optional, default = None)
+        @return: (bytes) the encoded packets or if out is given the number of bytes written
+        @raise ValueError: if any field is out of range
+    """
+    # the number of packets is given by the longest array argument, scalars are used for all packets
+    number_of_packets = max([np.size(argument) for argument in (headers, times, values, pin_ids, config_headers)])
+    headers = _as_column(headers, number_of_packets, "headers")
+    times = _as_column(times, number_of_packets, "times")
+    values = _as_column(values, number_of_packets, "values")
+
+    _check_range(headers, (headers >= 0) & (headers < 256), "headers", "a byte")
+    kind = HEADER_KIND_ARRAY[headers.astype(np.uint8)]
+    is_pin = kind == KIND_PIN
+    is_config = kind == KIND_CONFIG
+    _check_range(headers, (kind == KIND_DATA32BIT) | is_pin | is_config, "headers", "a Data32bitHeader, PinHeader or ConfigMainHeader")
+    _check_range(times, (times >= 0) & (times < 2**32), "times", "unsigned integers of 4 bytes")
+    _check_range(values, (values >= 0) & (values < np.where(is_pin | is_config, 2**8, 2**32)), "values",
+                 "unsigned integers of 4 bytes (Data32bit) or 1 byte (Pin, Config)")
+
+    # the pin id and config sub header use the LS byte of the value field, the 8 bit value the next byte
+    value_field = values
+    if np.any(is_pin):
+        pin_ids = _as_column(pin_ids, number_of_packets, "pin_ids")
+        _check_range(pin_ids, ~is_pin | ((pin_ids >= 0) & (pin_ids < 55)), "pin_ids", "a valid pin id < 55")
+        value_field = np.where(is_pin, pin_ids | (values << 8), value_field)
+    if np.any(is_config):
+        config_headers = _as_column(config_headers, number_of_packets, "config_headers")
+        valid_sub_header = np.zeros(256, dtype=bool)
+        valid_sub_header[sorted(CONFIG_SUB_HEADERS)] = True
+        _check_range(config_headers, ~is_config | ((config_headers >= 0) & (config_headers < 256) & valid_sub_header[config_headers & 0xFF]),
+                     "config_headers", "a ConfigSubHeader")
+        value_field = np.where(is_config, config_headers | (values << 8), value_field)
+
+    if out is None:
+        records = np.empty(number_of_packets, dtype=DATA32BIT_DTYPE)
+    else:
+        records = np.frombuffer(out, dtype=DATA32BIT_DTYPE, count=number_of_packets)
+    records["header"] = headers
+    records["exec_time"] = times
+    records["value"] = value_field
+    if out is None:
+        return records.tobytes()
+    return number_of_packets*PACKET_SIZE
@@ -0,0 +1,144 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import threading
+
+"""
+single producer single consumer queues between the main thread and the communication threads.
+
+the producer appends to an incoming list, the consumer takes the whole incoming list at once
+(chunk swapping) and then hands out its items without any synchronisation.
+the lock is only taken once per put/put_many and once per swap, the condition is only
+notified if the consumer is blocked in get, unlike queue.Queue which takes the lock and
+notifies a condition for every put, get and task_done.
+"""
+
+
+class BatchQueue:
+    """ unbounded single producer single consumer queue with batch put and get
+
+    one thread may put, one (other) thread may get, empty() and qsize() can be called from both
+    """
+    __slots__ = ("_lock", "_not_empty", "_incoming", "_outgoing", "_position", "_waiting")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        # filled by the producer under the lock
+        self._incoming = []
+        # owned by the consumer, the items before self._position are already taken
+        self._outgoing = []
+        self._position = 0
+        # the consumer is blocked in get and needs to be notified
+        self._waiting = False
+
+    def put(self, item):
+        """ adds one item to the queue
+
+        @param item: the item, anything but None
+        """
+        with self._lock:
+            self._incoming.append(item)
+            if self._waiting:
+                self._not_empty.notify()
+
+    def put_many(self, items):
+        """ adds all items to the queue at once, in order
+
+        @param items: (iterable) the items
+        """
+        with self._lock:
+            self._incoming.extend(items)
+            if self._waiting:
+                self._not_empty.notify()
+
+    def get(self, block=True, timeout=None):
+        """ takes the next item out of the queue
+
+        @param block: (bool) if True wait until an item is availible (optional, default = True)
+        @param timeout: (float or None) the maximum time to wait in seconds, None waits forever (optional, default = None)
+        @return: the next item, None if the queue is empty and the wait timed out or block is False
+        """
+        if self._position == len(self._outgoing) and not self._swap(block, timeout):
+            return None
+        item = self._outgoing[self._position]
+        self._position += 1
+        return item
+
+    def get_many(self, max_items=None):
+        """ takes all waiting items (up to max_items) out of the queue, never blocks
+
+        @param max_items: (int or None) the maximum number of items to take, None takes all (optional, default = None)
+        @return: (list) the items in order, can be empty
+        """
+        if self._position == len(self._outgoing):
+            if not self._swap(False, None):
+                return []
+            # hand out the swapped chunk itself, if it is taken as a whole
+            if max_items is None or max_items >= len(self._outgoing):
+                items = self._outgoing
+                self._outgoing = []
+                self._position = 0
+                return items
+        if max_items is None:
+            stop = len(self._outgoing)
+        else:
+            stop = min(self._position + max_items, len(self._outgoing))
+        items = self._outgoing[self._position:stop]
+        self._position = stop
+        if max_items is None or len(items) < max_items:
+            # the consumer chunk ran empty, continue with the items that arrived in the meantime
+            items.extend(self.get_many(None if max_items is None else max_items - len(items)))
+        return items
+
+    def _swap(self, block, timeout):
+        """ takes the incoming list as the new chunk of the consumer
+
+        @return: (bool) True if the new chunk contains items
+        """
+        with self._lock:
+            if not self._incoming:
+                if not block:
+                    return False
+                self._waiting = True
+                try:
+                    self._not_empty.wait_for(lambda: self._incoming, timeout)
+                finally:
+                    self._waiting = False
+                if not self._incoming:
+                    return False
+            self._outgoing, self._incoming = self._incoming, []
+            self._position = 0
+            return True
+
+    def empty(self):
+        """ checks if the queue is empty
+
+        @return: (bool) True if no item is waiting
+        """
+        return self._position == len(self._outgoing) and not self._incoming
+
+    def qsize(self):
+        """ getter method for the number of waiting items, approximate if the other thread is active
+        """
+        return len(self._outgoing) - self._position + len(self._incoming)
+
+    def __len__(self):
+        return self.qsize()
+
+    def __str__(self):
+        return "[BatchQueue]: waiting items = "+str(self.qsize())
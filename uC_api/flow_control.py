@@ -0,0 +1,167 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import enum
+import threading
+from concurrent.futures import Future
+
+"""
+backpressure on the write buffers of the API.
+
+the main thread can create packets much faster than the uC executes them, timed packets wait
+in the write buffer until the uC has free spots, so without a bound the buffer grows until
+the memory of the PC runs out. the packets waiting in a write buffer are counted, when they
+reach the high water mark the buffer is full and stays full until the writer thread has taken
+them out down to the low water mark. the packets between the two marks keep the writer busy
+while the main thread creates new ones, so the writer never runs dry.
+"""
+
+
+class SendPolicy(enum.Enum):
+    """ SendPolicy specifies what the send functions do if the write buffer is full
+    """
+    # wait until the buffer is drained to the low water mark, then queue the packet
+    BLOCK = "block"
+    # raise queue.Full, the packet is not queued
+    RAISE = "raise"
+    # queue the packet and return a concurrent.futures.Future that is done when the buffer is drained to the low water mark
+    FUTURE = "future"
+
+
+class WaterMarks:
+    """ counts the packets waiting in one write buffer and tracks if it is full, all methods are thread safe
+
+    the producer calls add() after it placed packets in the buffer, the consumer remove() after it took them out
+    """
+    __slots__ = ("_lock", "_drained", "_high_water_mark", "_low_water_mark", "_waiting", "_full",
+                 "_futures", "_max_waiting", "_stalls")
+
+    def __init__(self, high_water_mark=None, low_water_mark=None):
+        """ @param high_water_mark: (int or None) number of waiting packets at which the buffer is full, None is unbounded (optional, default = None)
+            @param low_water_mark: (int or None) number of waiting packets at which a full buffer takes packets again,
+                None is half the high water mark (optional, default = None)
+        """
+        if high_water_mark is not None:
+            if low_water_mark is None:
+                low_water_mark = high_water_mark // 2
+            if high_water_mark < 1 or low_water_mark < 0 or low_water_mark >= high_water_mark:
+                raise ValueError("water marks: 0 <= low_water_mark "+str(low_water_mark)+" < high_water_mark "+str(high_water_mark)+" required")
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._high_water_mark = high_water_mark
+        self._low_water_mark = low_water_mark
+        self._waiting = 0
+        self._full = False
+        # futures handed out while the buffer is full
+        self._futures = []
+        self._max_waiting = 0
+        # number of times the buffer became full
+        self._stalls = 0
+
+    def add(self, number_of_packets):
+        """ called by the producer after it placed packets in the buffer
+
+        @param number_of_packets: (int) the number of packets
+        """
+        if self._high_water_mark is None:
+            return
+        with self._lock:
+            self._waiting += number_of_packets
+            self._max_waiting = max(self._max_waiting, self._waiting)
+            if not self._full and self._waiting >= self._high_water_mark:
+                self._full = True
+                self._stalls += 1
+
+    def remove(self, number_of_packets):
+        """ called by the consumer after it took packets out of the buffer,
+        wakes up the waiting producer and completes the futures if the buffer is drained to the low water mark
+
+        @param number_of_packets: (int) the number of packets
+        """
+        if self._high_water_mark is None:
+            return
+        with self._lock:
+            self._waiting -= number_of_packets
+            if not self._full or self._waiting > self._low_water_mark:
+                return
+            self._full = False
+            self._drained.notify_all()
+            futures = self._futures
+            self._futures = []
+        # the callbacks of the futures run outside of the lock, in the thread of the consumer
+        for future in futures:
+            future.set_result(None)
+
+    def wait(self, timeout=None):
+        """ blocks until the buffer is not full
+
+        @param timeout: (float or None) the maximum time to wait in seconds, None waits forever (optional, default = None)
+        @return: (bool) True if the buffer is not full
+        """
+        if not self._full:
+            return True
+        with self._lock:
+            return self._drained.wait_for(lambda: not self._full, timeout)
+
+    def drained(self):
+        """ future that is done when the buffer is not full
+
+        @return: (concurrent.futures.Future) the future, already done if the buffer is not full
+        """
+        future = Future()
+        with self._lock:
+            if self._full:
+                self._futures.append(future)
+                return future
+        future.set_result(None)
+        return future
+
+    def full(self):
+        """ getter method for the full state, True from reaching the high water mark until drained to the low water mark
+        """
+        return self._full
+
+    def waiting(self):
+        """ getter method for the number of waiting packets, only counted with a high water mark
+        """
+        return self._waiting
+
+    def max_waiting(self):
+        """ getter method for the largest number of waiting packets
+        """
+        return self._max_waiting
+
+    def stalls(self):
+        """ getter method for the number of times the buffer became full
+        """
+        return self._stalls
+
+    def high_water_mark(self):
+        """ getter method for the high water mark, None if unbounded
+        """
+        return self._high_water_mark
+
+    def low_water_mark(self):
+        """ getter method for the low water mark, None if unbounded
+        """
+        return self._low_water_mark
+
+    def __str__(self):
+        if self._high_water_mark is None:
+            return "[WaterMarks]: unbounded"
+        return "[WaterMarks]: waiting packets = "+str(self._waiting)+" (max "+str(self._max_waiting)+"), high/low water mark = "+\
+            str(self._high_water_mark)+"/"+str(self._low_water_mark)+", full = "+str(self._full)+", stalls = "+str(self._stalls)
@@ -0,0 +1,407 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import logging
+import re
+import struct
+from time import monotonic
+from .header import HEADER_KIND, KIND_UNKNOWN, KIND_ERROR, Data32bitHeader
+
+"""
+streaming frame decoding of the byte stream received from the uC.
+
+all availible bytes are read at once into a preallocated receive buffer, the decoder
+then cuts out the 9 byte packets (frames) and removes the alignment padding (0xff bytes
+at a frame boundary, the uC never sends a packet with header 255).
+incomplete frames stay in the buffer until the rest arrives with the next read.
+
+every frame header is checked against the header table and the frame times have to move
+forward in small steps, a frame with an unknown header or a jump in time means the stream
+might have slipped (bytes were lost or inserted). the decoder then resynchronizes
+itself: it picks the offset of the next frame boundary that is followed by a long run of
+frames with known headers and the smallest time steps (or an alignment padding), the bytes
+in between are discarded.
+the frames before and after the slip are kept, no round trip to the uC is needed.
+"""
+
+FRAME_SIZE = 9
+ALIGNMENT_BYTE = 0xff
+PADDING_FRAME = bytes((ALIGNMENT_BYTE,))*FRAME_SIZE
+IN_SET_TIME = int(Data32bitHeader.IN_SET_TIME)
+OUT_FREE_INSTRUCTION_SPOTS = int(Data32bitHeader.OUT_FREE_INSTRUCTION_SPOTS)
+
+"""
+how many us the time can move forward from one frame to the next, without making the frame suspicious
+"""
+TIME_WINDOW_US = 1 << 22
+
+"""
+how many us the time can move backward from one frame to the next, for packets created in interrupts
+"""
+TIME_TOLERANCE_US = 1 << 8
+
+"""
+the times of this many frames are checked at once
+"""
+TIME_CHECK_FRAMES = 64
+
+"""
+maximum number of frames that are checked after each possible frame boundary when resynchronizing
+"""
+RESYNC_FRAMES = 64
+
+"""
+minimum number of received frames to decide on a frame boundary when resynchronizing, the decoder waits for more bytes
+"""
+RESYNC_MIN_FRAMES = 4
+
+TIME_STRUCT = struct.Struct("<I")
+SET_TIME_STRUCT = struct.Struct("<II")
+TIME_CHECK_STRUCT = struct.Struct("<" + "xI4x"*TIME_CHECK_FRAMES)
+
+# the headers the uC can send, 255 is the alignment padding
+VALID_HEADERS = bytes(header for header in range(256) if HEADER_KIND[header] != KIND_UNKNOWN and header != ALIGNMENT_BYTE)
+# finds the first frame header that is not a known header (including the alignment padding)
+INVALID_HEADER_PATTERN = re.compile(b"[^" + b"".join(re.escape(bytes((header,))) for header in VALID_HEADERS) + b"]")
+
+
+class FrameDecoder:
+    """ incremental decoder cutting the received byte stream into 9 byte frames
+
+    usage: call read_from(connection) whenever bytes are availible, it returns
+    all complete frames as one contiguous bytes object of N*9 bytes
+    """
+    __slots__ = ("_buffer", "_view", "_start", "_end", "_padding", "_frames", "_alignments", "_reads",
+                 "_slips", "_discarded", "_slip_start", "_recovery_time", "_max_recovery_time", "_previous_time",
+                 "_burst_start")
+
+    def __init__(self, buffer_size=65536):
+        """ @param buffer_size: (int) size of the preallocated receive buffer in bytes, it is the maximum read size (optional, default = 65536)
+        """
+        if buffer_size < 2*FRAME_SIZE:
+            raise ValueError("buffer_size "+str(buffer_size)+" has to hold at least 2 frames")
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        # the undecoded bytes are self._buffer[self._start:self._end]
+        self._start = 0
+        self._end = 0
+        # length of the current run of alignment bytes, it can span more than one read
+        self._padding = 0
+        self._frames = 0
+        self._alignments = 0
+        self._reads = 0
+        self._slips = 0
+        self._discarded = 0
+        # monotonic time when the current slip was detected, None if the stream is in sync
+        self._slip_start = None
+        self._recovery_time = 0.0
+        self._max_recovery_time = 0.0
+        # time of the last accepted frame, None if the next frame can have any time
+        self._previous_time = None
+        # offset of the first byte received after all bytes before were decoded (e.g. after a pause), None if there is none
+        self._burst_start = None
+
+    def read_from(self, connection):
+        """ reads all bytes waiting on the connection with one readinto and decodes them
+
+        @param connection: (serial.Serial or any object with in_waiting and readinto) the connection to the uC
+        @return: (bytes) all complete frames, N*9 bytes, can be empty
+        """
+        waiting = connection.in_waiting
+        if waiting > 0:
+            self._make_space()
+            number_of_bytes = connection.readinto(self._view[self._end:min(self._end+waiting, len(self._buffer))])
+            if number_of_bytes:
+                self._end += number_of_bytes
+                self._reads += 1
+        return self.decode()
+
+    def feed(self, byte_array):
+        """ copies received bytes into the buffer and decodes them, used if the bytes are not read by the decoder itself
+
+        @param byte_array: (bytes-like) the received bytes
+        @return: (bytes) all complete frames, N*9 bytes, can be empty
+        """
+        frames = []
+        byte_view = memoryview(byte_array)
+        while len(byte_view) > 0:
+            self._make_space()
+            number_of_bytes = min(len(byte_view), len(self._buffer) - self._end)
+            self._buffer[self._end:self._end+number_of_bytes] = byte_view[:number_of_bytes]
+            self._end += number_of_bytes
+            byte_view = byte_view[number_of_bytes:]
+            frames.append(self.decode())
+        return b"".join(frames)
+
+    def decode(self):
+        """ cuts all complete frames out of the buffered bytes, alignment padding is removed
+        and the stream is resynchronized if a frame has an unknown header or a suspicious time
+
+        @return: (bytes) all complete frames, N*9 bytes, can be empty
+        """
+        buffer = self._buffer
+        segments = []
+        start = self._start
+        end = self._end
+        while start < end:
+            if buffer[start] == ALIGNMENT_BYTE:
+                # skip the alignment padding
+                self._padding += 1
+                start += 1
+                continue
+            if self._padding > 0:
+                self._end_of_padding()
+            # the headers of all complete frames, the first unknown header ends the good frames
+            stop = start + ((end - start) // FRAME_SIZE) * FRAME_SIZE
+            if stop == start:
+                break
+            invalid_header = INVALID_HEADER_PATTERN.search(buffer[start:stop:FRAME_SIZE])
+            if invalid_header is not None:
+                stop = start + invalid_header.start()*FRAME_SIZE
+            if stop > start:
+                stop = self._check_times(start, stop)
+            if stop == start:
+                # the stream slipped, continue at the next offset that looks like a frame boundary
+                offset = self._resynchronize(start, end)
+                if offset is None:
+                    break
+                start = offset
+                continue
+            if self._slip_start is not None:
+                self._end_of_slip()
+            segments.append(bytes(buffer[start:stop]))
+            start = stop
+        self._start = start
+        if not segments:
+            return b""
+        frames = segments[0] if len(segments) == 1 else b"".join(segments)
+        self._frames += len(frames) // FRAME_SIZE
+        return frames
+
+    def _check_times(self, start, stop):
+        """ checks that the times of the frames between start and stop (all with known headers) are consistent
+
+        the uC sends its packets in the order they were created, so the time from one frame to the next
+        only moves forward, and in a stream of packets not far. a frame more than TIME_WINDOW_US after
+        or TIME_TOLERANCE_US before the frame before it is suspicious, a slipped stream reads the time
+        shifted by whole bytes.
+        blocks of TIME_CHECK_FRAMES frames are checked at once, frame by frame only if a block is not
+        sorted or spans more than TIME_WINDOW_US.
+
+        @return: (int) the offset of the first suspicious frame, stop if there is none
+        """
+        buffer = self._buffer
+        previous_time = self._previous_time
+        offset = start
+        while offset < stop:
+            if stop - offset >= TIME_CHECK_FRAMES*FRAME_SIZE and previous_time is not None:
+                times = TIME_CHECK_STRUCT.unpack_from(buffer, offset)
+                if previous_time <= times[0] and times[-1] - previous_time <= TIME_WINDOW_US and list(times) == sorted(times):
+                    previous_time = times[-1]
+                    offset += TIME_CHECK_FRAMES*FRAME_SIZE
+                    continue
+                block_stop = offset + TIME_CHECK_FRAMES*FRAME_SIZE
+            else:
+                block_stop = stop
+            while offset < block_stop:
+                header = buffer[offset]
+                if header == IN_SET_TIME and SET_TIME_STRUCT.unpack_from(buffer, offset+5)[0] != 0:
+                    # the uC clock restarts at -offset, the value of the confirmation is the offset
+                    time, value = SET_TIME_STRUCT.unpack_from(buffer, offset+1)
+                    if (time + value) & 0xffffffff > TIME_TOLERANCE_US:
+                        self._previous_time = previous_time
+                        return offset
+                    previous_time = time
+                # the free spot reports are send directly, they can overtake the packets waiting in the output buffer of the uC
+                elif HEADER_KIND[header] != KIND_ERROR and header != OUT_FREE_INSTRUCTION_SPOTS:
+                    time = TIME_STRUCT.unpack_from(buffer, offset+1)[0]
+                    if previous_time is not None and TIME_WINDOW_US < (time - previous_time) & 0xffffffff < (1 << 32) - TIME_TOLERANCE_US:
+                        self._previous_time = previous_time
+                        return offset
+                    # after the stop confirmation (value 0) the uC clock continues as time since the start of the uC
+                    previous_time = time if header != IN_SET_TIME else None
+                offset += FRAME_SIZE
+        self._previous_time = previous_time
+        return stop
+
+    def _resynchronize(self, start, end):
+        """ searches the frame boundary at or after the frame at start, which has an unknown header or a suspicious time
+
+        the next boundary is one of the 9 offsets after start (or start itself if only the time was suspicious,
+        e.g. after a long pause), every offset is checked for the run of frames (up to RESYNC_FRAMES) with known
+        headers and consistent times that follow it, of the long runs the one with the smallest time steps wins,
+        an alignment padding is always a boundary.
+
+        @return: (int or None) the offset to continue decoding at, bytes before it are discarded,
+            None if there are not enough bytes to decide yet
+        """
+        buffer = self._buffer
+        if end - start < RESYNC_MIN_FRAMES*FRAME_SIZE:
+            previous_time = self._previous_time
+            stop = start + ((end - start) // FRAME_SIZE) * FRAME_SIZE
+            if previous_time is not None and (start == self._burst_start or stop == end) and stop > start and \
+                    INVALID_HEADER_PATTERN.search(buffer[start:stop:FRAME_SIZE]) is None and \
+                    (TIME_STRUCT.unpack_from(buffer, start+1)[0] - previous_time) & 0xffffffff < 1 << 31:
+                # the time only jumped forward at the first packet received after everything before was decoded, or at a packet
+                # followed only by whole frames, e.g. a short burst after a pause: on a quiet link nothing follows it, so its packets
+                # are not held back until RESYNC_MIN_FRAMES arrived, if all their headers are known and their times are consistent
+                # among themselves. bytes lost in a slip leave a part of a frame at the end in most cases, which still waits
+                self._previous_time = TIME_STRUCT.unpack_from(buffer, start+1)[0]
+                consistent = self._check_times(start + FRAME_SIZE, stop) == stop
+                self._previous_time = None if consistent else previous_time
+                if consistent:
+                    return start
+            # wait for more bytes
+            return None
+        best_offset = None
+        candidates = []
+        first_offset = start if buffer[start] in VALID_HEADERS else start + 1
+        for offset in range(first_offset, min(start + FRAME_SIZE, end - FRAME_SIZE) + 1):
+            if buffer[offset:offset+FRAME_SIZE] == PADDING_FRAME:
+                best_offset = offset
+                break
+            stop = min(offset + ((end - offset) // FRAME_SIZE) * FRAME_SIZE, offset + RESYNC_FRAMES*FRAME_SIZE)
+            invalid_header = INVALID_HEADER_PATTERN.search(buffer[offset:stop:FRAME_SIZE])
+            if invalid_header is not None:
+                valid_stop = offset + invalid_header.start()*FRAME_SIZE
+            else:
+                valid_stop = stop
+            self._previous_time = None
+            valid_stop = self._check_times(offset, valid_stop)
+            frames = (valid_stop - offset) // FRAME_SIZE
+            run = frames
+            # the run reaches the end of the checked bytes or an alignment padding
+            if valid_stop == stop or (valid_stop < end and buffer[valid_stop] == ALIGNMENT_BYTE):
+                run += 1
+            if run > 0:
+                time_span = 0
+                if frames > 1:
+                    time_span = (TIME_STRUCT.unpack_from(buffer, valid_stop-FRAME_SIZE+1)[0] - \
+                        TIME_STRUCT.unpack_from(buffer, offset+1)[0]) & 0xffffffff
+                candidates.append((offset, run, time_span / max(1, frames - 1)))
+        if best_offset is None and candidates:
+            # every offset with a long enough run is a candidate, the one whose times increase the least per frame wins,
+            # a wrong offset reads the time shifted by whole bytes (or with bytes of the value), which makes the time steps larger,
+            # the run of the right offset can be cut short by the next damage in the stream
+            min_run = min(max(candidate[1] for candidate in candidates), 2*RESYNC_MIN_FRAMES)
+            best_offset = min((candidate for candidate in candidates if candidate[1] >= min_run),
+                              key=lambda candidate: candidate[2])[0]
+        self._previous_time = None
+        if best_offset is None:
+            # no offset starts a valid frame, the next boundary is further away
+            best_offset = start + FRAME_SIZE
+        if best_offset == start:
+            # the stream did not slip, the times just jumped
+            return start
+        if self._slip_start is None:
+            self._slip_start = monotonic()
+            self._slips += 1
+        self._discarded += best_offset - start
+        logging.warning("received stream slipped, resynchronized after discarding "+str(best_offset - start)+" bytes")
+        return best_offset
+
+    def _end_of_slip(self):
+        """ records the recovery time of a slip, when the first frame after it is accepted
+        """
+        recovery_time = monotonic() - self._slip_start
+        self._recovery_time += recovery_time
+        self._max_recovery_time = max(self._max_recovery_time, recovery_time)
+        self._slip_start = None
+
+    def _end_of_padding(self):
+        """ checks the length of the alignment padding that just ended, the uC pads with whole frames
+        """
+        if self._padding % FRAME_SIZE != 0:
+            logging.warning("outgoing uC alignment needed, shifted by "+str(self._padding % FRAME_SIZE)+" bytes")
+        else:
+            logging.debug("alignment sucesss - no incoming alignment error")
+        self._alignments += 1
+        self._padding = 0
+        # the uC might have been reset, its clock restarted
+        self._previous_time = None
+
+    def _make_space(self):
+        """ moves the undecoded rest to the front of the buffer if the free space at the end runs low, called before bytes are added
+        """
+        if self._start == self._end:
+            self._start = 0
+            self._end = 0
+            # the bytes added next start a new burst
+            self._burst_start = 0
+        elif len(self._buffer) - self._end < FRAME_SIZE or self._start > len(self._buffer) // 2:
+            rest = self._end - self._start
+            self._buffer[:rest] = self._buffer[self._start:self._end]
+            if self._burst_start is not None:
+                self._burst_start = self._burst_start - self._start if self._burst_start >= self._start else None
+            self._start = 0
+            self._end = rest
+
+    def pending(self):
+        """ getter method for the number of received bytes that are not yet a complete frame
+        """
+        return self._end - self._start
+
+    def reset(self):
+        """ drops all buffered bytes, used after the communication was realigned
+        """
+        self._start = 0
+        self._end = 0
+        self._padding = 0
+        self._slip_start = None
+        self._previous_time = None
+        self._burst_start = None
+
+    def frames(self):
+        """ getter method for the number of decoded frames
+        """
+        return self._frames
+
+    def count_frames(self, number_of_frames):
+        """ counts frames that were decoded by an other decoder, e.g. the one in the child process of process_io
+        """
+        self._frames += number_of_frames
+
+    def alignments(self):
+        """ getter method for the number of alignment paddings that were removed
+        """
+        return self._alignments
+
+    def reads(self):
+        """ getter method for the number of reads from the connection
+        """
+        return self._reads
+
+    def slips(self):
+        """ getter method for the number of times the stream slipped and was resynchronized
+        """
+        return self._slips
+
+    def discarded_bytes(self):
+        """ getter method for the number of bytes discarded while resynchronizing
+        """
+        return self._discarded
+
+    def recovery_time(self):
+        """ getter method for the time from detecting a slip to the first accepted frame after it
+
+        @return: (float, float) the total and the maximum recovery time in seconds
+        """
+        return (self._recovery_time, self._max_recovery_time)
+
+    def __str__(self):
+        return "[FrameDecoder]: frames = "+str(self._frames)+", reads = "+str(self._reads)+", alignments = "+str(self._alignments)+", pending bytes = "+str(self.pending())+\
+            ", slips = "+str(self._slips)+", discarded bytes = "+str(self._discarded)+", max recovery time = "+"{:.1f}us".format(self._max_recovery_time*1e6)
@@ -215,10 +215,11 @@ class Interface_Async:
             @return: tuple of the of data list and their timestamp list - index matched
         """
         self.update()
-        data = self.__data_from_chip
-        time = self.__data_from_chip_times
-        self.__data_from_chip = []
-        self.__data_from_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_from_chip
+            time = self.__data_from_chip_times
+            self.__data_from_chip = []
+            self.__data_from_chip_times = []
         return (data, time)
     
     def data_to_chip_and_clear(self):
@@ -233,10 +234,11 @@ class Interface_Async:
             @return: tuple of the of data list and their timestamp list (of when the uC send them) - index matched
         """
         self.update()
-        data = self.__data_to_chip
-        time = self.__data_to_chip_times
-        self.__data_to_chip = []
-        self.__data_to_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_to_chip
+            time = self.__data_to_chip_times
+            self.__data_to_chip = []
+            self.__data_to_chip_times = []
         return (data, time)
     
     def errors(self):
@@ -336,10 +338,10 @@ class Interface_Async:
         else:
             # send the configuration to the uC as individual packets
             if mode == "4Phase_Chigh_Dhigh":
-                self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_TYPE, value = 0, time = time))
+                self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_TYPE, 0, time = time)
                 self.__status = 1
             elif mode == "4Phase_Clow_Dhigh":
-                self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_TYPE, value = 1, time = time))
+                self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_TYPE, 1, time = time)
                 self.__status = 1
             elif mode == "2Phase_Chigh_Dhigh":
                 logging.warning("pin mode not implmented yet")
@@ -348,21 +350,21 @@ class Interface_Async:
                 logging.warning("pin mode not implmented yet")
                 return
             elif mode == "4Phase_MCP23017":
-                self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_TYPE, value = 20, time = time))
+                self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_TYPE, 20, time = time)
                 self.__status = 1
             else:
                 logging.error("pin.activate got wrong type "+str(pin_mode)+" only 4Phase_Chigh_Dhigh, 4Phase_Clow_Dhigh, 2Phase_Chigh_Dhigh, 2Phase_Clow_Dhigh are allowed, more modes implemted on request")
                 return
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_ACK, value = ack_pin, time = time))
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_REQ, value = req_pin, time = time))
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_WIDTH, value = data_width, time = time))
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_ACK, ack_pin, time = time)
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_REQ, req_pin, time = time)
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_WIDTH, data_width, time = time)
             for pin in range(data_width):
-                self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader(pin), value = data_pins[pin], time = time))
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_REQ_DELAY, value = req_delay, time = time))
-            # after all configuration is send, send activation request
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_ACTIVE, time = time))
-            # set the status to pending confirmation
+                self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader(pin), data_pins[pin], time = time)
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_REQ_DELAY, req_delay, time = time)
+            # set the status to pending confirmation, before the confirmation can arrive
             self.__status = 1
+            # after all configuration is send, send activation request
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_ACTIVE, 0, time = time)
 
     def send(self, word, time = 0):
         """ send a word to the chip
@@ -377,5 +379,19 @@ class Interface_Async:
         else:
             logging.error("AER to chip interface "+str(self.__header[1])+" is reading interface - word is not sent.")
 
+    def on_events(self, callback, min_batch=1, max_latency_us=None):
+        """ register a callback for the words of this interface (recived from the chip, or send to the chip by the uC), 
+            it is called by the communication thread as they arrive, without waiting for update()
+            will be called with 2 lists: one with the words and one with their times, linked by index
+
+            the words are still recorded by the interface, see data_from_chip and data_to_chip
+
+            @param callback: function called with (words, times)
+            @param min_batch: the number of words at which the callback is called
+            @param max_latency_us: the maximum time in us a recived word waits for the batch to fill up, None means it waits for min_batch words
+            @return: the subscription, to cancel it with uC_api.unsubscribe
+        """
+        return self.__api.subscribe(self.__header[1], callback, min_batch, max_latency_us)
+
     def update(self):
         self.__api.update_state()
@@ -135,10 +135,11 @@ class Interface_I2C:
         @return: ([data_from_chip], [data_from_chip_times]) where data_from_chip is the data recived from the chip, and data_from_chip_times is the time it was processed by the uC
         """
         self.update()
-        data = self.__data_from_chip
-        time = self.__data_from_chip_times
-        self.__data_from_chip = []
-        self.__data_from_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_from_chip
+            time = self.__data_from_chip_times
+            self.__data_from_chip = []
+            self.__data_from_chip_times = []
         return (data, time)
     
     def data_to_chip_and_clear(self):
@@ -153,10 +154,11 @@ class Interface_I2C:
         @return: ([data_to_chip], [data_to_chip_times]) where data_to_chip is the data send to the chip, and data_to_chip_times is the time it was processed by the uC
         """
         self.update()
-        data = self.__data_to_chip
-        time = self.__data_to_chip_times
-        self.__data_to_chip = []
-        self.__data_to_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_to_chip
+            time = self.__data_to_chip_times
+            self.__data_to_chip = []
+            self.__data_to_chip_times = []
         return (data, time)
     
     def errors(self):
@@ -263,8 +265,8 @@ class Interface_I2C:
             else:
                 self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_WIDTH, value=number_of_bytes,time = time))
             # and activate            
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_ACTIVE,time = time))
             self.__status = 1
+            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_ACTIVE,time = time))
 
     def send_write(self,device_address, register_address, word, time = 0):
         """ Send a write request on the I2C interface
@@ -287,6 +289,20 @@ class Interface_I2C:
         # we dont check the status here anymore as the uC will report the error anyway
         self.__api.send_packet(DataI2CPacket(self.__header[1], device_address=device_address, register_address=register_address,read=1,value=word,time=time))
 
+    def on_events(self, callback, min_batch=1, max_latency_us=None):
+        """ Registers a callback for the data recived from the chip, it is called by the communication thread as the data arrives, without waiting for update()
+
+        will be called with 2 lists: one with the data as in data_from_chip, (read, device_address, register_address, value), and one with the times, linked by index
+
+        the data is still recorded by the interface, see data_from_chip
+        @param callback: function called with (data, times)
+        @param min_batch: the number of words at which the callback is called
+        @param max_latency_us: the maximum time in us a recived word waits for the batch to fill up, None means it waits for min_batch words
+        @return: the subscription, to cancel it with uC_api.unsubscribe
+        """
+        return self.__api.subscribe(self.__header[2], callback, min_batch, max_latency_us,
+                                    value_of=lambda packet: (packet.read(), packet.device_address(), packet.register_address(), packet.value()))
+
     def update(self):
         """ update the data repersentation of the API object
         """
@@ -127,18 +127,20 @@ class Interface_PIN:
 
     def data_from_chip_and_clear(self):
         self.update()
-        data = self.__data_from_chip
-        time = self.__data_from_chip_times
-        self.__data_from_chip = []
-        self.__data_from_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_from_chip
+            time = self.__data_from_chip_times
+            self.__data_from_chip = []
+            self.__data_from_chip_times = []
         return (data, time)
     
     def data_to_chip_and_clear(self):
         self.update()
-        data = self.__data_to_chip
-        time = self.__data_to_chip_times
-        self.__data_to_chip = []
-        self.__data_to_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_to_chip
+            time = self.__data_to_chip_times
+            self.__data_to_chip = []
+            self.__data_to_chip_times = []
         return (data, time)
     
     def errors(self):
@@ -212,15 +214,15 @@ class Interface_PIN:
             logging.warning("Pin "+str(self.__pin_id)+" is already activated or waiting activation, doing nothing")
         else:
             if pin_mode == "OUTPUT":
-                self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_OUTPUT, value=self.__pin_id, time = time))
                 self.__status = 1
                 self.__type_pending = pin_mode
+                self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_OUTPUT, self.__pin_id, time = time)
                 sleep(0.001)
                 return
             elif pin_mode == "INPUT":
-                self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_INPUT, value=self.__pin_id,time = time))
                 self.__status = 1
                 self.__type_pending = pin_mode
+                self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_INPUT, self.__pin_id, time = time)
                 sleep(0.001)
                 return
             # in the future implement the following
@@ -242,10 +244,28 @@ class Interface_PIN:
         """
 
         # we dont check the status here anymore as the uC will report the error anyway
-        self.__api.send_packet(PinPacket(header = self.__header[1],pin_id=self.__pin_id , value = value, time = time))
+        self.__api.send_cached(PinPacket, self.__header[1], self.__pin_id, value, time = time)
 
 
 
+    def on_events(self, callback, min_batch=1, max_latency_us=None):
+        """on_events registers a callback for the values recoded by the uC on this pin (INPUT mode),
+        it is called by the communication thread as they arrive, without waiting for update,
+        with 2 lists: one with the values and one with the times when they were recorded, linked by index
+
+        the values are still recorded by the pin, see data_from_chip
+
+        :param callback: called with (values, times)
+        :type callback: callable
+        :param min_batch: number of values at which the callback is called, defaults to 1
+        :type min_batch: int, optional
+        :param max_latency_us: maximum time in us a received value waits for the batch to fill up, defaults to None (wait for min_batch values)
+        :type max_latency_us: int, optional
+        :return: the subscription, to cancel it with uC_api.unsubscribe
+        :rtype: subscription.Subscription
+        """
+        return self.__api.subscribe(self.__header[3:5], callback, min_batch, max_latency_us, pin_id=self.__pin_id)
+
     def update(self):
         """ update the internal state representation of the pin object
         """
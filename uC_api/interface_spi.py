@@ -150,18 +150,20 @@ class Interface_SPI:
 
     def data_from_chip_and_clear(self):
         self.update()
-        data = self.__data_from_chip
-        time = self.__data_from_chip_times
-        self.__data_from_chip = []
-        self.__data_from_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_from_chip
+            time = self.__data_from_chip_times
+            self.__data_from_chip = []
+            self.__data_from_chip_times = []
         return (data, time)
     
     def data_to_chip_and_clear(self):
         self.update()
-        data = self.__data_to_chip
-        time = self.__data_to_chip_times
-        self.__data_to_chip = []
-        self.__data_to_chip_times = []
+        with self.__api.state_lock:
+            data = self.__data_to_chip
+            time = self.__data_to_chip_times
+            self.__data_to_chip = []
+            self.__data_to_chip_times = []
         return (data, time)
     
     def errors(self):
@@ -249,14 +251,12 @@ class Interface_SPI:
         if self.__status >= 1:
             logging.warning("SPI interface "+str(self.__header[0])+" is already activated or waiting activation, doing nothing")
         else:
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_TYPE, \
-                value=( 0 if mode == "SPI_MODE0" else (1 if mode == "SPI_MODE1" else (2 if mode == "SPI_MODE2" else 3))),time = time))
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_SPEED_CLASS,value=speed_class,time = time))
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_BYTE_ORDER, \
-                value=(1 if order == "MSBFIRST" else 0),time = time))
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_WIDTH,value=number_of_bytes,time = time))
-            self.__api.send_packet(ConfigPacket(header = self.__header[0], config_header = ConfigSubHeader.CONF_ACTIVE,time = time))
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_TYPE, ( 0 if mode == "SPI_MODE0" else (1 if mode == "SPI_MODE1" else (2 if mode == "SPI_MODE2" else 3))), time = time)
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_SPEED_CLASS, speed_class, time = time)
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_BYTE_ORDER, (1 if order == "MSBFIRST" else 0), time = time)
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_WIDTH, number_of_bytes, time = time)
             self.__status = 1
+            self.__api.send_cached(ConfigPacket, self.__header[0], ConfigSubHeader.CONF_ACTIVE, 0, time = time)
 
     def send(self, word, time = 0):
         """send send a word via this interface
@@ -270,6 +270,24 @@ class Interface_SPI:
         self.__api.send_packet(Data32bitPacket(header = self.__header[1], value = word, time = time))
 
 
+    def on_events(self, callback, min_batch=1, max_latency_us=None):
+        """on_events registers a callback for the data recoded by the uC from the device under test (DUT),
+        it is called by the communication thread as the data arrives, without waiting for update,
+        with 2 lists: one with the words and one with the times when they were recorded, linked by index
+
+        the data is still recorded by the interface, see data_from_chip
+
+        :param callback: called with (words, times)
+        :type callback: callable
+        :param min_batch: number of words at which the callback is called, defaults to 1
+        :type min_batch: int, optional
+        :param max_latency_us: maximum time in us a received word waits for the batch to fill up, defaults to None (wait for min_batch words)
+        :type max_latency_us: int, optional
+        :return: the subscription, to cancel it with uC_api.unsubscribe
+        :rtype: subscription.Subscription
+        """
+        return self.__api.subscribe(self.__header[2], callback, min_batch, max_latency_us)
+
     def update(self):
         """update updates the internal state form the uC
         """
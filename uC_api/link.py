@@ -0,0 +1,300 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import logging
+import struct
+import threading
+from collections import deque
+from time import monotonic
+
+"""
+state of the serial link to the uC that is shared by the reader and the writer thread.
+
+the writer sends timed packets only if the uC has free spots in its instruction buffer (credit),
+the reader receives the reports of the free spots from the uC and detects misalignment.
+everything else is owned by one of the two threads.
+
+credit prediction: every timed packet frees its spot when the uC executes it, so with an
+estimate of the uC clock the free spots can be predicted from the execution times of the
+send packets, without asking the uC. the estimate is corrected with every report of the uC.
+"""
+
+"""
+the uC clock is estimated this many us behind, to cover the USB latency and clock drift
+"""
+PREDICTION_MARGIN_US = 2000
+
+"""
+while predicting, the free spots are still requested from the uC after this many seconds without a report, to correct the prediction
+"""
+RECONCILE_INTERVAL = 1.0
+
+TIME_STRUCT = struct.Struct("<I")
+
+
+class LinkState:
+    """ credit and alignment state of one uC connection, all methods are thread safe
+    """
+    __slots__ = ("_lock", "_free_spots", "_spots_requested", "_last_sent_time", "_packets_sent",
+                 "_last_free_spots", "_experiment_running", "_realign_requested", "_closed",
+                 "_prediction", "_prediction_margin", "_in_flight", "_in_flight_packets", "_capacity",
+                 "_clock", "_last_report", "_sent_total", "_sent_at_request",
+                 "_requests", "_reports", "_predicted", "_occupancy_time", "_occupancy_sum", "_occupancy_update")
+
+    def __init__(self, prediction=True, prediction_margin=PREDICTION_MARGIN_US):
+        """ @param prediction: (bool) if the free spots are predicted from the execution times of the send packets (optional, default = True)
+            @param prediction_margin: (int) how many us the uC clock is estimated behind (optional, default = PREDICTION_MARGIN_US)
+        """
+        self._lock = threading.Lock()
+        # free spots in the instruction buffer of the uC, -1 until the uC reported them
+        self._free_spots = -1
+        self._spots_requested = False
+        # execution time of the last timed packet that was send
+        self._last_sent_time = 0
+        # timed packets send since the last report of the free spots
+        self._packets_sent = 0
+        self._last_free_spots = 0
+        self._experiment_running = 0
+        self._realign_requested = False
+        self._closed = False
+        self._prediction = prediction
+        self._prediction_margin = prediction_margin
+        # send timed packets that are not yet executed: [encoded packets, offset of the first not executed packet]
+        self._in_flight = deque()
+        self._in_flight_packets = 0
+        # size of the instruction buffer, the largest number of free spots the uC reported
+        self._capacity = 0
+        # (uC time in us, monotonic time in s) of the last clock sample, None if the uC clock does not run
+        self._clock = None
+        self._last_report = monotonic()
+        # the timed packets send so far, and at the time of the last request of the free spots
+        self._sent_total = 0
+        self._sent_at_request = 0
+        self._requests = 0
+        self._reports = 0
+        # spots that were freed by prediction
+        self._predicted = 0
+        # time weighted occupancy of the instruction buffer while the experiment runs
+        self._occupancy_time = 0.0
+        self._occupancy_sum = 0.0
+        self._occupancy_update = None
+
+    def free_spots(self):
+        """ getter method for the free spots in the instruction buffer of the uC, -1 if not yet reported
+        the spots of packets that are predicted to be executed are included
+        """
+        with self._lock:
+            if self._clock is not None and self._in_flight:
+                self._retire(self._estimated_uc_time(), True)
+            return self._free_spots
+
+    def spots_sent(self, byte_buffer):
+        """ called by the writer after it send timed packets
+
+        @param byte_buffer: (bytes-like) the encoded timed packets that were send, N*9 bytes sorted in time
+        """
+        number_of_packets = len(byte_buffer)//9
+        with self._lock:
+            self._update_occupancy()
+            self._free_spots -= number_of_packets
+            self._packets_sent += number_of_packets
+            self._sent_total += number_of_packets
+            self._last_sent_time = TIME_STRUCT.unpack_from(byte_buffer, len(byte_buffer)-8)[0]
+            if self._prediction:
+                self._in_flight.append([memoryview(byte_buffer), 0])
+                self._in_flight_packets += number_of_packets
+
+    def request_spots(self):
+        """ called by the writer if it has no free spots for the waiting timed packets
+
+        @return: (bool) True if the free spots need to be requested from the uC,
+            False if a request is still pending or spots are predicted to free up
+        """
+        with self._lock:
+            if self._spots_requested:
+                return False
+            # the spots of the packets in flight free up without asking, but correct the prediction regularly
+            if self._clock is not None and self._in_flight and monotonic() - self._last_report < RECONCILE_INTERVAL:
+                return False
+            self._spots_requested = True
+            self._sent_at_request = self._sent_total
+            self._requests += 1
+            return True
+
+    def next_free_in(self):
+        """ time until the next spot is predicted to free up
+
+        @return: (float or None) seconds until the oldest packet in flight is executed, None if nothing is predicted
+        """
+        with self._lock:
+            if self._clock is None or not self._in_flight:
+                return None
+            byte_buffer, offset = self._in_flight[0]
+            exec_time = TIME_STRUCT.unpack_from(byte_buffer, offset+1)[0]
+            return max(0.0, (exec_time - self._estimated_uc_time()) / 1e6)
+
+    def report_free_spots(self, free_spots, uc_time, waiting_on_pc):
+        """ called by the reader when the uC reports its free spots
+
+        @param free_spots: (int) the free spots in the instruction buffer of the uC
+        @param uc_time: (int) the time of the uC when it reported
+        @param waiting_on_pc: (int) the number of timed packets waiting to be send, for the log
+        """
+        with self._lock:
+            if uc_time > self._last_sent_time and self._experiment_running > 0:
+                logging.warning("Timing exec squewed, increase buffer size in firmware, last sent time: "+\
+                    str(self._last_sent_time)+" uC time: "+str(uc_time)+\
+                        "\npackets send: "+str(self._packets_sent)+" for free spots: "+str(self._last_free_spots))
+            else:
+                logging.debug("uC reports "+str(free_spots)+" free input queue spots at time "+\
+                    str(uc_time)+"\nwaiting on PC: "+str(waiting_on_pc)+\
+                        " with time starting from: "+str(self._last_sent_time)+\
+                        "\npackets send: "+str(self._packets_sent)+" for free spots: "+str(self._last_free_spots))
+            self._update_occupancy()
+            self._last_free_spots = free_spots
+            self._packets_sent = 0
+            self._capacity = max(self._capacity, free_spots)
+            # the packets executed before the report are already counted as free by the uC
+            if self._experiment_running > 0:
+                self._clock = (uc_time, monotonic())
+                self._retire(uc_time, False)
+            # packets send after the request might not have arrived at the uC when it reported
+            self._free_spots = free_spots - (self._sent_total - self._sent_at_request)
+            self._sent_at_request = self._sent_total
+            self._spots_requested = False
+            self._last_report = monotonic()
+            self._reports += 1
+
+    def set_experiment_running(self, experiment_running, uc_time=0):
+        """ called by the reader when the uC confirms a new experiment state
+
+        @param experiment_running: (int) the new experiment state, 0 is stopped
+        @param uc_time: (int) the time of the uC when the state changed (optional, default = 0)
+        """
+        with self._lock:
+            self._update_occupancy()
+            self._experiment_running = experiment_running
+            if experiment_running > 0:
+                # the uC clock restarts at -offset, which the uC reports wrapped around as unsigned 32 bit
+                if uc_time >= 1 << 31:
+                    uc_time -= 1 << 32
+                self._clock = (uc_time, monotonic()) if self._prediction else None
+            else:
+                # the uC drops all not executed timed packets when the experiment stops
+                self._clock = None
+                self._in_flight.clear()
+                self._in_flight_packets = 0
+                self._occupancy_update = None
+                if self._capacity > 0:
+                    self._free_spots = self._capacity
+
+    def _estimated_uc_time(self):
+        """ the estimated current time of the uC clock in us, with the safety margin
+        """
+        return self._clock[0] + int((monotonic() - self._clock[1]) * 1e6) - self._prediction_margin
+
+    def _retire(self, uc_time, free_spots):
+        """ removes the packets in flight that are executed at uc_time
+
+        @param free_spots: (bool) if the spots of the executed packets are added to the free spots
+        """
+        retired = 0
+        in_flight = self._in_flight
+        while in_flight:
+            entry = in_flight[0]
+            byte_buffer, offset = entry
+            while offset < len(byte_buffer) and TIME_STRUCT.unpack_from(byte_buffer, offset+1)[0] <= uc_time:
+                offset += 9
+                retired += 1
+            if offset < len(byte_buffer):
+                entry[1] = offset
+                break
+            in_flight.popleft()
+        if retired > 0:
+            self._in_flight_packets -= retired
+            if free_spots:
+                self._update_occupancy()
+                self._free_spots += retired
+                self._predicted += retired
+
+    def _update_occupancy(self):
+        """ integrates the occupancy of the instruction buffer over time while the experiment runs
+        """
+        now = monotonic()
+        if self._occupancy_update is not None and self._capacity > 0:
+            duration = now - self._occupancy_update
+            self._occupancy_time += duration
+            self._occupancy_sum += duration * min(1.0, max(0.0, (self._capacity - self._free_spots) / self._capacity))
+        self._occupancy_update = now if (self._experiment_running > 0 and self._capacity > 0) else None
+
+    def occupancy(self):
+        """ getter method for the mean occupancy of the instruction buffer of the uC while the experiment runs
+
+        @return: (float) 0.0 (empty) - 1.0 (full), 0.0 if nothing was recorded
+        """
+        with self._lock:
+            self._update_occupancy()
+            return self._occupancy_sum / self._occupancy_time if self._occupancy_time > 0 else 0.0
+
+    def requests(self):
+        """ getter method for the number of requests of the free spots send to the uC
+        """
+        return self._requests
+
+    def reports(self):
+        """ getter method for the number of reports of the free spots received from the uC
+        """
+        return self._reports
+
+    def predicted(self):
+        """ getter method for the number of spots that were freed by prediction, without a report of the uC
+        """
+        return self._predicted
+
+    def in_flight(self):
+        """ getter method for the number of send timed packets that are not yet executed (predicted)
+        """
+        return self._in_flight_packets
+
+    def request_realign(self):
+        """ called by the reader if the communication needs to be realigned, the writer sends the alignment
+        """
+        self._realign_requested = True
+
+    def take_realign_request(self):
+        """ called by the writer, returns True once for every realign request
+        """
+        with self._lock:
+            realign_requested = self._realign_requested
+            self._realign_requested = False
+            return realign_requested
+
+    def close(self):
+        """ marks the connection as closed, so the reader stops and the writer closes the connection
+        """
+        self._closed = True
+
+    def closed(self):
+        """ getter method for the closed state of the connection
+        """
+        return self._closed
+
+    def __str__(self):
+        return "[LinkState]: free spots on uC = "+str(self._free_spots)+" of "+str(self._capacity)+", requested = "+str(self._spots_requested)+\
+            ", last sent time = "+str(self._last_sent_time)+", experiment running = "+str(self._experiment_running)+\
+            ", in flight = "+str(self._in_flight_packets)+", predicted free = "+str(self._predicted)+\
+            ", requests = "+str(self._requests)+", reports = "+str(self._reports)+", occupancy = "+"{:.1%}".format(self.occupancy())
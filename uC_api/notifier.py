@@ -0,0 +1,95 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import select
+import socket
+
+"""
+wake up of the communication thread.
+
+the communication threads block in select on the notifier (and the serial connection),
+e.g. the main thread calls notify() after it placed something in a write buffer.
+a socket pair is used, because sockets can be used with select on all platforms.
+"""
+
+"""
+polling interval if the serial connection can not be used with select (e.g. on windows)
+"""
+FALLBACK_POLL_INTERVAL = 0.0005
+
+
+class Notifier:
+    """ self wake up (self-pipe) for a thread waiting in select
+    """
+    __slots__ = ("_receiver", "_sender", "_pending")
+
+    def __init__(self):
+        self._receiver, self._sender = socket.socketpair()
+        self._receiver.setblocking(False)
+        self._sender.setblocking(False)
+        # only one wake up byte is in flight, so the socket buffer can not fill up
+        self._pending = False
+
+    def notify(self):
+        """ wakes up the waiting thread, can be called from any thread
+        """
+        if not self._pending:
+            self._pending = True
+            try:
+                self._sender.send(b"\x00")
+            except OSError:
+                # the socket buffer is full or the notifier is closed, the thread is woken up anyway
+                pass
+
+    def clear(self):
+        """ consumes the wake up, needs to be called before the waiting thread checks for new work
+        """
+        try:
+            while self._receiver.recv(4096):
+                pass
+        except OSError:
+            pass
+        # only after the socket is empty, a notify() while it is drained would otherwise leave no byte to wake up
+        # the thread, and every later notify() would be skipped
+        self._pending = False
+
+    def wait(self, timeout, file_descriptor=None):
+        """ blocks until notify() is called, the file descriptor is readable or the timeout passed
+
+        @param timeout: (float) the maximum time to wait in seconds
+        @param file_descriptor: (int or None) the file descriptor of the connection to wait on as well (optional, default = None)
+        @return: (bool) True if woken up by notify()
+        """
+        if file_descriptor is None:
+            readable = select.select([self._receiver], [], [], timeout)[0]
+        else:
+            readable = select.select([self._receiver, file_descriptor], [], [], timeout)[0]
+        if self._receiver in readable:
+            self.clear()
+            return True
+        return False
+
+    def fileno(self):
+        """ getter method for the file descriptor that becomes readable on notify()
+        """
+        return self._receiver.fileno()
+
+    def close(self):
+        """ closes the socket pair
+        """
+        self._receiver.close()
+        self._sender.close()
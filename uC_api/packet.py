@@ -18,15 +18,29 @@
 
 import logging
 import struct
+from collections import Counter, OrderedDict
 from .header import *
 
+"""
+precompiled struct layouts of the 9 byte packets, see datatypes.h
+"""
+DATA32BIT_STRUCT = struct.Struct("<BII")
+DATAI2C_STRUCT = struct.Struct("<BIBBBB")
+PIN_STRUCT = struct.Struct("<BIBBBB")
+CONFIG_STRUCT = struct.Struct("<BIBBBB")
+ERROR_STRUCT = struct.Struct("<BBIBBB")
+
 
 class Packet:
     """ 
     Packet class to be used as a base class for all packets acting as an interface.
     it contains the static method from_bytearray to construct a packet from a bytearray
     and chooses the correct packet type depending on the header
+
+    all packet classes use __slots__ to keep the memory footprint per packet small
     """
+    __slots__ = ("_header", "_exec_time")
+
     def __init__(self):
         self._header = 0
         self._exec_time = 0
@@ -40,36 +54,13 @@ class Packet:
             @return: the constructed packet of the coresponing sub type
         """
         try:
-            unpacked = struct.unpack("<BII", byte_array)
-            # from pyhton 3.12 the in operator can be used to do the same check
-            # until then:
-            try:
-                header = Data32bitHeader(unpacked[0]);
-                logging.debug("detected: Data32bit : "+ str(header))
-                return Data32bitPacket.from_bytearray(byte_array)
-            except ValueError:
-                try:
-                    header = DataI2CHeader(unpacked[0]);
-                    logging.debug("detected: DataI2C : "+ str(header))
-                    return DataI2CPacket.from_bytearray(byte_array)
-                except ValueError:
-                    try:
-                        header = PinHeader(unpacked[0]);
-                        logging.debug("detected: Pin : "+ str(header))
-                        return PinPacket.from_bytearray(byte_array)
-                    except ValueError:
-                        try:
-                            header = ConfigMainHeader(unpacked[0]);
-                            logging.debug("detected: Config Main : "+ str(header))
-                            return ConfigPacket.from_bytearray(byte_array)
-                        except ValueError:
-                            try:
-                                header = ErrorHeader(unpacked[0]);
-                                logging.debug("detected: Error : "+ str(header))
-                                return ErrorPacket.from_bytearray(byte_array)
-                            except ValueError:
-                                logging.error("Header "+ str(unpacked[0]) +" is not a valid header, Packet:" + str(byte_array) +" "+ str(unpacked[0]) +" "+ str(unpacked[1]) +" "+ str(unpacked[2]))
-                                raise ValueError("Header "+ str(unpacked[0]) +" is not a valid header")
+            # one lookup in the header table instead of trying all header classes
+            entry = HEADER_TABLE[byte_array[0]]
+            if entry is None:
+                count_unknown_header(byte_array[0], byte_array)
+                return None
+            logging.debug("detected: %s : %s", entry[0].__name__, entry[1])
+            return entry[0].from_bytearray(byte_array)
         except Exception as e:
             logging.error(e)
     def header(self):
@@ -115,10 +106,11 @@ class Packet:
         """check_and_log 
         logs the packet if the header is in the logging lists
         """
-        if self._header in LOGGING_WARNING_LIST:
-            logging.warning(str(self))
-        if self._header in LOGGING_INFO_LIST:
-            logging.info(str(self))
+        if LOGGING_SUBSCRIPTIONS and self._header in LOGGING_SUBSCRIPTIONS:
+            if self._header in LOGGING_WARNING_LIST:
+                logging.warning(str(self))
+            if self._header in LOGGING_INFO_LIST:
+                logging.info(str(self))
         #if self._header in LOGGING_ERROR_LIST:
         #    logging.error(str(self))
 
@@ -126,6 +118,8 @@ class Data32bitPacket(Packet):
     """ The Data32bitPacket is used to send 32bit data instructions to the uC
         all availible instructions are defined in the Data32bitHeader  
     """
+    __slots__ = ("_value",)
+    _HEADERS = dict((int(header), header) for header in Data32bitHeader)
 
     def __init__(self, header, value=0, time=0):
         """ constructor for the Data32bitPacket
@@ -145,8 +139,8 @@ class Data32bitPacket(Packet):
         return self._value
 
     def set_header(self, header):
-        if (header in Data32bitHeader):
-            self._header=header
+        if (header in DATA32BIT_HEADERS):
+            self._header=Data32bitHeader(header)
         else:
             logging.error("header "+str(header)+" is not a valid header")
 
@@ -170,10 +164,31 @@ class Data32bitPacket(Packet):
         @return: Data32bitPacket
         @raise Exception: if package construction fails
         """
-        unpacked = struct.unpack("<BII", byte_array)
-        return Data32bitPacket(header=Data32bitHeader(unpacked[0]),
-        value = unpacked[2],
-        time = unpacked[1])
+        return Data32bitPacket.from_unpacked(DATA32BIT_STRUCT.unpack(byte_array))
+
+    @classmethod
+    def from_unpacked(cls, unpacked):
+        """
+        trusted constructor for packets decoded from the wire, skips all range checks
+        @param unpacked: (tuple) the fields unpacked with DATA32BIT_STRUCT
+        @return: Data32bitPacket
+        @raise KeyError: if the header is not a Data32bitHeader
+        """
+        packet = cls.__new__(cls)
+        packet.fill_unpacked(unpacked)
+        return packet
+
+    def fill_unpacked(self, unpacked):
+        """
+        overwrites all fields with trusted decoded ones, used to reuse packet objects from a PacketPool
+        @param unpacked: (tuple) the fields unpacked with DATA32BIT_STRUCT
+        @raise KeyError: if the header is not a Data32bitHeader
+        """
+        self._header = self._HEADERS[unpacked[0]]
+        self._exec_time = unpacked[1]
+        self._value = unpacked[2]
+        if LOGGING_SUBSCRIPTIONS:
+            self.check_and_log()
 
     
 class DataI2CPacket(Packet): 
@@ -181,6 +196,9 @@ class DataI2CPacket(Packet):
         and all types which need 3x 8bit values instread of 1x 32bit value
         all availible instructions are defined in the DataI2CHeader
     """ 
+    __slots__ = ("_value_ls", "_value_ms", "_device_address", "_register_address", "_read")
+    _HEADERS = dict((int(header), header) for header in DataI2CHeader)
+
     def __init__(self, header, device_address, register_address, read=False, value=0, time=0):
         self.set_header(header)
         self.set_value(value)
@@ -218,8 +236,8 @@ class DataI2CPacket(Packet):
         """ setter method for the header attribute
             @param header: (DataI2CHeader or uint8) the header of the packet
         """
-        if (header in DataI2CHeader):
-            self._header=header
+        if (header in DATAI2C_HEADERS):
+            self._header=DataI2CHeader(header)
         else:
             logging.error("header "+str(header)+" is not a valid header")
 
@@ -275,13 +293,35 @@ class DataI2CPacket(Packet):
         @return: DataI2CPacket
         @raise Exception: if package construction fails
         """
-        unpacked = struct.unpack("<BIBBBB", byte_array)
-        print(unpacked)
-        print((unpacked[4] << 8) | unpacked[5])
-        return DataI2CPacket(header=DataI2CHeader(unpacked[0]),
-        device_address=unpacked[2]>>1,
-        register_address=unpacked[3], read=unpacked[2] & 0x1, value=((unpacked[4] << 8) | unpacked[5]),
-        time = unpacked[1])
+        return DataI2CPacket.from_unpacked(DATAI2C_STRUCT.unpack(byte_array))
+
+    @classmethod
+    def from_unpacked(cls, unpacked):
+        """
+        trusted constructor for packets decoded from the wire, skips all range checks
+        @param unpacked: (tuple) the fields unpacked with DATAI2C_STRUCT
+        @return: DataI2CPacket
+        @raise KeyError: if the header is not a DataI2CHeader
+        """
+        packet = cls.__new__(cls)
+        packet.fill_unpacked(unpacked)
+        return packet
+
+    def fill_unpacked(self, unpacked):
+        """
+        overwrites all fields with trusted decoded ones, used to reuse packet objects from a PacketPool
+        @param unpacked: (tuple) the fields unpacked with DATAI2C_STRUCT
+        @raise KeyError: if the header is not a DataI2CHeader
+        """
+        self._header = self._HEADERS[unpacked[0]]
+        self._exec_time = unpacked[1]
+        self._device_address = unpacked[2] >> 1
+        self._read = unpacked[2] & 0x1
+        self._register_address = unpacked[3]
+        self._value_ms = unpacked[4]
+        self._value_ls = unpacked[5]
+        if LOGGING_SUBSCRIPTIONS:
+            self.check_and_log()
 
 
 """
@@ -291,6 +331,9 @@ class PinPacket(Packet):
     """ The PinPacket is used to comunicate pin instructions with the uC
         all availible instructions are defined in the PinHeader
     """
+    __slots__ = ("_pin_id", "_value")
+    _HEADERS = dict((int(header), header) for header in PinHeader)
+
     def __init__(self, header, pin_id, value=0, time=0):
         """ constructor for the PinPacket
         @param header: (PinHeader or UINT8) the header of the packet
@@ -320,8 +363,8 @@ class PinPacket(Packet):
         """ setter method for the header attribute
             @param header: (PinHeader or uint8) the header of the packet
         """
-        if (header in PinHeader):
-            self._header=header
+        if (header in PIN_HEADERS):
+            self._header=PinHeader(header)
         else:
             logging.error("header "+str(header)+" is not a valid header")
 
@@ -361,11 +404,32 @@ class PinPacket(Packet):
         @return: PinPacket
         @raise Exception: if package construction fails
         """
-        unpacked = struct.unpack("<BIBBBB", byte_array)
-        return PinPacket(header=PinHeader(unpacked[0]),
-        pin_id = unpacked[2],
-        value = unpacked[3],
-        time = unpacked[1])
+        return PinPacket.from_unpacked(PIN_STRUCT.unpack(byte_array))
+
+    @classmethod
+    def from_unpacked(cls, unpacked):
+        """
+        trusted constructor for packets decoded from the wire, skips all range checks
+        @param unpacked: (tuple) the fields unpacked with PIN_STRUCT
+        @return: PinPacket
+        @raise KeyError: if the header is not a PinHeader
+        """
+        packet = cls.__new__(cls)
+        packet.fill_unpacked(unpacked)
+        return packet
+
+    def fill_unpacked(self, unpacked):
+        """
+        overwrites all fields with trusted decoded ones, used to reuse packet objects from a PacketPool
+        @param unpacked: (tuple) the fields unpacked with PIN_STRUCT
+        @raise KeyError: if the header is not a PinHeader
+        """
+        self._header = self._HEADERS[unpacked[0]]
+        self._exec_time = unpacked[1]
+        self._pin_id = unpacked[2]
+        self._value = unpacked[3]
+        if LOGGING_SUBSCRIPTIONS:
+            self.check_and_log()
 
 
 """
@@ -376,6 +440,10 @@ class ConfigPacket(Packet):
     """ The ConfigPacket is used to cumunicate configuration instructions with the uC
         all availible instructions are defined in the ConfigMainHeader and ConfigSubHeader
     """
+    __slots__ = ("_config_header", "_value")
+    _HEADERS = dict((int(header), header) for header in ConfigMainHeader)
+    _SUB_HEADERS = dict((int(header), header) for header in ConfigSubHeader)
+
     def __init__(self, header, config_header, value=0, time=0):
         self.set_header(header)
         self.set_config_header(config_header)
@@ -399,8 +467,8 @@ class ConfigPacket(Packet):
         """ setter method for the header attribute
             @param header: (ConfigMainHeader or uint8) the header of the packet
         """
-        if (header in ConfigMainHeader):
-            self._header=header
+        if (header in CONFIG_MAIN_HEADERS):
+            self._header=ConfigMainHeader(header)
         else:
             logging.error("header "+str(header)+" is not a valid header")
             
@@ -408,10 +476,10 @@ class ConfigPacket(Packet):
         """ setter method for the sub instruction config_header attribute
             @param config_header: (ConfigSubHeader or uint8) the config_sub_header
         """
-        if (config_header in ConfigSubHeader):
-            self._config_header=config_header
+        if (config_header in CONFIG_SUB_HEADERS):
+            self._config_header=ConfigSubHeader(config_header)
         else:
-            logging.error("config sub header "+str(header)+" is not a valid header")
+            logging.error("config sub header "+str(config_header)+" is not a valid header")
 
     def set_value(self, value):
         """ setter method for the value attribute
@@ -439,11 +507,32 @@ class ConfigPacket(Packet):
         @return: ConfigPacket
         @raise Exception: if package construction fails
         """
-        unpacked = struct.unpack("<BIBBBB", byte_array)
-        return ConfigPacket(header=ConfigMainHeader(unpacked[0]),
-        config_header = ConfigSubHeader(unpacked[2]),
-        value = unpacked[3],
-        time = unpacked[1])
+        return ConfigPacket.from_unpacked(CONFIG_STRUCT.unpack(byte_array))
+
+    @classmethod
+    def from_unpacked(cls, unpacked):
+        """
+        trusted constructor for packets decoded from the wire, skips all range checks
+        @param unpacked: (tuple) the fields unpacked with CONFIG_STRUCT
+        @return: ConfigPacket
+        @raise KeyError: if the header is not a ConfigMainHeader or the sub header not a ConfigSubHeader
+        """
+        packet = cls.__new__(cls)
+        packet.fill_unpacked(unpacked)
+        return packet
+
+    def fill_unpacked(self, unpacked):
+        """
+        overwrites all fields with trusted decoded ones, used to reuse packet objects from a PacketPool
+        @param unpacked: (tuple) the fields unpacked with CONFIG_STRUCT
+        @raise KeyError: if the header is not a ConfigMainHeader or the sub header not a ConfigSubHeader
+        """
+        self._header = self._HEADERS[unpacked[0]]
+        self._exec_time = unpacked[1]
+        self._config_header = self._SUB_HEADERS[unpacked[2]]
+        self._value = unpacked[3]
+        if LOGGING_SUBSCRIPTIONS:
+            self.check_and_log()
 
 
 
@@ -451,6 +540,8 @@ class ErrorPacket(Packet):
     """ The ErrorPacket is used by the uC to send errors to the API
         all availible errors are defined in the ErrorHeader
     """
+    __slots__ = ("_org_header", "_org_sub_header", "_value")
+
     def __init__(self, header, original_header, value=0, original_sub_header=0, skip_header_matching=False, print_errors=True):
         """ constructor for the ErrorPacket
         @param header: (ErrorHeader or uint8) the header indicating the error
@@ -495,8 +586,8 @@ class ErrorPacket(Packet):
         """ setter method for the header attribute
             @param header: (ErrorHeader or uint8) the header indicating the error
         """
-        if (header in ErrorHeader):
-            self._header=header
+        if (header in ERROR_HEADERS):
+            self._header=ErrorHeader(header)
         else:
             logging.error("header "+str(header)+" is not a valid header")
             
@@ -509,23 +600,12 @@ class ErrorPacket(Packet):
             self._org_header = header
         else:
             # find the header in human readable form
-            try:
-                self._org_header = Data32bitHeader(header);
-            except ValueError:
-                try:
-                    self._org_header = DataI2CHeader(header);
-                except ValueError:
-                    try:
-                        self._org_header = PinHeader(header);
-                    except ValueError:
-                        try:
-                            self._org_header = ConfigMainHeader(header);
-                        except ValueError:
-                            try:
-                                self._org_header = ErrorHeader(header);
-                            except ValueError:
-                                logging.error("source Header "+ str(header) +" is not a valid header,")
-                                self._org_header = None;
+            entry = HEADER_TABLE[header] if (isinstance(header, int) and header < 256 and header >= 0) else None
+            if entry is None:
+                logging.error("source Header "+ str(header) +" is not a valid header,")
+                self._org_header = None
+            else:
+                self._org_header = entry[1]
 
     def set_org_sub_header(self, header,skip_header_matching=False):
         """ setter method for the original sub header attribute
@@ -536,26 +616,10 @@ class ErrorPacket(Packet):
             self._org_sub_header = header
         else:
             # find the header in human readable form, start with config sub header, and only if that fails try the other headers - not unique
-            try:
-                self._org_sub_header = ConfigSubHeader(header);
-            except ValueError:
-                try:
-                    self._org_sub_header = Data32bitHeader(header);
-                except ValueError:
-                    try:
-                        self._org_sub_header = DataI2CHeader(header);
-                    except ValueError:
-                        try:
-                            self._org_sub_header = PinHeader(header);
-                        except ValueError:
-                            try:
-                                self._org_sub_header = ConfigMainHeader(header);
-                            except ValueError:
-                                try:
-                                    self._org_sub_header = ErrorHeader(header);
-                                except ValueError:
-                                    logging.error("source Sub Header "+ str(header) +" is not a valid header,")
-                                    self._org_sub_header = None;
+            sub_header = SUB_HEADER_TABLE[header] if (isinstance(header, int) and header < 256 and header >= 0) else None
+            if sub_header is None:
+                logging.error("source Sub Header "+ str(header) +" is not a valid header,")
+            self._org_sub_header = sub_header
 
 
     def set_value(self, value):
@@ -583,9 +647,319 @@ class ErrorPacket(Packet):
         @return: ErrorPacket
         @raise Exception: if package construction fails
         """
-        unpacked = struct.unpack("<BBIBBB", byte_array)
+        unpacked = ERROR_STRUCT.unpack(byte_array)
         return ErrorPacket(header=ErrorHeader(unpacked[0]),
         original_header = unpacked[1],
         value = unpacked[2],
         original_sub_header = unpacked[3])
 
+
+
+"""
+header dispatch table, built once on import from the header enums
+it maps every possible header byte to a tuple of (packet class, header enum member, struct layout) or None if the header is unknown.
+if a value is used in more than one header class the first class wins in the order:
+Data32bitHeader, DataI2CHeader, PinHeader, ConfigMainHeader, ErrorHeader
+"""
+def _build_header_table():
+    table = [None]*256
+    for packet_class, header_class, layout in ((Data32bitPacket, Data32bitHeader, DATA32BIT_STRUCT),
+                                               (DataI2CPacket, DataI2CHeader, DATAI2C_STRUCT),
+                                               (PinPacket, PinHeader, PIN_STRUCT),
+                                               (ConfigPacket, ConfigMainHeader, CONFIG_STRUCT),
+                                               (ErrorPacket, ErrorHeader, ERROR_STRUCT)):
+        for header in header_class:
+            if table[header] is None:
+                table[header] = (packet_class, header, layout)
+    return tuple(table)
+
+HEADER_TABLE = _build_header_table()
+
+"""
+sub header lookup table for the ErrorPacket, maps every byte to the header enum member or None,
+the ConfigSubHeader has priority over all other header classes
+"""
+def _build_sub_header_table():
+    table = [None]*256
+    for header_class in (ConfigSubHeader, Data32bitHeader, DataI2CHeader, PinHeader, ConfigMainHeader, ErrorHeader):
+        for header in header_class:
+            if table[header] is None:
+                table[header] = header
+    return tuple(table)
+
+SUB_HEADER_TABLE = _build_sub_header_table()
+
+"""
+count of received packets per unknown header value, only the first occurrence of each value is logged
+"""
+UNKNOWN_HEADER_COUNT = Counter()
+
+def count_unknown_header(header, byte_array=None):
+    """
+    count a packet with an unknown header, logs an error only on the first occurrence of this header value
+    @param header: (uint_8) the unknown header
+    @param byte_array: the packet, only used for the log message (optional, default = None)
+    """
+    if UNKNOWN_HEADER_COUNT[header] == 0:
+        logging.error("Header "+ str(header) +" is not a valid header, Packet: " + str(byte_array) +" - further packets with this header are only counted")
+    UNKNOWN_HEADER_COUNT[header] += 1
+
+def unknown_headers():
+    """
+    @return: (dict) the number of received packets per unknown header value
+    """
+    return dict(UNKNOWN_HEADER_COUNT)
+
+
+UINT32_STRUCT = struct.Struct("<I")
+
+class PacketView:
+    """ PacketView is a lightweight read only stand in for a received Packet,
+        it references the receive buffer and an offset instead of copying the fields,
+        only the header is looked up on access, all other fields are decoded when their getter is called.
+        it offers the same getters as the packet classes, use materialize() to get the full Packet object
+    """
+    __slots__ = ("_buffer", "_offset")
+
+    def __init__(self, buffer, offset=0):
+        """ constructor for the PacketView
+        @param buffer: (bytes, bytearray or memoryview) the receive buffer containing the packet
+        @param offset: (int) the position of the packet in the buffer (optional, default = 0)
+        """
+        self._buffer = buffer
+        self._offset = offset
+
+    def packet_class(self):
+        """ @return: the packet class (Data32bitPacket, PinPacket, ...) corresponding to the header or None if unknown
+        """
+        entry = HEADER_TABLE[self._buffer[self._offset]]
+        return None if entry is None else entry[0]
+
+    def header(self):
+        """ getter method for the header
+            @return: the header of the packet as enum entry, int if unknown
+        """
+        entry = HEADER_TABLE[self._buffer[self._offset]]
+        return self._buffer[self._offset] if entry is None else entry[1]
+
+    def time(self):
+        """ getter method for the time of execution, 0 for error packets as they carry no time
+            @return: the time of execution of the packet
+        """
+        if self.packet_class() is ErrorPacket:
+            return 0
+        return UINT32_STRUCT.unpack_from(self._buffer, self._offset+1)[0]
+
+    def value(self):
+        """ getter method for the value, decoded according to the packet class
+            @return: the value of the packet
+        """
+        packet_class = self.packet_class()
+        if packet_class is PinPacket or packet_class is ConfigPacket:
+            return self._buffer[self._offset+6]
+        elif packet_class is DataI2CPacket:
+            return (self._buffer[self._offset+7] << 8) | self._buffer[self._offset+8]
+        elif packet_class is ErrorPacket:
+            return UINT32_STRUCT.unpack_from(self._buffer, self._offset+2)[0]
+        return UINT32_STRUCT.unpack_from(self._buffer, self._offset+5)[0]
+
+    def pin_id(self):
+        """ @return: the pin_id of a PinPacket
+        """
+        return self._buffer[self._offset+5]
+
+    def config_header(self):
+        """ @return: the config sub header of a ConfigPacket
+        """
+        return ConfigPacket._SUB_HEADERS.get(self._buffer[self._offset+5], self._buffer[self._offset+5])
+
+    def device_address(self):
+        """ @return: the 7bit device address of a DataI2CPacket
+        """
+        return self._buffer[self._offset+5] >> 1
+
+    def read(self):
+        """ @return: the read flag of a DataI2CPacket
+        """
+        return self._buffer[self._offset+5] & 0x1
+
+    def register_address(self):
+        """ @return: the 8bit register address of a DataI2CPacket
+        """
+        return self._buffer[self._offset+6]
+
+    def original_header(self):
+        """ @return: the original header causing the error of an ErrorPacket
+        """
+        return self.materialize().original_header()
+
+    def original_sub_header(self):
+        """ @return: the original sub header causing the error of an ErrorPacket
+        """
+        return self.materialize().original_sub_header()
+
+    def to_bytearray(self):
+        """ @return: the 9 bytes of the packet
+        """
+        return bytes(self._buffer[self._offset:self._offset+9])
+
+    def materialize(self):
+        """ decodes all fields and creates the full packet object
+            @return: the packet of the corresponding sub type or None if the header is unknown
+        """
+        entry = HEADER_TABLE[self._buffer[self._offset]]
+        if entry is None:
+            return None
+        unpacked = entry[2].unpack_from(self._buffer, self._offset)
+        if entry[0] is ErrorPacket:
+            # do not log the error a second time
+            return ErrorPacket(header=entry[1], original_header=unpacked[1], value=unpacked[2],
+                               original_sub_header=unpacked[3], print_errors=False)
+        return entry[0].from_unpacked(unpacked)
+
+    def __str__(self):
+        return str(self.materialize())
+
+
+class PacketTemplateCache:
+    """ PacketTemplateCache is a bounded LRU cache of already encoded packets,
+        it is keyed by the packet class, header and all fields except the time.
+        on a hit only the 4 byte time is patched into the cached 9 byte image,
+        the packet object is only constructed (and checked) on a miss.
+    """
+    # packet class -> (valid headers, valid values of the fields after the header in constructor order), the same ranges as the setters
+    _VALID_FIELDS = {
+        Data32bitPacket: (DATA32BIT_HEADERS, (range(2**32),)),
+        PinPacket: (PIN_HEADERS, (range(55), range(2**8))),
+        ConfigPacket: (CONFIG_MAIN_HEADERS, (CONFIG_SUB_HEADERS, range(2**8))),
+    }
+
+    def __init__(self, max_size=1024):
+        """ constructor for the PacketTemplateCache
+        @param max_size: (int) the maximum number of cached templates (optional, default = 1024)
+        """
+        self._templates = OrderedDict()
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+
+    def encode(self, packet_class, header, *fields, time=0):
+        """ encodes a packet using the cached template
+        @param packet_class: (Data32bitPacket, PinPacket or ConfigPacket) the packet class to encode
+        @param header: the header of the packet
+        @param fields: all other constructor arguments of the packet class except the time, e.g. pin_id, value for the PinPacket
+        @param time: (uint_32) the time of execution of the packet (optional, default = 0)
+        @return: (bytes) the 9 byte packet or None if the packet is not valid
+        """
+        key = (packet_class, header, fields)
+        template = self._templates.get(key)
+        if template is None:
+            self._misses += 1
+            byte_array = self._encode_checked(packet_class, header, fields)
+            if byte_array is None:
+                return None
+            template = (byte_array[:1], byte_array[5:])
+            self._templates[key] = template
+            if len(self._templates) > self._max_size:
+                self._templates.popitem(last=False)
+        else:
+            self._hits += 1
+            self._templates.move_to_end(key)
+        if time < 0 or time >= 2**32 or not isinstance(time, int):
+            logging.error("exec_time "+str(time)+" is not a valid unsigned integer of 4 bytes")
+            return None
+        return template[0] + UINT32_STRUCT.pack(time) + template[1]
+
+    def _encode_checked(self, packet_class, header, fields):
+        """ checks the header and fields against the ranges of the packet class and constructs the packet once
+            @return: (bytes) the encoded packet with time 0 or None if the packet is not valid
+        """
+        valid = self._VALID_FIELDS.get(packet_class)
+        if valid is None:
+            logging.error("packets of "+packet_class.__name__+" can not be encoded with the packet template cache")
+            return None
+        if header not in valid[0] or len(fields) > len(valid[1]) or \
+                not all(isinstance(field, int) and field in valid_values for field, valid_values in zip(fields, valid[1])):
+            logging.error("packet "+packet_class.__name__+" with header "+str(header)+" and fields "+str(fields)+" is not valid and not send")
+            return None
+        return packet_class(header, *fields).to_bytearray()
+
+    def hits(self):
+        """ @return: (int) the number of cache hits
+        """
+        return self._hits
+
+    def misses(self):
+        """ @return: (int) the number of cache misses
+        """
+        return self._misses
+
+    def clear(self):
+        """ removes all templates and resets the counters
+        """
+        self._templates.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __str__(self):
+        return "[PacketTemplateCache]: "+ str(len(self._templates)) +"/"+ str(self._max_size) +" templates, hits = "+ str(self._hits) +", misses = "+ str(self._misses)
+
+
+class PacketPool:
+    """ PacketPool keeps free lists of decoded packet objects, so the communication thread can reuse
+        packets that were already consumed instead of allocating a new object for every received packet.
+        this reduces the pressure on the garbage collector under sustained load.
+
+        packets have to be given back with release() once nothing references them anymore,
+        error packets are not pooled.
+    """
+    def __init__(self, max_size=4096):
+        """ constructor for the PacketPool
+        @param max_size: (int) the maximum number of free packets kept per packet class (optional, default = 4096)
+        """
+        self._max_size = max_size
+        self._free = {Data32bitPacket: [], DataI2CPacket: [], PinPacket: [], ConfigPacket: []}
+        self._reused = 0
+        self._allocated = 0
+
+    def decode(self, byte_array):
+        """ decodes a packet like Packet.from_bytearray, but reuses a free packet object if available
+        @param byte_array: 9 byte bytearray to construct the Packet from
+        @return: the packet of the coresponing sub type or None if the header is unknown
+        """
+        entry = HEADER_TABLE[byte_array[0]]
+        if entry is None or entry[0] is ErrorPacket:
+            return Packet.from_bytearray(byte_array)
+        free = self._free[entry[0]]
+        # pop on an empty list raises, checking first is cheaper, the lists are only appended to from an other thread
+        if free:
+            packet = free.pop()
+            packet.fill_unpacked(entry[2].unpack(byte_array))
+            self._reused += 1
+            return packet
+        self._allocated += 1
+        return entry[0].from_unpacked(entry[2].unpack(byte_array))
+
+    def release(self, packet):
+        """ gives a packet back to the pool, the packet must not be used afterwards
+        @param packet: the packet to reuse
+        """
+        free = self._free.get(type(packet))
+        if free is not None and len(free) < self._max_size:
+            free.append(packet)
+
+    def reused(self):
+        """ @return: (int) the number of decoded packets that reused a free packet object
+        """
+        return self._reused
+
+    def allocated(self):
+        """ @return: (int) the number of decoded packets that needed a new packet object
+        """
+        return self._allocated
+
+    def __str__(self):
+        return "[PacketPool]: reused = "+ str(self._reused) +", allocated = "+ str(self._allocated)
@@ -0,0 +1,365 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import logging
+import multiprocessing
+import select
+import signal
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from time import sleep
+import serial
+from .framing import FrameDecoder
+from .transport import open_transport
+from .notifier import FALLBACK_POLL_INTERVAL
+
+"""
+serial I/O, framing and decoding in a child process.
+
+at high event rates the serial reads, the framing and the resynchronization compete with the
+analysis code of the main thread for the GIL. with uC_api(..., process_io=True) the serial
+connection is opened in a child process instead, which reads, frames and decodes the received
+stream (see batch.decode_many, so it needs numpy) and writes the outgoing bytes. the two processes
+exchange bytes through two ring buffers in shared memory: the received ring holds blocks of
+decoded packets, each the number of packets followed by their header, time and value columns
+(the time and value of an error packet are its raw bytes 1-4 and 5-8), the send ring the encoded packets.
+
+the main process sees a ProcessConnection, which behaves like the serial connection for writing
+(in_waiting, write, fileno), the reader of uC_api takes the columns with read_columns() and builds
+the packets from them without framing the stream again.
+
+a pipe per direction wakes up the other process, it is only written to if the other process
+has taken everything out of the ring before, so a busy stream does not cost a system call per write.
+the slips found by the framing are counted in the child process, they are logged when it closes.
+"""
+
+"""
+size of each ring buffer in bytes
+"""
+RING_SIZE = 9*(1 << 17)
+
+"""
+maximum time in seconds the child process waits if there is nothing to do
+"""
+IDLE_WAIT_TIMEOUT = 0.1
+
+# write counter, read counter and size of the ring, in front of the data, each 8 bytes
+RING_HEADER_STRUCT = struct.Struct("<QQQ")
+RING_COUNTER_STRUCT = struct.Struct("<Q")
+RING_DATA_OFFSET = 64
+
+# number of packets in front of the columns of a block in the received ring
+BLOCK_COUNT_STRUCT = struct.Struct("<I")
+
+"""
+size of the receive buffer of the child process, the packets of one read are one block in the received ring
+"""
+RECEIVE_BUFFER_SIZE = 65536
+MAX_BLOCK_SIZE = BLOCK_COUNT_STRUCT.size + RECEIVE_BUFFER_SIZE
+
+# array type code of the 4 byte time and value columns
+UINT32_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+
+
+class SharedRing:
+    """ single producer single consumer byte ring buffer in shared memory, for two processes
+
+    the write and read counters count all bytes ever written and read, the producer only
+    changes the write counter, the consumer only the read counter
+    """
+    __slots__ = ("_memory", "_buffer", "_size", "_owner")
+
+    def __init__(self, size=RING_SIZE, name=None):
+        """ @param size: (int) size of the ring in bytes, only used to create it (optional, default = RING_SIZE)
+            @param name: (string or None) the name of an existing ring to attach to, None creates a new ring (optional, default = None)
+        """
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=RING_DATA_OFFSET + size)
+            RING_HEADER_STRUCT.pack_into(self._memory.buf, 0, 0, 0, size)
+            self._owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self._buffer = self._memory.buf
+        self._size = RING_HEADER_STRUCT.unpack_from(self._buffer, 0)[2]
+
+    def _write_counter(self):
+        return RING_COUNTER_STRUCT.unpack_from(self._buffer, 0)[0]
+
+    def _read_counter(self):
+        return RING_COUNTER_STRUCT.unpack_from(self._buffer, 8)[0]
+
+    def write(self, byte_buffer, whole=False):
+        """ copies as many bytes as fit into the ring, called by the producer
+
+        @param byte_buffer: (bytes-like) the bytes
+        @param whole: (bool) only write if all bytes fit, e.g. a block the consumer reads at once (optional, default = False)
+        @return: (int, bool) the number of bytes written, and if the consumer had taken everything out before (it might wait)
+        """
+        write_counter = self._write_counter()
+        number_of_bytes = min(len(byte_buffer), self._size - (write_counter - self._read_counter()))
+        if number_of_bytes <= 0 or (whole and number_of_bytes < len(byte_buffer)):
+            return (0, False)
+        position = write_counter % self._size
+        first = min(number_of_bytes, self._size - position)
+        start = RING_DATA_OFFSET + position
+        self._buffer[start:start+first] = byte_buffer[:first]
+        if first < number_of_bytes:
+            self._buffer[RING_DATA_OFFSET:RING_DATA_OFFSET+number_of_bytes-first] = byte_buffer[first:number_of_bytes]
+        # publish the bytes, then check if the consumer had taken everything before them
+        RING_COUNTER_STRUCT.pack_into(self._buffer, 0, write_counter + number_of_bytes)
+        return (number_of_bytes, self._read_counter() == write_counter)
+
+    def readinto(self, byte_view):
+        """ copies as many bytes as availible (up to the size of the view) out of the ring, called by the consumer
+
+        @param byte_view: (writable bytes-like) the destination
+        @return: (int, bool) the number of bytes read, and if the ring was full before
+        """
+        read_counter = self._read_counter()
+        number_of_bytes = min(len(byte_view), self._write_counter() - read_counter)
+        if number_of_bytes <= 0:
+            return (0, False)
+        position = read_counter % self._size
+        first = min(number_of_bytes, self._size - position)
+        start = RING_DATA_OFFSET + position
+        byte_view[:first] = self._buffer[start:start+first]
+        if first < number_of_bytes:
+            byte_view[first:number_of_bytes] = self._buffer[RING_DATA_OFFSET:RING_DATA_OFFSET+number_of_bytes-first]
+        RING_COUNTER_STRUCT.pack_into(self._buffer, 8, read_counter + number_of_bytes)
+        return (number_of_bytes, self._write_counter() - read_counter >= self._size)
+
+    def available(self):
+        """ getter method for the number of bytes in the ring
+        """
+        return self._write_counter() - self._read_counter()
+
+    def name(self):
+        """ getter method for the name of the shared memory, to attach to the ring from the other process
+        """
+        return self._memory.name
+
+    def close(self):
+        """ detaches from the shared memory, the creator also removes it
+        """
+        self._buffer.release()
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+def _drain(connection):
+    """ consumes all wake ups of a pipe
+    """
+    while connection.poll():
+        connection.recv_bytes()
+
+
+def _io_process_function(serial_port_path, received_name, send_name, received_wake_up, send_wake_up, control):
+    """ the child process: reads, frames and decodes the received stream into the received ring,
+    and writes the bytes of the send ring to the serial connection, until the main process closes it
+    """
+    # ctrl-c is handled by the main process, which closes the connection
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from .batch import decode_many
+    try:
+        connection = open_transport(serial_port_path)
+    except (OSError, serial.SerialException) as error:
+        control.send(("error", str(error)))
+        return
+    try:
+        connection_file_descriptor = connection.fileno()
+    except (AttributeError, OSError):
+        connection_file_descriptor = None
+    received_ring = SharedRing(name=received_name)
+    send_ring = SharedRing(name=send_name)
+    frame_decoder = FrameDecoder(RECEIVE_BUFFER_SIZE)
+    # the block that did not fit into the received ring yet
+    block = b""
+    send_buffer = bytearray(65536)
+    send_view = memoryview(send_buffer)
+    control.send(("ready", None))
+    closing = False
+    while True:
+        busy = False
+        # write what the main process placed in the send ring
+        number_of_bytes = send_ring.readinto(send_view)[0]
+        if number_of_bytes > 0:
+            busy = True
+            byte_buffer = send_view[:number_of_bytes]
+            while len(byte_buffer) > 0:
+                written = connection.write(byte_buffer)
+                if written is None or written >= len(byte_buffer):
+                    break
+                byte_buffer = byte_buffer[written:]
+                if connection_file_descriptor is None:
+                    sleep(FALLBACK_POLL_INTERVAL)
+                else:
+                    select.select([], [connection_file_descriptor], [], IDLE_WAIT_TIMEOUT)
+        elif closing:
+            break
+        # read, frame and decode everything availible, while the received ring has space
+        if len(block) == 0 and connection.in_waiting > 0:
+            records = decode_many(frame_decoder.read_from(connection)).records()
+            if len(records) > 0:
+                block = BLOCK_COUNT_STRUCT.pack(len(records)) + records["header"].tobytes() + \
+                    records["exec_time"].astype("<u4", copy=False).tobytes() + records["value"].astype("<u4", copy=False).tobytes()
+            busy = True
+        if len(block) > 0:
+            number_of_bytes, was_empty = received_ring.write(block, whole=True)
+            if number_of_bytes > 0:
+                block = b""
+            if was_empty:
+                received_wake_up.send_bytes(b"")
+        if control.poll():
+            if control.recv() == "close":
+                # send what is left in the send ring, then close
+                closing = True
+                continue
+        if busy:
+            continue
+        # wait for the uC, the main process, or space in the received ring
+        if len(block) > 0 or connection_file_descriptor is None:
+            wait([send_wake_up, control], FALLBACK_POLL_INTERVAL)
+        else:
+            wait([send_wake_up, control, connection_file_descriptor], IDLE_WAIT_TIMEOUT)
+        _drain(send_wake_up)
+    connection.close()
+    received_ring.close()
+    send_ring.close()
+    control.send(("closed", str(frame_decoder)))
+
+
+class ProcessConnection:
+    """ serial connection opened in a child process, with the interface of the serial connection that uC_api uses
+    for writing (in_waiting, write, fileno, close)
+
+    the received stream is already framed and decoded: read_columns() returns the header, time and value columns
+    of the complete frames with known headers, without the alignment padding
+    """
+    def __init__(self, serial_port_path, ring_size=RING_SIZE):
+        """ @param serial_port_path: (string) the path of the serial port
+            @param ring_size: (int) the size of each ring buffer in bytes (optional, default = RING_SIZE)
+            @raise serial.SerialException: if the child process can not open the serial port
+        """
+        if ring_size < MAX_BLOCK_SIZE:
+            raise ValueError("ring_size "+str(ring_size)+" has to hold a block of "+str(MAX_BLOCK_SIZE)+" bytes")
+        # a whole block of the received ring is read into it at once
+        self._block_buffer = bytearray(MAX_BLOCK_SIZE)
+        self._block_view = memoryview(self._block_buffer)
+        self._received_ring = SharedRing(ring_size)
+        self._send_ring = SharedRing(ring_size)
+        self._received_wake_up, self._received_rearm = multiprocessing.Pipe(duplex=False)
+        send_wake_up, self._send_wake_up = multiprocessing.Pipe(duplex=False)
+        self._control, control = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_io_process_function, name="uC_api I/O "+str(serial_port_path),
+                                                args=(serial_port_path, self._received_ring.name(), self._send_ring.name(),
+                                                      self._received_rearm, send_wake_up, control), daemon=True)
+        self._process.start()
+        # the ends of the child process
+        send_wake_up.close()
+        control.close()
+        status, message = self._control.recv()
+        if status != "ready":
+            self._process.join()
+            self._close_rings()
+            raise serial.SerialException(message)
+
+    @property
+    def in_waiting(self):
+        """ the number of received bytes, the wake ups are consumed before the ring is checked
+        """
+        _drain(self._received_wake_up)
+        return self._received_ring.available()
+
+    def read_columns(self):
+        """ reads all availible blocks of decoded packets, without blocking
+
+        @return: (bytearray, array, array) the header, time and value columns of the received packets
+        """
+        headers = bytearray()
+        times = array(UINT32_TYPECODE)
+        values = array(UINT32_TYPECODE)
+        count_size = BLOCK_COUNT_STRUCT.size
+        # the child process publishes whole blocks, so the columns are availible with the number of packets
+        while self._received_ring.available() >= count_size:
+            self._received_ring.readinto(self._block_view[:count_size])
+            number_of_packets = BLOCK_COUNT_STRUCT.unpack_from(self._block_buffer)[0]
+            self._received_ring.readinto(self._block_view[:9*number_of_packets])
+            headers += self._block_view[:number_of_packets]
+            times.frombytes(self._block_view[number_of_packets:5*number_of_packets])
+            values.frombytes(self._block_view[5*number_of_packets:9*number_of_packets])
+        if sys.byteorder == "big":
+            times.byteswap()
+            values.byteswap()
+        # the wake up pipe stays readable while blocks are left (as a serial connection), the child process only
+        # wakes up the reader if the ring was empty, e.g. the child published meanwhile
+        if self._received_ring.available() > 0 and not self._received_wake_up.poll():
+            self._received_rearm.send_bytes(b"")
+        return (headers, times, values)
+
+    def write(self, byte_buffer):
+        """ places the bytes in the send ring, blocks while the ring is full
+
+        @return: (int) the number of bytes written, always all
+        """
+        byte_buffer = memoryview(byte_buffer)
+        number_of_bytes = len(byte_buffer)
+        while True:
+            written, was_empty = self._send_ring.write(byte_buffer)
+            if was_empty:
+                self._send_wake_up.send_bytes(b"")
+            byte_buffer = byte_buffer[written:]
+            if len(byte_buffer) == 0:
+                return number_of_bytes
+            # the ring is full, the child process is busy writing it to the uC
+            sleep(FALLBACK_POLL_INTERVAL)
+
+    def fileno(self):
+        """ the file descriptor that becomes readable when bytes were received, not selectable on windows
+        """
+        if sys.platform == "win32":
+            raise OSError("the wake up pipe can not be used with select on windows")
+        return self._received_wake_up.fileno()
+
+    def close(self):
+        """ closes the serial connection in the child process after the send ring was written, and stops it
+        """
+        try:
+            self._control.send("close")
+            while self._control.poll(IDLE_WAIT_TIMEOUT*10):
+                status, message = self._control.recv()
+                if status == "closed":
+                    logging.debug("child process framing: "+message)
+                    break
+        except (EOFError, OSError):
+            pass
+        self._process.join(IDLE_WAIT_TIMEOUT*10)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._close_rings()
+        self._received_wake_up.close()
+        self._received_rearm.close()
+        self._send_wake_up.close()
+        self._control.close()
+
+    def _close_rings(self):
+        self._received_ring.close()
+        self._send_ring.close()
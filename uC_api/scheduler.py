@@ -0,0 +1,232 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import heapq
+import logging
+import struct
+from bisect import bisect_right, insort
+from collections import deque
+from .header import Data32bitHeader
+
+"""
+time ordered release of the timed packets to the uC.
+
+the uC executes its instruction buffer in the order it receives the packets, so the timed packets
+have to be send sorted by their execution time. every producer (e.g. one interface driven from its
+own loop) creates its packets sorted in time, but the producers interleave in the write buffer.
+the scheduler splits the waiting packets into sorted runs: a packet is appended to the run with the
+latest end that is not after the packet, otherwise it starts a new run. with k interleaved producers
+there are about k runs, which are merged with a heap of the run heads in O(log k) per packet.
+a single producer is one run, its packets and encoded buffers are released as they are.
+
+a timed IN_SET_TIME packet (stop_experiment with a time) restarts the uC clock, the packets queued
+after it belong to the next experiment (epoch) and are released after it, even with earlier times.
+an instant IN_SET_TIME (start_experiment, stop_experiment without a time) is not queued here, the
+writer reports it with restart_clock() when it is written.
+"""
+
+TIME_STRUCT = struct.Struct("<I")
+IN_SET_TIME = int(Data32bitHeader.IN_SET_TIME)
+
+
+class _Run:
+    """ sorted run of waiting packets, items are [epoch, packet or encoded packets (memoryview)]
+    """
+    __slots__ = ("items", "tail")
+
+    def __init__(self, epoch, item, tail):
+        self.items = deque(([epoch, item],))
+        # (epoch, time) of the last packet in the run
+        self.tail = tail
+
+    def head(self):
+        """ (epoch, time) of the first packet in the run
+        """
+        epoch, item = self.items[0]
+        if isinstance(item, memoryview):
+            return (epoch, TIME_STRUCT.unpack_from(item, 1)[0])
+        return (epoch, item.time())
+
+
+class TimedScheduler:
+    """ merges the timed packets of interleaved producers into execution time order, owned by one thread
+    """
+    __slots__ = ("_runs", "_tails", "_heap", "_sequence", "_epoch", "_waiting", "_released", "_late", "_max_runs")
+
+    def __init__(self):
+        # the runs sorted by their tail, and the tails for the bisection
+        self._runs = []
+        self._tails = []
+        # [head, sequence, run] of every run, the sequence keeps runs with the same head in push order
+        self._heap = []
+        self._sequence = 0
+        self._epoch = 0
+        self._waiting = 0
+        # (epoch, time) of the last released packet
+        self._released = None
+        # packets that were pushed after a later packet was already released
+        self._late = 0
+        self._max_runs = 0
+
+    def push(self, item):
+        """ adds timed packets to the scheduler
+
+        @param item: (Packet or memoryview) one packet, or encoded packets N*9 bytes sorted in time
+        """
+        if isinstance(item, memoryview):
+            first = (self._epoch, TIME_STRUCT.unpack_from(item, 1)[0])
+            last = (self._epoch, TIME_STRUCT.unpack_from(item, len(item)-8)[0])
+            number_of_packets = len(item)//9
+            set_time = number_of_packets == 1 and item[0] == IN_SET_TIME
+        else:
+            first = last = (self._epoch, item.time())
+            number_of_packets = 1
+            set_time = item.header() == Data32bitHeader.IN_SET_TIME
+        # the run with the latest tail that is not after the first packet
+        index = bisect_right(self._tails, first) - 1
+        if index >= 0:
+            run = self._runs[index]
+            run.items.append([self._epoch, item])
+            run.tail = last
+            if index + 1 < len(self._tails) and last > self._tails[index + 1]:
+                # an encoded buffer can reach past the next run, keep the runs sorted by tail
+                del self._runs[index]
+                del self._tails[index]
+                self._insert(run)
+            else:
+                self._tails[index] = last
+        else:
+            run = _Run(self._epoch, item, last)
+            self._insert(run)
+            heapq.heappush(self._heap, [first, self._sequence, run])
+            self._sequence += 1
+            self._max_runs = max(self._max_runs, len(self._runs))
+        self._waiting += number_of_packets
+        # the packets after a timed IN_SET_TIME are executed with the restarted uC clock
+        if set_time:
+            self._epoch += 1
+
+    def restart_clock(self):
+        """ the uC clock was restarted by an instant IN_SET_TIME or a reset, called by the writer when it writes it,
+        the packets pushed from now on belong to the next epoch, they are not late compared to the packets released before
+        """
+        self._epoch += 1
+        self._released = None
+
+    def _insert(self, run):
+        """ inserts a run sorted by its tail
+        """
+        index = bisect_right(self._tails, run.tail)
+        self._tails.insert(index, run.tail)
+        self._runs.insert(index, run)
+
+    def pop(self, max_packets):
+        """ takes the earliest waiting packets out of the scheduler
+
+        @param max_packets: (int) the maximum number of packets to take
+        @return: (list, int) the encoded packets in time order (bytes-like), and the number of packets
+        """
+        heap = self._heap
+        write_batch = []
+        number_of_packets = 0
+        while number_of_packets < max_packets and heap:
+            run = heap[0][2]
+            # the packets of the run are taken up to the head of the next run
+            if len(heap) == 1:
+                bound = None
+            elif len(heap) == 2 or heap[1][0] <= heap[2][0]:
+                bound = heap[1][0]
+            else:
+                bound = heap[2][0]
+            items = run.items
+            while items and number_of_packets < max_packets:
+                entry = items[0]
+                epoch, item = entry
+                if isinstance(item, memoryview):
+                    number_of_encoded_packets = min(len(item)//9, max_packets - number_of_packets)
+                    if bound is not None:
+                        number_of_encoded_packets = self._packets_before(epoch, item, number_of_encoded_packets, bound)
+                        if number_of_encoded_packets == 0:
+                            break
+                    chunk = item[:number_of_encoded_packets*9]
+                    first = (epoch, TIME_STRUCT.unpack_from(chunk, 1)[0])
+                    last = (epoch, TIME_STRUCT.unpack_from(chunk, len(chunk)-8)[0])
+                    if number_of_encoded_packets*9 < len(item):
+                        entry[1] = item[number_of_encoded_packets*9:]
+                    else:
+                        items.popleft()
+                else:
+                    first = last = (epoch, item.time())
+                    if bound is not None and first > bound:
+                        break
+                    chunk = item.to_bytearray()
+                    number_of_encoded_packets = 1
+                    items.popleft()
+                if self._released is not None and first < self._released:
+                    self._late += number_of_encoded_packets
+                    logging.warning("timed packet at "+str(first[1])+"us was queued after the packet at "+str(self._released[1])+"us was send to the uC - execution order will be inconsistent")
+                self._released = last
+                write_batch.append(chunk)
+                number_of_packets += number_of_encoded_packets
+            if items:
+                heapq.heapreplace(heap, [run.head(), self._sequence, run])
+                self._sequence += 1
+            else:
+                heapq.heappop(heap)
+                index = self._runs.index(run)
+                del self._runs[index]
+                del self._tails[index]
+        self._waiting -= number_of_packets
+        return write_batch, number_of_packets
+
+    @staticmethod
+    def _packets_before(epoch, item, max_packets, bound):
+        """ the number of leading packets of an encoded buffer that are not after bound (binary search)
+        """
+        if (epoch, TIME_STRUCT.unpack_from(item, (max_packets-1)*9+1)[0]) <= bound:
+            return max_packets
+        low = 0
+        high = max_packets - 1
+        while low < high:
+            middle = (low + high) // 2
+            if (epoch, TIME_STRUCT.unpack_from(item, middle*9+1)[0]) <= bound:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def runs(self):
+        """ getter method for the number of sorted runs, about the number of interleaved producers
+        """
+        return len(self._runs)
+
+    def max_runs(self):
+        """ getter method for the largest number of sorted runs
+        """
+        return self._max_runs
+
+    def late(self):
+        """ getter method for the number of packets that were queued after a later packet was already send to the uC
+        """
+        return self._late
+
+    def __len__(self):
+        return self._waiting
+
+    def __str__(self):
+        return "[TimedScheduler]: waiting packets = "+str(self._waiting)+", runs = "+str(len(self._runs))+" (max "+str(self._max_runs)+")"+\
+            ", epoch = "+str(self._epoch)+", late packets = "+str(self._late)
@@ -0,0 +1,80 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from collections import Counter
+
+"""
+counters of the communication thread, they are updated by the communication thread
+and can be read at any time from the main thread
+"""
+
+
+class BatchHistogram:
+    """ histogram of batch sizes, e.g. the number of packets per serial write
+
+    the sizes are counted in power of 2 buckets: 1, 2-3, 4-7, 8-15, ...
+    the bucket is named by its lower bound
+    """
+    __slots__ = ("_buckets", "_batches", "_total")
+
+    def __init__(self):
+        self._buckets = Counter()
+        self._batches = 0
+        self._total = 0
+
+    def record(self, size):
+        """ adds one batch to the histogram
+
+        @param size: (int) the size of the batch, batches of size 0 are ignored
+        """
+        if size > 0:
+            self._buckets[1 << (size.bit_length()-1)] += 1
+            self._batches += 1
+            self._total += size
+
+    def buckets(self):
+        """ getter method for the histogram
+
+        @return: (dict) lower bound of the bucket -> number of batches, sorted by the bucket
+        """
+        return dict(sorted(self._buckets.items()))
+
+    def batches(self):
+        """ getter method for the number of recorded batches
+        """
+        return self._batches
+
+    def total(self):
+        """ getter method for the sum of all recorded batch sizes
+        """
+        return self._total
+
+    def mean(self):
+        """ getter method for the mean batch size, 0 if nothing was recorded
+        """
+        return self._total / self._batches if self._batches > 0 else 0
+
+    def clear(self):
+        """ resets the histogram
+        """
+        self._buckets.clear()
+        self._batches = 0
+        self._total = 0
+
+    def __str__(self):
+        return "[BatchHistogram]: batches = "+str(self._batches)+", mean size = "+"{:.1f}".format(self.mean())+\
+            ", buckets = "+", ".join(str(bucket)+"-"+str(2*bucket-1)+": "+str(count) for bucket, count in self.buckets().items())
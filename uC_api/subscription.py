@@ -0,0 +1,236 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import logging
+import threading
+from time import monotonic
+
+"""
+callbacks for the received packets, called from the communication thread.
+
+a subscription collects the values and times of the received packets with its headers
+(e.g. the words of an async from chip interface) and calls its callback with a batch of them:
+
+    uc.async_from_chip[2].on_events(callback, min_batch=256, max_latency_us=500)
+
+    def callback(values, times):
+        ...
+
+the batch is delivered as soon as it has min_batch packets, or when the oldest packet in it was
+received max_latency_us ago, whatever comes first. the callbacks run in the communication thread
+(the reader thread, or the I/O thread of a uC_cluster), so they should return quickly and must not
+wait for other received packets. the packets are still recorded by the interfaces as before.
+
+a callback can send packets, e.g. to close a loop with the chip. the free spots of the uC and the
+write buffers are drained by the communication thread, so waiting for space there in a callback would
+never end: the send functions of uC_api do not block in a callback (see in_callback), with
+SendPolicy.BLOCK the packets are placed in the full write buffer anyway.
+"""
+
+# set while a callback runs in this thread
+_callback_state = threading.local()
+
+
+def in_callback():
+    """ checks if the calling thread runs the callback of a subscription, the send functions of uC_api use it to not block
+
+    @return: (bool) True inside a callback
+    """
+    return getattr(_callback_state, "active", False)
+
+
+class Subscription:
+    """ batches the values and times of the received packets of some headers for a callback
+    """
+    __slots__ = ("_callback", "_headers", "_pin_id", "_value_of", "_min_batch", "_max_latency", "_values", "_times",
+                 "_first_received", "_batches", "_packets", "_active")
+
+    def __init__(self, headers, callback, min_batch=1, max_latency_us=None, pin_id=None, value_of=None):
+        """ @param headers: (Header or list of Header) the headers of the packets, in one batch in the order they are received
+            @param callback: (callable) called with (values, times), two index matched lists
+            @param min_batch: (int) the number of packets at which the batch is delivered (optional, default = 1)
+            @param max_latency_us: (int or None) the maximum time in us a received packet waits in the batch, None waits for min_batch (optional, default = None)
+            @param pin_id: (int or None) only packets of this pin, for pin headers (optional, default = None)
+            @param value_of: (callable or None) returns the value of a packet for the batch, None uses packet.value() (optional, default = None)
+        """
+        self._callback = callback
+        self._headers = tuple(headers) if isinstance(headers, (list, tuple)) else (headers,)
+        self._pin_id = pin_id
+        self._value_of = value_of
+        self._min_batch = max(1, min_batch)
+        self._max_latency = None if max_latency_us is None else max_latency_us / 1e6
+        self._values = []
+        self._times = []
+        self._first_received = 0.0
+        self._batches = 0
+        self._packets = 0
+        self._active = True
+
+    def headers(self):
+        """ getter method for the headers of the subscribed packets
+        """
+        return self._headers
+
+    def push(self, packet):
+        """ adds a received packet to the batch and delivers the batch if it has min_batch packets, called by the communication thread
+        """
+        if self._pin_id is not None and packet.pin_id() != self._pin_id:
+            return
+        if not self._values:
+            self._first_received = monotonic()
+        self._values.append(packet.value() if self._value_of is None else self._value_of(packet))
+        self._times.append(packet.time())
+        if len(self._values) >= self._min_batch:
+            self.flush()
+
+    def deadline(self):
+        """ the time (monotonic) at which the waiting batch has to be delivered, None if nothing waits or there is no latency bound
+        """
+        if self._max_latency is None or not self._values:
+            return None
+        return self._first_received + self._max_latency
+
+    def flush(self):
+        """ delivers the waiting batch to the callback, an exception of the callback is logged
+        """
+        if not self._values:
+            return
+        values = self._values
+        times = self._times
+        self._values = []
+        self._times = []
+        self._batches += 1
+        self._packets += len(values)
+        _callback_state.active = True
+        try:
+            self._callback(values, times)
+        except Exception:
+            logging.exception("callback of the subscription to "+str(self._headers)+" failed")
+        finally:
+            _callback_state.active = False
+
+    def active(self):
+        """ getter method for if the subscription still receives packets
+        """
+        return self._active
+
+    def batches(self):
+        """ getter method for the number of delivered batches
+        """
+        return self._batches
+
+    def packets(self):
+        """ getter method for the number of delivered packets
+        """
+        return self._packets
+
+    def __str__(self):
+        return "[Subscription]: headers = "+str(self._headers)+("" if self._pin_id is None else ", pin = "+str(self._pin_id))+\
+            ", min batch = "+str(self._min_batch)+", max latency = "+("None" if self._max_latency is None else str(round(self._max_latency*1e6))+"us")+\
+            ", delivered batches = "+str(self._batches)+", packets = "+str(self._packets)+", waiting = "+str(len(self._values))
+
+
+class Subscriptions:
+    """ the subscriptions of one uC connection by header, changed by the main thread and used by the communication thread
+    """
+    __slots__ = ("_lock", "_table", "_with_latency")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # header -> tuple of subscriptions, the table is replaced on every change, so the communication thread reads it without the lock
+        self._table = {}
+        # the subscriptions with a latency bound, checked for due batches
+        self._with_latency = ()
+
+    def add(self, subscription):
+        """ adds a subscription, its packets are delivered from the next read on
+        """
+        with self._lock:
+            table = dict(self._table)
+            for header in subscription.headers():
+                table[header] = table.get(header, ()) + (subscription,)
+            self._update(table)
+
+    def remove(self, subscription):
+        """ removes a subscription, the waiting batch is dropped
+        """
+        with self._lock:
+            table = dict(self._table)
+            for header in subscription.headers():
+                remaining = tuple(entry for entry in table.get(header, ()) if entry is not subscription)
+                if remaining:
+                    table[header] = remaining
+                else:
+                    table.pop(header, None)
+            subscription._active = False
+            self._update(table)
+
+    def _update(self, table):
+        self._with_latency = tuple(set(subscription for subscriptions in table.values() for subscription in subscriptions
+                                       if subscription._max_latency is not None))
+        self._table = table
+
+    def __bool__(self):
+        return bool(self._table)
+
+    def deliver(self, packets):
+        """ passes the received packets to the subscriptions of their header, called by the communication thread,
+        a packet that can not be added to a batch is logged and skipped, so the communication thread keeps running
+        """
+        table = self._table
+        for packet in packets:
+            subscriptions = table.get(packet.header())
+            if subscriptions is not None:
+                for subscription in subscriptions:
+                    try:
+                        subscription.push(packet)
+                    except Exception:
+                        logging.exception("packet "+str(packet)+" could not be added to the subscription to "+str(subscription.headers()))
+
+    def flush_due(self):
+        """ delivers the batches that waited max_latency_us, called by the communication thread
+
+        @return: (float or None) the time in seconds until the next batch is due, None if no batch waits for a latency bound
+        """
+        with_latency = self._with_latency
+        if not with_latency:
+            return None
+        next_deadline = None
+        now = monotonic()
+        for subscription in with_latency:
+            deadline = subscription.deadline()
+            if deadline is None:
+                continue
+            if deadline <= now:
+                subscription.flush()
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        return None if next_deadline is None else next_deadline - now
+
+    def flush_all(self):
+        """ delivers all waiting batches, e.g. when the connection is closed
+        """
+        for subscription in self._all():
+            subscription.flush()
+
+    def _all(self):
+        """ every subscription once, also if it has several headers
+        """
+        return list(dict.fromkeys(subscription for subscriptions in self._table.values() for subscription in subscriptions))
+
+    def __str__(self):
+        return "\n".join(str(subscription) for subscription in self._all())
@@ -0,0 +1,267 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import array
+import logging
+import os
+import socket
+import struct
+import sys
+from urllib.parse import parse_qs
+import serial
+
+"""
+transports: the byte connection between the API and the uC.
+
+the reader and writer of the API only use a small interface of the connection:
+
+    in_waiting      the number of bytes that can be read without blocking
+    readinto(view)  reads up to len(view) bytes into a preallocated buffer without blocking, returns the number of bytes
+    write(bytes)    writes without blocking, returns the number of bytes the connection took (can be a part)
+    fileno()        the file descriptor to wait on with select, raises OSError if there is none (e.g. windows)
+    close()
+
+a pyserial connection is a transport as it is. open_transport picks the transport from the path:
+
+    /dev/ttyACM0, COM3          pyserial serial.Serial (the default)
+    raw:///dev/ttyACM0          RawTransport, the POSIX file descriptor set up with termios, without pyserial,
+                                raw:///dev/ttyACM0?low_latency=1 also sets ASYNC_LOW_LATENCY (linux)
+    pty://                      PtyTransport, a new pseudo terminal for a local stand-in of the uC, see peer_name()
+    tcp://host:port             SocketTransport over TCP, e.g. to a network bridge of the serial port
+    unix:///path/to/socket      SocketTransport over a unix domain socket
+    socket://, rfc2217://, ...  the pyserial URL handlers (serial.serial_for_url)
+
+every uC_api, AsyncUC or uC_cluster also takes a transport object instead of a path.
+
+a connection closed by the other side (e.g. a socket to a bridge) raises ConnectionResetError, like an
+unplugged serial port raises serial.SerialException, the API then closes the connection.
+RawTransport and PtyTransport need POSIX file descriptors, on windows the serial ports are opened with pyserial.
+"""
+
+# linux ioctls of the serial driver, to set ASYNC_LOW_LATENCY
+TIOCGSERIAL = 0x541E
+TIOCSSERIAL = 0x541F
+ASYNC_LOW_LATENCY = 1 << 13
+
+# maximum number of bytes peeked at to find the bytes waiting on a socket without FIONREAD (windows)
+PEEK_SIZE = 65536
+
+if sys.platform != "win32":
+    import fcntl
+    import termios
+    import tty
+    FIONREAD = termios.FIONREAD
+
+    def _bytes_waiting(file_descriptor):
+        """ the number of bytes that can be read from the file descriptor, with the FIONREAD ioctl
+        """
+        waiting = array.array("i", (0,))
+        fcntl.ioctl(file_descriptor, FIONREAD, waiting, True)
+        return waiting[0]
+
+
+def open_transport(serial_port_path):
+    """ opens the transport for the path or URL, see the module description
+
+    @param serial_port_path: (string or transport) the path of the serial port or an URL, a transport object is returned as it is
+    @return: the open transport
+    """
+    if not isinstance(serial_port_path, str):
+        return serial_port_path
+    if serial_port_path.startswith("raw://"):
+        path, _, query = serial_port_path[len("raw://"):].partition("?")
+        options = parse_qs(query, keep_blank_values=True)
+        for option in options:
+            if option != "low_latency":
+                raise ValueError("unknown option "+option+" of "+serial_port_path+", only low_latency is supported")
+        low_latency = options.get("low_latency", ["0"])[-1].lower() in ("", "1", "true", "yes", "on")
+        return RawTransport(path, low_latency=low_latency)
+    if serial_port_path.startswith("pty://"):
+        return PtyTransport()
+    if serial_port_path.startswith("tcp://"):
+        host, _, port = serial_port_path[len("tcp://"):].rpartition(":")
+        return SocketTransport((host, int(port)))
+    if serial_port_path.startswith("unix://"):
+        return SocketTransport(serial_port_path[len("unix://"):])
+    if "://" in serial_port_path:
+        # the URL handlers of pyserial write blocking, some of them raise with write_timeout=0
+        return serial.serial_for_url(serial_port_path, 115200, timeout=None, write_timeout=None)
+    return serial.Serial(serial_port_path, 115200, timeout=None, write_timeout=0) #its USB so the speed setting gets ignored and it runes at max speed
+
+
+class FileDescriptorTransport:
+    """ transport on a non blocking POSIX file descriptor, base of RawTransport and PtyTransport
+    """
+    def __init__(self, file_descriptor):
+        """ @param file_descriptor: (int) the open file descriptor, it is set non blocking and closed with the transport
+        """
+        if sys.platform == "win32":
+            raise serial.SerialException(type(self).__name__+" needs a POSIX file descriptor, on windows open the serial port with pyserial")
+        self._file_descriptor = file_descriptor
+        os.set_blocking(file_descriptor, False)
+
+    @property
+    def in_waiting(self):
+        return _bytes_waiting(self._file_descriptor)
+
+    def readinto(self, byte_view):
+        try:
+            return os.readv(self._file_descriptor, (byte_view,))
+        except BlockingIOError:
+            return 0
+
+    def write(self, byte_buffer):
+        try:
+            return os.write(self._file_descriptor, byte_buffer)
+        except BlockingIOError:
+            return 0
+
+    def fileno(self):
+        return self._file_descriptor
+
+    def close(self):
+        if self._file_descriptor is not None:
+            os.close(self._file_descriptor)
+            self._file_descriptor = None
+
+
+class RawTransport(FileDescriptorTransport):
+    """ serial port opened as a raw POSIX file descriptor and set up with termios, without pyserial (linux, mac)
+    """
+    def __init__(self, serial_port_path, baudrate=termios.B115200 if sys.platform != "win32" else None, low_latency=False):
+        """ @param serial_port_path: (string) the path of the serial port
+            @param baudrate: (termios constant) the baud rate, ignored by USB serial ports (optional, default = termios.B115200)
+            @param low_latency: (bool) if True ASYNC_LOW_LATENCY is set, so the driver hands over received bytes at once,
+                   only linux serial drivers that support it, otherwise a warning is logged (optional, default = False)
+        """
+        if sys.platform == "win32":
+            raise serial.SerialException("RawTransport needs a POSIX file descriptor, on windows open the serial port with pyserial")
+        file_descriptor = os.open(serial_port_path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            tty.setraw(file_descriptor, termios.TCSANOW)
+            attributes = termios.tcgetattr(file_descriptor)
+            # 8N1 without flow control, reads return what is availible
+            attributes[2] = (attributes[2] | termios.CLOCAL | termios.CREAD) & ~termios.CRTSCTS
+            attributes[4] = attributes[5] = baudrate
+            attributes[6][termios.VMIN] = 0
+            attributes[6][termios.VTIME] = 0
+            termios.tcsetattr(file_descriptor, termios.TCSANOW, attributes)
+        except termios.error as error:
+            os.close(file_descriptor)
+            raise serial.SerialException("could not set up "+serial_port_path+": "+str(error))
+        super().__init__(file_descriptor)
+        self.port = serial_port_path
+        if low_latency:
+            self.set_low_latency_mode()
+
+    def set_low_latency_mode(self):
+        """ sets ASYNC_LOW_LATENCY in the serial driver (linux)
+
+        @return: (bool) True if the driver took it
+        """
+        serial_struct = array.array("i", [0]*32)
+        try:
+            fcntl.ioctl(self._file_descriptor, TIOCGSERIAL, serial_struct, True)
+            # flags is the 5th int of struct serial_struct
+            serial_struct[4] |= ASYNC_LOW_LATENCY
+            fcntl.ioctl(self._file_descriptor, TIOCSSERIAL, serial_struct)
+        except OSError as error:
+            logging.warning("could not set the serial port "+self.port+" to low latency: "+str(error))
+            return False
+        return True
+
+
+class PtyTransport(FileDescriptorTransport):
+    """ a new pseudo terminal, the API uses the master side, a local stand-in of the uC opens peer_name() (linux, mac)
+
+        transport = PtyTransport()
+        start_stand_in(transport.peer_name())
+        uc = uC_api(transport)
+    """
+    def __init__(self):
+        if sys.platform == "win32":
+            raise serial.SerialException("PtyTransport needs a POSIX pseudo terminal, it is not availible on windows")
+        master, peer = os.openpty()
+        tty.setraw(master)
+        tty.setraw(peer)
+        super().__init__(master)
+        # kept open, so the master side does not report a hang up before the stand-in opened the peer
+        self._peer = peer
+        self.port = os.ttyname(peer)
+
+    def peer_name(self):
+        """ getter method for the path of the other side of the pseudo terminal, for the stand-in
+        """
+        return self.port
+
+    def close(self):
+        super().close()
+        if self._peer is not None:
+            os.close(self._peer)
+            self._peer = None
+
+
+class SocketTransport:
+    """ transport over a TCP or unix domain socket, e.g. a network bridge of the serial port or a local stand-in of the uC
+    """
+    def __init__(self, address):
+        """ @param address: ((string, int) or string or socket.socket) host and port for TCP, a path for a unix domain socket,
+                   or a connected socket
+        """
+        if isinstance(address, socket.socket):
+            self._socket = address
+        elif isinstance(address, tuple):
+            self._socket = socket.create_connection(address)
+            # packets are written in batches, they should not wait for an acknowledgement
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(address)
+        self._socket.setblocking(False)
+        self.port = str(address) if not isinstance(address, socket.socket) else str(address.getpeername())
+
+    @property
+    def in_waiting(self):
+        # windows has no FIONREAD for sockets in python, the waiting bytes are peeked at instead
+        waiting = _bytes_waiting(self._socket.fileno()) if sys.platform != "win32" else 0
+        if waiting == 0:
+            try:
+                waiting = len(self._socket.recv(PEEK_SIZE, socket.MSG_PEEK))
+            except BlockingIOError:
+                return 0
+            if waiting == 0:
+                # a socket closed by the other side is readable without bytes, it is reported as an error like an unplugged serial port
+                raise ConnectionResetError("the connection to "+self.port+" was closed by the other side")
+        return waiting
+
+    def readinto(self, byte_view):
+        try:
+            return self._socket.recv_into(byte_view)
+        except BlockingIOError:
+            return 0
+
+    def write(self, byte_buffer):
+        try:
+            return self._socket.send(byte_buffer)
+        except BlockingIOError:
+            return 0
+
+    def fileno(self):
+        return self._socket.fileno()
+
+    def close(self):
+        self._socket.close()
@@ -17,16 +17,28 @@
 
 
 import logging
+import queue
+import select
+import struct
 import threading
 import serial
 from .packet import *
+from .framing import FrameDecoder
+from .statistics import BatchHistogram
+from .notifier import Notifier, FALLBACK_POLL_INTERVAL
+from .link import LinkState
+from .batch_queue import BatchQueue
+from .flow_control import SendPolicy, WaterMarks
+from .scheduler import TimedScheduler
+from .process_io import ProcessConnection
+from .transport import open_transport
+from .subscription import Subscription, Subscriptions, in_callback
 from .header import *
-from time import sleep
+from time import sleep, monotonic
 from .interface_pin import Interface_PIN
 from .interface_i2c import Interface_I2C
 from .interface_spi import Interface_SPI
 from .interface_async import Interface_Async
-from queue import Queue
 
 class FIRMWARE_VERSION(enum.IntEnum):
     """FIRMWARE_VERSION specifies the version of the uC firmware that this API is compatible with
@@ -36,6 +48,32 @@ class FIRMWARE_VERSION(enum.IntEnum):
     FIRMWARE_VERSION_MINOR = 9
     FIRMWARE_VERSION_PATCH = 2
 
+def check_firmware_version(align_packet):
+    """check_firmware_version logs the firmware version reported by the uC after the alignment
+    and warns if it does not match the API version
+
+    :param align_packet: the OUT_ALIGN_SUCCESS_VERSION packet of the uC
+    :type align_packet: ErrorPacket
+    """
+    logging.info("uC is ready - firmware version: "+str(align_packet.original_header())+"."+str(align_packet.original_sub_header())+"."+str(align_packet.value()))
+    # check if the firmware version matches the API version
+    if align_packet.original_header() != FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR or align_packet.original_sub_header() != FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR or align_packet.value() < FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH:
+        logging.warning("uC firmware version does not match the API version: \nfirmware version: "+str(align_packet.original_header())+"."+str(align_packet.original_sub_header())+"."+str(align_packet.value())+" \nAPI version: "+str(int(FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR))+"."+str(int(FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR))+"."+str(int(FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH)))
+
+"""
+maximum time in seconds the reader and writer thread block if there is nothing to do,
+and the writer blocks if it waits for free spots in the instruction buffer of the uC
+"""
+IDLE_WAIT_TIMEOUT = 0.1
+FREE_SPOTS_WAIT_TIMEOUT = 0.001
+
+"""
+time in seconds after which the alignment is send again while connecting, if the uC did not answer,
+the interval doubles with every try up to ALIGN_RETRY_MAX_INTERVAL
+"""
+ALIGN_RETRY_INTERVAL = 0.05
+ALIGN_RETRY_MAX_INTERVAL = 1.0
+
 class uC_api:
     """ 
     the class uC_api exposes the full interface to the uC as an object, 
@@ -50,24 +88,103 @@ class uC_api:
     after you are done call close_connection to sever the serial connection to the uC, 
     the recorded data in the python object remains and can be processed after
     """
-    def __init__(self, serial_port_path, api_level=2):
+    def __init__(self, serial_port_path, api_level=2, packet_views=False, packet_cache_size=1024, packet_pool=False, max_write_batch=1024, credit_prediction=True,
+                 high_water_mark=None, low_water_mark=None, send_policy=SendPolicy.BLOCK, reactor=None, process_io=False, connect_timeout=10.0, route_in_io_thread=False):
         """__init__ creates the uC interface object and establishes the connection to the uC on the given port
 
-        :param serial_port_path: the path of your system to the serial port, eg. on linux it might be /dev/ttyAMC0 or higher, on mac /dev/tty.usbmodem<XXXXX> on windows <COM port>
-        :type serial_port_path: string 
+        :param serial_port_path: the path of your system to the serial port, eg. on linux it might be /dev/ttyAMC0 or higher, on mac /dev/tty.usbmodem<XXXXX> on windows <COM port>,
+        or an URL of another transport (raw://, pty://, tcp://, unix:// or a pyserial URL) or a transport object, see transport.open_transport
+        :type serial_port_path: string or transport
         :param api_level: level 1 is that the api only espablishes the connection to the uC and the "infinite" write and read buffers, you need to construct the instruction packages your self, 
         level 2 it wraps the full representation of the uC interfaces in objects that are made availible as variables on this object, defaults to 2
         :type api_level: int, optional
+        :param packet_views: if True received packets are handed out as PacketView, which only decodes fields on access, instead of full packet objects, error packets are always full objects, defaults to False
+        :type packet_views: bool, optional
+        :param packet_cache_size: number of encoded packet templates kept for repeated instructions, see send_cached, defaults to 1024
+        :type packet_cache_size: int, optional
+        :param packet_pool: if True received packets are recycled with a packet.PacketPool after update_state processed them, to reduce the garbage collector load, level 2 only, defaults to False
+        :type packet_pool: bool, optional
+        :param max_write_batch: maximum number of packets that are coalesced into one serial write, defaults to 1024
+        :type max_write_batch: int, optional
+        :param credit_prediction: if True the free instruction spots on the uC are predicted from the execution times of the send timed packets, instead of requesting them from the uC, defaults to True
+        :type credit_prediction: bool, optional
+        :param high_water_mark: number of packets waiting in a write buffer at which it is full and send_policy applies, for the instant and the timed buffer each,
+        keeps the memory bounded if the packets are created faster than the uC executes them, defaults to None (unbounded)
+        :type high_water_mark: int, optional
+        :param low_water_mark: number of waiting packets down to which a full write buffer has to be drained before it takes packets again, defaults to None (half the high water mark)
+        :type low_water_mark: int, optional
+        :param send_policy: what the send functions do if the write buffer is full: SendPolicy.BLOCK waits, SendPolicy.RAISE raises queue.Full,
+        SendPolicy.FUTURE queues the packet and returns a concurrent.futures.Future that is done when the buffer is drained, defaults to SendPolicy.BLOCK
+        :type send_policy: flow_control.SendPolicy or str, optional
+        :param reactor: the uC_cluster whose I/O thread serves this connection instead of own communication threads, set by uC_cluster, defaults to None
+        :type reactor: uC_cluster, optional
+        :param process_io: if True the serial connection is opened in a child process, which reads, frames, decodes and writes the bytes
+        and exchanges them through shared memory ring buffers, so the serial I/O does not compete with the main thread for the GIL,
+        the received packets are built from the decoded columns (packet_views only applies to packets that are not Data32bitPacket), needs numpy, defaults to False
+        :type process_io: bool, optional
+        :param connect_timeout: maximum time in seconds to wait for the uC to answer the alignment when connecting, defaults to 10.0
+        :type connect_timeout: float, optional
+        :param route_in_io_thread: if True the communication thread hands the received packets to the interfaces as they arrive,
+        so the getters of the interfaces read the current state without processing the read buffer first, level 2 only, defaults to False
+        :type route_in_io_thread: bool, optional
         """
         self.__experiment_state = []
         self.__experiment_state_timestamp = []
         connection = None
-        self.__read_buffer = Queue()
-        self.__write_buffer_timed = Queue()
-        self.__write_buffer = Queue()
+        # single producer single consumer queues, the reader thread puts all packets of one read at once
+        self.__read_buffer = BatchQueue()
+        self.__write_buffer_timed = BatchQueue()
+        self.__write_buffer = BatchQueue()
+        # packets waiting in the write buffers, the main thread is held back by send_policy if they reach the high water mark
+        self.instant_water_marks = WaterMarks(high_water_mark, low_water_mark)
+        self.timed_water_marks = WaterMarks(high_water_mark, low_water_mark)
+        self.__send_policy = SendPolicy(send_policy)
+        # wakes up the writer thread when a packet is placed in a write buffer or free spots are reported,
+        # the boards of a uC_cluster share the notifier of the reactor thread
+        self.__notifier = Notifier() if reactor is None else reactor.notifier()
+        # wakes up the reader thread when the connection is closed
+        self.__reader_notifier = Notifier() if reactor is None else None
+        # credit and alignment state shared by the reader and the writer thread
+        self.__link_state = LinkState(credit_prediction)
+        # cuts the received bytes into packets and resynchronizes the stream, used by the alignment and then the reader thread
+        self.__frame_decoder = FrameDecoder()
         self.__communication_thread = threading.Thread(target=self.__thread_function, args=(serial_port_path,))
+        self.__reactor = reactor
+        self.__process_io = process_io
+        if process_io:
+            # the child process decodes the received stream with the batch api, raises ImportError without numpy
+            from . import batch
+        # set when the serial connection is closed, or could not be aligned
+        self.__connection_closed = threading.Event()
+        # set when the uC answered the alignment, the time it took is kept for connect_time()
+        self.__connected = threading.Event()
+        self.__connect_timeout = connect_timeout
+        self.__connect_time = None
+        # alignments send while connecting that the uC did not answer yet, their late answers are dropped by the reader
+        self.__unanswered_alignments = 0
+        # writer loop runs without free spots on the uC
+        self.__idle_write_uc = 0
         self.__last_timed_packet = 0
         self.__api_level = api_level
+        self.__packet_views = packet_views
+        self.packet_cache = PacketTemplateCache(packet_cache_size)
+        self.__max_write_batch = max_write_batch
+        # number of packets per serial write, to see how well the USB bulk transfers are used
+        self.instant_write_batches = BatchHistogram()
+        self.timed_write_batches = BatchHistogram()
+        # keeps the timed packets of interleaved producers in execution time order, owned by the writer thread
+        self.timed_scheduler = TimedScheduler()
+        # on level 1 the packets are handed to the user, so they can not be recycled
+        self.__packet_pool = PacketPool() if (packet_pool and api_level == 2) else None
+        if packet_pool and api_level != 2:
+            logging.warning("the packet pool is only availible in API level 2, it is not used")
+        self.__route_in_io_thread = route_in_io_thread and api_level == 2
+        if route_in_io_thread and api_level != 2:
+            logging.warning("routing in the communication thread is only availible in API level 2, it is not used")
+        # held while the received packets are processed, the interfaces take it to take their recorded data out
+        self.state_lock = threading.RLock()
+        # callbacks for the received packets by header, called by the communication thread, see subscribe
+        self.__subscriptions = Subscriptions()
         if api_level == 2:
             # create all the interface objects
             self.errors = []
@@ -82,56 +199,89 @@ class uC_api:
             self.async_from_chip = []
             for async_id in range(8):
                 self.async_from_chip.append(Interface_Async(self,async_id,"FROM_CHIP"))
-        self.__communication_thread.start()
-        # wait for 10 seconds for the uC to align
-        connection = False
+            self.__build_routes()
+        if reactor is None:
+            self.__communication_thread.start()
+        else:
+            reactor.register(self, serial_port_path)
         
 
     def update_state(self):
         """update_state This method processes all availible messages from the uC and updates the internal representaion
         in detail it distributes the recorded packages to the coresponding interfaces for processing.
 
+        with route_in_io_thread the communication thread already processed all messages, nothing is left to do
+
         level 2 only
         """
-        # process all availible messages from the uC one by one
-        while not self.__read_buffer.empty():
-            # get the next package
-            packet_to_process = self.__read_buffer.get()
-            # choose the interface to process the package
-            if isinstance(packet_to_process, ErrorPacket):
-                header_for_sorting = packet_to_process.original_header()
-            else:
-                header_for_sorting = packet_to_process.header()
-        
-            no_match = True
-            # high level experiment control packet
-            if header_for_sorting == Data32bitHeader.IN_SET_TIME:
-                self.__experiment_state.append(packet_to_process.value())
-                self.__experiment_state_timestamp.append(packet_to_process.time())
-                no_match = False
-                continue
-            # iterate though all interfaces and check if they signal they are responcible for that header
-            for interface in self.async_to_chip + self.async_from_chip + self.spi + self.i2c:
-                if header_for_sorting in interface.header():
-                    interface.process_packet(packet_to_process)
-                    self.__read_buffer.task_done()
-                    no_match = False
-                    break
-            # pins use all the same header, so we assing the package to the pin object with the same id
-            if header_for_sorting == self.pin[0].header()[0]:
-                    self.pin[packet_to_process.value()].process_packet(packet_to_process)
-                    self.__read_buffer.task_done()
-                    no_match = False
-                    continue
-            elif header_for_sorting in self.pin[0].header():
-                    self.pin[packet_to_process.pin_id()].process_packet(packet_to_process)
-                    self.__read_buffer.task_done()
-                    no_match = False
-                    continue
+        if self.__route_in_io_thread:
+            return
+        # process all availible messages from the uC, they are taken out of the read buffer in one chunk
+        self.__process_read_packets(self.__read_buffer.get_many())
+
+    def __process_read_packets(self, packets_to_process):
+        """__process_read_packets distributes the recorded packages to the coresponding interfaces,
+        called by update_state, or by the communication thread with route_in_io_thread
+
+        :param packets_to_process: the packages to process
+        :type packets_to_process: list
+        """
+        with self.state_lock:
+            for packet_to_process in packets_to_process:
+                self.__process_read_packet(packet_to_process)
+                # the interfaces only keep the values, so the packet object can be reused by the communication thread
+                if self.__packet_pool is not None:
+                    self.__packet_pool.release(packet_to_process)
+
+    def __process_read_packet(self, packet_to_process):
+        """__process_read_packet distributes one recorded package to the coresponding interface for processing
+
+        :param packet_to_process: the package to process
+        :type packet_to_process: Packet, or any subclass, or PacketView
+        """
+        # choose the interface to process the package
+        if isinstance(packet_to_process, ErrorPacket) or (isinstance(packet_to_process, PacketView) and packet_to_process.packet_class() is ErrorPacket):
+            header_for_sorting = packet_to_process.original_header()
+        else:
+            header_for_sorting = packet_to_process.header()
+
+        # one lookup of the interface responsible for the header, see __build_routes
+        route = self.__routes.get(header_for_sorting)
+        if route is None:
             # if no interface is responcible for the package, we add it to the error package list
-            if no_match:
-                self.errors.append(str(packet_to_process))
-                self.__read_buffer.task_done()
+            self.errors.append(str(packet_to_process))
+        elif route.__class__ is tuple:
+            # pins use all the same header, so we assing the package to the pin object with the same id
+            # (the configuration acknowledgement carries the pin id as value)
+            pin_processors, pin_id_in_value = route
+            pin_processors[packet_to_process.value() if pin_id_in_value else packet_to_process.pin_id()](packet_to_process)
+        else:
+            route(packet_to_process)
+
+    def __build_routes(self):
+        """__build_routes creates the routing table of update_state, which maps every header to the process_packet function
+        of the interface that is responsible for it, pin headers map to the process_packet functions of all pins and
+        if the pin id is the value of the packet (configuration) or its pin id
+
+        level 2 only
+        """
+        routes = {}
+        # high level experiment control packet
+        routes[Data32bitHeader.IN_SET_TIME] = self.__record_experiment_state
+        for interface in self.async_to_chip + self.async_from_chip + self.spi + self.i2c:
+            for header in interface.header():
+                routes.setdefault(header, interface.process_packet)
+        pin_processors = tuple(pin.process_packet for pin in self.pin)
+        pin_headers = self.pin[0].header()
+        for header in pin_headers:
+            routes[header] = (pin_processors, header == pin_headers[0])
+        self.__routes = routes
+
+    def __record_experiment_state(self, packet_to_process):
+        """__record_experiment_state keeps the history of started and stopped experiments
+        """
+        self.__experiment_state.append(packet_to_process.value())
+        self.__experiment_state_timestamp.append(packet_to_process.time())
 
     def __str__(self):
         self.update_state()
@@ -139,8 +289,17 @@ class uC_api:
             "\nExperiment state: " + str(self.__experiment_state) + \
             "\nExperiment state timestamp: " + str(self.__experiment_state_timestamp) + \
             "\nlast timed packet: " + str(self.__last_timed_packet) + \
-            "\nfree input queue spots on uC: " + str(free_input_queue_spots_on_uc ) + \
+            "\nfree input queue spots on uC: " + str(self.__link_state.free_spots()) + \
+            "\nconnect time: " + ("{:.1f} ms".format(self.__connect_time * 1000) if self.__connect_time is not None else "not connected") + \
+            "\n" + str(self.__link_state) + \
+            "\n" + str(self.__frame_decoder) + \
             "\napilevel: " + str(self.__api_level) + \
+            "\npacket cache: " + str(self.packet_cache) + \
+            "\ninstant writes: " + str(self.instant_write_batches) + \
+            "\ntimed writes: " + str(self.timed_write_batches) + \
+            "\ninstant write buffer: " + str(self.instant_water_marks) + \
+            "\ntimed write buffer: " + str(self.timed_water_marks) + \
+            "\ntimed scheduler: " + str(self.timed_scheduler) + \
             "\nERRORS: "+str(self.errors) + "\n"
 
     def start_experiment(self):
@@ -171,24 +330,232 @@ class uC_api:
         """
         return (self.__experiment_state, self.__experiment_state_timestamp)
 
+    def link_state(self):
+        """link_state getter method for the credit state of the connection, e.g. the free instruction spots on the uC,
+        the number of send requests for them and the mean occupancy of the uC instruction buffer during the experiment
+
+        :return: the credit and alignment state of the connection
+        :rtype: link.LinkState
+        """
+        return self.__link_state
+
+    def wait_for_connection(self, timeout=None):
+        """wait_for_connection blocks until the uC answered the alignment, or the connection failed
+
+        :param timeout: maximum time in seconds to wait, defaults to None (until connected or failed)
+        :type timeout: float, optional
+        :return: True if the uC is connected
+        :rtype: bool
+        """
+        start = monotonic()
+        while not self.__connected.is_set() and not self.__connection_closed.is_set():
+            wait_time = IDLE_WAIT_TIMEOUT if timeout is None else min(IDLE_WAIT_TIMEOUT, start + timeout - monotonic())
+            if wait_time <= 0:
+                break
+            self.__connected.wait(wait_time)
+        return self.__connected.is_set()
+
+    def connect_time(self):
+        """connect_time getter method for the time from opening the connection until the uC answered the alignment
+
+        :return: the time in seconds, None if the uC is not connected (yet)
+        :rtype: float or None
+        """
+        return self.__connect_time
+
+    def frame_decoder(self):
+        """frame_decoder getter method for the decoder of the received stream, e.g. how often the stream slipped,
+        the number of discarded bytes and the time until the stream was resynchronized
+
+        :return: the frame decoder of the connection
+        :rtype: framing.FrameDecoder
+        """
+        return self.__frame_decoder
+
     def send_packet(self, packet_to_send):
         """send_packet send a packet to the uC via the "infinite" buffer
         needs a package object see package.py
 
+        if the write buffer is full the send_policy applies, see __init__
+
         :param packet_to_send: the package to be send
         :type packet_to_send: Packet, or any subclass
+        :raises queue.Full: if the write buffer is full and the send policy is SendPolicy.RAISE
+        :return: with SendPolicy.FUTURE a future that is done when the write buffer is not full, otherwise None
+        :rtype: concurrent.futures.Future or None
         """
         # reset the time reference for the timed instructions
         if packet_to_send.header() == Data32bitHeader.IN_SET_TIME:
             self.__last_timed_packet = packet_to_send.value()
         # put the packet in the buffer depending if it s instant or timed
         if packet_to_send.time() == 0:
-            self.__write_buffer.put(packet_to_send)
+            return self.__queue(self.__write_buffer, self.instant_water_marks, packet_to_send, 1)
+        else:
+            # the timed packets do not need to be sorted, the writer releases them in time order, see scheduler.TimedScheduler
+            return self.__queue(self.__write_buffer_timed, self.timed_water_marks, packet_to_send, 1)
+
+    def send_many(self, packets_to_send):
+        """send_many send many packets to the uC via the "infinite" buffer,
+        the instant and the timed packets are each placed in their write buffer at once
+
+        if a write buffer is full the send_policy applies, see __init__
+
+        :param packets_to_send: the packages to be send
+        :type packets_to_send: iterable of Packet, or any subclass
+        :raises queue.Full: if a write buffer is full and the send policy is SendPolicy.RAISE, no packet is queued
+        :return: with SendPolicy.FUTURE a future that is done when the timed write buffer (or the instant one if there are no timed packets) is not full, otherwise None
+        :rtype: concurrent.futures.Future or None
+        """
+        instant_packets = []
+        timed_packets = []
+        for packet_to_send in packets_to_send:
+            # reset the time reference for the timed instructions
+            if packet_to_send.header() == Data32bitHeader.IN_SET_TIME:
+                self.__last_timed_packet = packet_to_send.value()
+            if packet_to_send.time() == 0:
+                instant_packets.append(packet_to_send)
+            else:
+                timed_packets.append(packet_to_send)
+        # with SendPolicy.RAISE nothing is queued if one of the buffers is full
+        if self.__send_policy is SendPolicy.RAISE and \
+                ((instant_packets and self.instant_water_marks.full()) or (timed_packets and self.timed_water_marks.full())):
+            raise queue.Full("write buffer is full")
+        future = None
+        if instant_packets:
+            future = self.__queue(self.__write_buffer, self.instant_water_marks, instant_packets, len(instant_packets))
+        if timed_packets:
+            future = self.__queue(self.__write_buffer_timed, self.timed_water_marks, timed_packets, len(timed_packets))
+        return future
+
+    def send_cached(self, packet_class, header, *fields, time=0):
+        """send_cached send a packet to the uC via the "infinite" buffer without constructing the packet object,
+        the encoded packet is taken from the packet template cache and only the time is patched in,
+        see packet.PacketTemplateCache, the hits and misses can be read from uC_api.packet_cache
+
+        :param packet_class: the class of the packet, Data32bitPacket, PinPacket or ConfigPacket
+        :type packet_class: type
+        :param header: the header of the packet
+        :type header: Data32bitHeader, PinHeader or ConfigMainHeader
+        :param fields: the constructor arguments of the packet class except the time, e.g. pin_id, value for the PinPacket
+        :param time: the time in us after start_experiment when the packet should be executed, defaults to 0 (execute instantly)
+        :type time: int, optional
+        :return: see send_packet
+        :rtype: concurrent.futures.Future or None
+        """
+        byte_array = self.packet_cache.encode(packet_class, header, *fields, time=time)
+        if byte_array is not None:
+            return self.send_encoded(byte_array, timed=(time != 0))
+
+    def send_encoded(self, byte_buffer, timed=True):
+        """send_encoded send already encoded packets to the uC via the "infinite" buffer
+        the buffer is send as a whole and no Packet objects are created, see batch.encode_many
+
+        all packets in the buffer need to be either instant (time 0) or timed and sorted in time,
+        the timed buffers of different producers are merged in time order by the writer, see scheduler.TimedScheduler
+
+        :param byte_buffer: the encoded packets, N*9 bytes
+        :type byte_buffer: bytes, bytearray or memoryview
+        :param timed: if the packets are timed (time > 0) and need to be send to the uC instruction buffer, defaults to True
+        :type timed: bool, optional
+        :raises queue.Full: if the write buffer is full and the send policy is SendPolicy.RAISE
+        :return: see send_packet
+        :rtype: concurrent.futures.Future or None
+        """
+        if len(byte_buffer) % 9 != 0 or len(byte_buffer) == 0:
+            logging.error("encoded buffer of "+str(len(byte_buffer))+" bytes does not contain complete packets, nothing is send")
+            return
+        # copy once, so the caller can reuse the buffer
+        byte_buffer = bytes(byte_buffer)
+        if timed:
+            self.__last_timed_packet = struct.unpack_from("<I", byte_buffer, len(byte_buffer)-8)[0]
+            return self.__queue(self.__write_buffer_timed, self.timed_water_marks, memoryview(byte_buffer), len(byte_buffer)//9)
         else:
-            self.__write_buffer_timed.put(packet_to_send)
-            # check if the timed instructions are sorted in time
-            if packet_to_send.time() < self.__last_timed_packet:
-                logging.warning("the instructions are not sorted in time - execution order will be inconsistent")
+            return self.__queue(self.__write_buffer, self.instant_water_marks, memoryview(byte_buffer), len(byte_buffer)//9)
+
+    def __queue(self, write_buffer, water_marks, items, number_of_packets):
+        """__queue places packets in a write buffer and wakes up the writer, the send policy applies if the buffer is full
+
+        :param items: one packet or encoded buffer, or a list of packets
+        :param number_of_packets: the number of packets in items
+        :return: with SendPolicy.FUTURE a future that is done when the write buffer is not full, otherwise None
+        """
+        if water_marks.full():
+            if self.__send_policy is SendPolicy.RAISE:
+                raise queue.Full("write buffer is full, "+str(water_marks.waiting())+" packets are waiting")
+            # in a callback of a subscription this is the communication thread, which drains the buffer itself
+            if self.__send_policy is SendPolicy.BLOCK and not in_callback():
+                # the writer drains the buffer, stop waiting if the connection is closed
+                while not water_marks.wait(IDLE_WAIT_TIMEOUT):
+                    if self.__connection_closed.is_set():
+                        logging.error("write buffer is full, but the connection to the uC is closed")
+                        break
+        if isinstance(items, list):
+            write_buffer.put_many(items)
+        else:
+            write_buffer.put(items)
+        water_marks.add(number_of_packets)
+        self.__notifier.notify()
+        if self.__send_policy is SendPolicy.FUTURE:
+            return water_marks.drained()
+        return None
+
+    def subscribe(self, headers, callback, min_batch=1, max_latency_us=None, pin_id=None, value_of=None):
+        """subscribe registers a callback for the received packets with the given headers, it is called by the communication thread
+        with batches of their values and times as they arrive, so the packets do not wait for update_state or read_packet.
+        the packets are still placed in the read buffer or processed by the interfaces as before
+
+        the batch is delivered when it has min_batch packets, or max_latency_us after its first packet was received,
+        the callback should return quickly, as the communication thread does not read while it runs.
+        the callback can send packets, the send functions do not block in it: with SendPolicy.BLOCK the packets are placed
+        in the write buffer even if it is full, as only the communication thread can drain it
+
+        :param headers: the header or the headers of the packets, e.g. Data32bitHeader.OUT_ASYNC_FROM_CHIP2
+        :type headers: Header or list of Header
+        :param callback: called with (values, times), two index matched lists
+        :type callback: callable
+        :param min_batch: number of packets at which the batch is delivered, defaults to 1
+        :type min_batch: int, optional
+        :param max_latency_us: maximum time in us a received packet waits in an incomplete batch, defaults to None (wait for min_batch)
+        :type max_latency_us: int, optional
+        :param pin_id: only the packets of this pin, for the pin headers, defaults to None
+        :type pin_id: int, optional
+        :param value_of: returns the value of a packet for the batch, e.g. a tuple of the fields of an I2C packet, defaults to None (packet.value())
+        :type value_of: callable, optional
+        :raises ValueError: if a header is unknown or has no time (error packets), or pin_id is given for headers that are not pin headers
+        :return: the subscription, to cancel it with unsubscribe
+        :rtype: subscription.Subscription
+        """
+        subscription = Subscription(headers, callback, min_batch, max_latency_us, pin_id, value_of)
+        for header in subscription.headers():
+            kind = HEADER_KIND[int(header)]
+            if kind == KIND_UNKNOWN or kind == KIND_ERROR:
+                raise ValueError("can not subscribe to "+str(header)+", only to packets with a time (data, pin and configuration packets)")
+            if pin_id is not None and kind != KIND_PIN:
+                raise ValueError("pin_id is only availible for pin headers, not for "+str(header))
+        self.__subscriptions.add(subscription)
+        if max_latency_us is not None:
+            # the reader thread of an idle connection waits up to IDLE_WAIT_TIMEOUT, it has to check the latency bound earlier
+            if self.__reader_notifier is not None:
+                self.__reader_notifier.notify()
+            else:
+                self.__notifier.notify()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """unsubscribe cancels a subscription, the packets waiting in its incomplete batch are not delivered
+
+        :param subscription: the subscription returned by subscribe
+        :type subscription: subscription.Subscription
+        """
+        self.__subscriptions.remove(subscription)
+
+    def subscriptions(self):
+        """subscriptions getter method for the callbacks registered with subscribe
+
+        :return: the subscriptions
+        :rtype: subscription.Subscriptions
+        """
+        return self.__subscriptions
 
     def read_packet(self):
         """read_packet returns one package from the uC via the "infinte" buffer
@@ -196,12 +563,10 @@ class uC_api:
         if there is no packet availible it blocks and waits until a packet becomes availible
 
         :return: one package from the uC
-        :rtype: Packet, or any subclass
+        :rtype: Packet, or any subclass, or PacketView if enabled
         """
         if self.__api_level == 1:
-            read_packet = self.__read_buffer.get()
-            self.__read_buffer.task_done()
-            return read_packet
+            return self.__read_buffer.get()
         else:
             logging.error("reading raw packets is only availible in API level 1")
 
@@ -224,17 +589,25 @@ class uC_api:
         """
         # place close connection packet in the write buffer, so the worker thread closes the connection and stop itself
         self.__write_buffer.put(Data32bitPacket(Data32bitHeader.UC_CLOSE_CONNECTION))
+        self.__notifier.notify()
         # add reset to the experiment state history
         self.__experiment_state.append(-1)
         self.__experiment_state_timestamp.append(-1)
-        # wait for the worker thread to close the connection
-        self.__communication_thread.join()
+        # wait for the worker thread to close the connection, unless the thread serving it ended without closing it
+        while not self.__connection_closed.wait(IDLE_WAIT_TIMEOUT):
+            if not (self.__communication_thread.is_alive() if self.__reactor is None else self.__reactor.is_alive()):
+                logging.error("the communication thread ended without closing the connection")
+                break
+        if self.__reactor is None:
+            self.__communication_thread.join()
 
     def reset(self):
         """reset uC and hope the serial connection survives
         """
-        # place reset packet in the write buffer, so the worker thread sends it
+        # place reset packet in the write buffer, so the worker thread sends it, even if the buffer is full
         self.__write_buffer.put(Data32bitPacket(Data32bitHeader.IN_RESET))
+        self.instant_water_marks.add(1)
+        self.__notifier.notify()
         # add reset to the experiment state history
         self.__experiment_state.append(-1)
         self.__experiment_state_timestamp.append(-1)
@@ -242,198 +615,375 @@ class uC_api:
     def __check_first_connection(self,connection):
         """__check_first_connection checks if the uC is responding and prints the firmware version
         if the firmware version does not match the API version it will print a warning
+
+        it returns as soon as the uC reports the successful alignment, while there is no answer the alignment is send again
+        with exponentially growing intervals, until connect_timeout
         """
-        connection_state = False
         logging.info("send: opening connection - aligning commuication")
-        # write 9 bytes to the uC to align the communication
-        connection.write(ALIGN_BYTEARRAY)
-        # wait for 10 seconds for the uC to align
-        for i in range(40):
-            # check if the uC has send a packet
-            if connection.in_waiting >= 9:
-                byte_packet = connection.read(size = 9)
-                # do reading alingnment
-                byte_packet = byte_packet.lstrip(b'\xff')
-                sleep(0.05)
-                # if the packet is not complete, try to recover by reading the rest of the packet
-                if len(byte_packet) < 9:
-                    if len(byte_packet) == 0:
-                        # no packet (was only alignment bytes), jump to next iteration
-                        continue
-                    elif connection.in_waiting < 9-len(byte_packet):
-                        # something went wrong, try again
-                        logging.error("partial packet received, but not enough bytes send by uC, trying to recover by realigning")
-                        connection.write(ALIGN_BYTEARRAY)
-                        continue
-                    # complete partial packet
+        start = monotonic()
+        deadline = start + self.__connect_timeout
+        retry_interval = ALIGN_RETRY_INTERVAL
+        next_alignment = start
+        try:
+            connection_file_descriptor = connection.fileno()
+        except (AttributeError, OSError):
+            connection_file_descriptor = None
+        while True:
+            now = monotonic()
+            if now >= deadline:
+                break
+            if now >= next_alignment:
+                # write 9 bytes to the uC to align the communication
+                connection.write(ALIGN_BYTEARRAY)
+                self.__unanswered_alignments += 1
+                next_alignment = now + retry_interval
+                retry_interval = min(retry_interval * 2, ALIGN_RETRY_MAX_INTERVAL)
+            # check if the uC has send something, the frame decoder removes the alignment padding,
+            # a partial packet stays in the decoder until the rest arrives
+            if connection.in_waiting > 0:
+                for read_packet in self.__read_packets(connection):
+                    # check if the packet is the expected Success packet
+                    if read_packet is not None and read_packet.header() == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                        self.__unanswered_alignments -= 1
+                        self.__connect_time = monotonic() - start
+                        logging.info("connected in {:.1f} ms".format(self.__connect_time * 1000))
+                        check_firmware_version(read_packet)
+                        # connection is established
+                        self.__connected.set()
+                        return True
                     else:
-                        byte_packet = bytearray(byte_packet).extend(bytearray(connection.read(size = 9-len(byte_packet))))
-                # convert the byte packet to a packet object
-                read_packet = Packet.from_bytearray(byte_packet)
-                # check if the packet is the expected Success packet
-                if read_packet.header() == ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
-                    logging.info("uC is ready - firmware version: "+str(read_packet.original_header())+"."+str(read_packet.original_sub_header())+"."+str(read_packet.value()))
-                    # check if the firmware version matches the API version
-                    if read_packet.original_header() != FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR or read_packet.original_sub_header() != FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR or read_packet.value() < FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH:
-                        logging.warning("uC firmware version does not match the API version: \nfirmware version: "+str(read_packet.original_header())+"."+str(read_packet.original_sub_header())+"."+str(read_packet.value())+" \nAPI version: "+str(int(FIRMWARE_VERSION.FIRMWARE_VERSION_MAJOR))+"."+str(int(FIRMWARE_VERSION.FIRMWARE_VERSION_MINOR))+"."+str(int(FIRMWARE_VERSION.FIRMWARE_VERSION_PATCH)))
-                    # connection is established
-                    connection = True
-                    connection_state = True
-                    return True
-                else:
-                    logging.warning("unknown packet received, while connecting to uC for the first time: "+str(read_packet))
-            sleep(0.25)
-        # connection failed after 40 tries/10sec
-        if connection_state == False:
-            logging.error("uC is not responding for 10 sec, wrong port?, no permission?")
-            return False
-
+                        logging.warning("unknown packet received, while connecting to uC for the first time: "+str(read_packet))
+                continue
+            # block until the uC sends something or the alignment is due again
+            wait_time = min(next_alignment, deadline) - now
+            if connection_file_descriptor is None:
+                sleep(min(wait_time, FALLBACK_POLL_INTERVAL))
+            else:
+                select.select([connection_file_descriptor], [], [], wait_time)
+        # connection failed after connect_timeout
+        logging.error("uC is not responding for "+str(self.__connect_timeout)+" sec, wrong port?, no permission?")
+        return False
+
+    def __write(self, connection, connection_file_descriptor, byte_buffer):
+        """__write writes the whole buffer to the serial connection,
+        the connection does not block on write (write_timeout=0), so it might only take a part of the buffer
+        """
+        byte_buffer = memoryview(byte_buffer)
+        while True:
+            number_of_bytes = connection.write(byte_buffer)
+            if number_of_bytes is None or number_of_bytes >= len(byte_buffer):
+                return
+            byte_buffer = byte_buffer[number_of_bytes:]
+            # wait until the connection can take more
+            if connection_file_descriptor is None:
+                sleep(FALLBACK_POLL_INTERVAL)
+            else:
+                select.select([], [connection_file_descriptor], [], IDLE_WAIT_TIMEOUT)
 
     def __thread_function(self,serial_port_path):
         """__thread_function internal function managing the actual async communication with the uC in the background
+        it opens the connection, aligns the communication and starts the reader thread, then it runs the writer
         """
-        idle_write_pc = False
-        idle_write_uc = 0
-        idle_read = False
-        free_input_queue_spots_on_uc  = -1
-        last_sent_time = 0
-        last_free_spots = 0
-        packet_send = 0
-        exec_running = 0
-        request_free_input_queue_spots = False
-        connection = serial.Serial(serial_port_path,115200, timeout= None, write_timeout=0) #its USB so the speed setting gets ignored and it runes at max speed
-        # init communication by forcing the uC to align
-        if not self.__check_first_connection(connection):
-            connection.close()
+        connection = self._open_connection(serial_port_path)
+        if connection is None:
+            self.__notifier.close()
+            self.__reader_notifier.close()
             return
-
-        # start communication
+        # the serial connection can only be waited on with select if it has a file descriptor (not on windows)
+        try:
+            connection_file_descriptor = connection.fileno()
+        except (AttributeError, OSError):
+            connection_file_descriptor = None
+        # reading and writing are independent, so a burst in one direction does not delay the other
+        reader_thread = threading.Thread(target=self.__reader_function, args=(connection, connection_file_descriptor))
+        reader_thread.start()
+        self.__writer_function(connection, connection_file_descriptor)
+        # the writer returns when the connection is closed by the API, or was lost
+        self.__link_state.close()
+        self.__reader_notifier.notify()
+        reader_thread.join()
+        self._close_connection(connection)
+        self.__notifier.close()
+        self.__reader_notifier.close()
+
+    def __writer_function(self, connection, connection_file_descriptor):
+        """__writer_function internal function sending the instant and timed packets to the uC, returns when the connection is closed
+        """
         while True:
-            # check if there is something to send
-            if not self.__write_buffer_timed.empty() or not self.__write_buffer.empty():
-                # set loop slowdown condition flags to false
-                idle_write_pc = False
-                # first write the instant packets
-                if not self.__write_buffer.empty():
-                    data_packet = self.__write_buffer.get()
-                    # check and close the connection if requested by API
-                    if data_packet.header() == Data32bitHeader.UC_CLOSE_CONNECTION:
-                        connection.write(Data32bitPacket(Data32bitHeader.IN_RESET).to_bytearray())
-                        connection.close()
-                        return
-                    # else send the packet
-                    connection.write(data_packet.to_bytearray())
-                    logging.debug("send instant: "+str(data_packet))
-                    self.__write_buffer.task_done()
-                # then write the timed packets
+            try:
+                wait_time = self._write_pending(connection, connection_file_descriptor)
+            except (OSError, serial.SerialException) as error:
+                self._connection_lost(error)
+                return
+            if wait_time is None:
+                return
+            if wait_time > 0:
+                # block until the main thread places a packet in a write buffer, or the reader reports free spots
+                self.__notifier.wait(wait_time)
+
+    def __reader_function(self, connection, connection_file_descriptor):
+        """__reader_function internal function receiving the packets from the uC, runs until the writer closes the connection
+        """
+        while not self.__link_state.closed():
+            try:
+                if connection.in_waiting > 0:
+                    self._read_pending(connection)
+                    waiting = True
                 else:
-                    # check if there is space in the uC input queue
-                    if free_input_queue_spots_on_uc  > 0 :
-                        # send the packet and decrease the free input queue spots reference in the API
-                        data_packet = self.__write_buffer_timed.get()
-                        free_input_queue_spots_on_uc  -= 1
-                        connection.write(data_packet.to_bytearray())
-                        last_sent_time = data_packet.time()
-                        packet_send += 1
-                        logging.debug("send timed: "+str(data_packet))
-                        self.__write_buffer_timed.task_done()
-                    else:
-                        # request the free input queue spots from the uC, 
-                        # first request is send instantly, then every 200th loop run through
-                        # to not overload the uC with requests, uC will also report the free input
-                        # queue spots when it frees up space and the queue was full before
-                        idle_write_uc += 1
-                        if idle_write_uc%200 == 1:
-                            if request_free_input_queue_spots == False:
-                                request_free_input_queue_spots = True
-                                packet_to_send = Data32bitPacket(Data32bitHeader.IN_FREE_INSTRUCTION_SPOTS)
-                                connection.write(packet_to_send.to_bytearray())
-                                logging.debug("send request: "+str(packet_to_send))
+                    waiting = False
+            except (OSError, serial.SerialException) as error:
+                # e.g. the uC was unplugged or the other side closed the socket, the writer closes the connection
+                self._connection_lost(error)
+                return
+            if waiting:
+                # a busy connection delivers the incomplete batches of the subscriptions that reached their latency bound too
+                self._flush_subscriptions()
             else:
-                # set write loop slowdown condition flag
-                idle_write_pc = True
-
-            # check if there is a package to read from the serial connection, 
-            # read 20 packages under the assumption that the pc is faster and
-            # the uC will send more packages 
-            # stops if there is nothing to read
-            for i in range(20):
-                if connection.in_waiting >= 9:
-                    idle_read = False
-                    byte_packet = connection.read(size = 9)
-                    # remove alignment bytes
-                    byte_packet = byte_packet.lstrip(b'\xff')
-                    # check if the packet is complete
-                    if len(byte_packet) < 9:
-                        if len(byte_packet) != 0:
-                            #initiate alignment for incompleate packets
-                            logging.warning("outgoing uC alignment needed, shifted by "+str(len(byte_packet))+ " bytes")
-                            # partial packet not recoverable
-                            if connection.in_waiting < 9-len(byte_packet):
-                                logging.error("partial packet received, but not enough bytes send by uC, trying to recover by realigning")
-                                connection.write(ALIGN_BYTEARRAY)
-                                continue
-                            # to complete partial packet
-                            byte_packet = bytearray(byte_packet).extend(bytearray(connection.read(size = 9-len(byte_packet))))
-
-                        else:
-                            logging.debug("alignment sucesss - no incoming alignment error")
-                            # no packet, jump to next iteration
-                            continue
-                    # is now aligned
-                    try:
-                        # convert the byte packet to a packet object
-                        read_packet = Packet.from_bytearray(byte_packet)
-                    except:
-                        # packet was malformed, force alignment sequence
-                        logging.error("packet is malformed, maybe misaligned, trying to recover by realigning")
-                        connection.write(ALIGN_BYTEARRAY)
-                        continue
-                    # packet is complete and valid
-                    logging.debug("read: "+str(read_packet))
-                    # catch the special case of the uC reporting free input queue spots
-                    if read_packet.header() is Data32bitHeader.OUT_FREE_INSTRUCTION_SPOTS:
-                        # save the free input queue spots in the API
-                        if read_packet.time() > last_sent_time and exec_running > 0:
-                            logging.warning("Timing exec squewed, increase buffer size in firmware, last sent time: "+\
-                                str(last_sent_time)+" uC time: "+str(read_packet.time())+\
-                                    "\npackets send: "+str(packet_send)+" for free spots: "+str(last_free_spots))    
-                        else:
-                            logging.debug("uC reports "+str(read_packet.value())+" free input queue spots at time "+\
-                                str(read_packet.time())+"\nwaiting on PC: "+str(self.__write_buffer_timed.qsize())+\
-                                    " with time starting from: "+str(last_sent_time)+\
-                                    "\npackets send: "+str(packet_send)+" for free spots: "+str(last_free_spots))
-                        last_free_spots = read_packet.value()
-                        packet_send = 0
-                        # set one less then availible, because of bug the pc will send to much
-                        free_input_queue_spots_on_uc  = read_packet.value()
-                        if free_input_queue_spots_on_uc == 0:
-                            idle_write_uc = 2
-                        else:
-                            idle_write_uc = 0
-                        request_free_input_queue_spots = False
-                    # catch the special case of the uC reporting an malformed packet from the API
-                    elif read_packet.header() is ErrorHeader.OUT_ERROR_UNKNOWN_INSTRUCTION or read_packet.header() is ErrorHeader.OUT_ERROR_UNKNOWN_CONFIGURATION:
-                        logging.error("uC is reporting that it cant understand a send packet, either API and firmware are a different version or communication is not aligned, trying to recover by realigning")
-                        connection.write(ALIGN_BYTEARRAY)
-                    # keep track of the experiment state, so we know when to issue a warning for execution time squew
-                    elif read_packet.header() == Data32bitHeader.IN_SET_TIME:
-                        exec_running = read_packet.value()
-                        logging.info("Experiment state changed to: "+str(exec_running))
-                        self.__read_buffer.put(read_packet)
-                    # normal packet, send to the read buffer for further processing by the main thread
-                    else:
-                        self.__read_buffer.put(read_packet)
+                due_in = self._flush_subscriptions()
+                wait_time = IDLE_WAIT_TIMEOUT if due_in is None else min(due_in, IDLE_WAIT_TIMEOUT)
+                # block until the uC sends something, without a file descriptor (windows) the connection is polled
+                if connection_file_descriptor is None:
+                    self.__reader_notifier.wait(min(wait_time, FALLBACK_POLL_INTERVAL))
                 else:
-                    # set read loop slowdown condition flag, as there is nothing to read
-                    idle_read = True
+                    self.__reader_notifier.wait(wait_time, connection_file_descriptor)
+
+    def _open_connection(self, serial_port_path):
+        """_open_connection opens the serial connection and aligns the communication,
+        called by the communication thread, or by the reactor thread of a uC_cluster
+
+        :return: the connection, None if it could not be opened or the uC did not respond
+        :rtype: transport (e.g. serial.Serial), process_io.ProcessConnection or None
+        """
+        connection = None
+        try:
+            if self.__process_io:
+                # the child process opens the serial connection, the rings behave like it
+                connection = ProcessConnection(serial_port_path)
+            else:
+                connection = open_transport(serial_port_path)
+            # init communication by forcing the uC to align
+            if self.__check_first_connection(connection):
+                return connection
+        except (OSError, serial.SerialException) as error:
+            logging.error("could not open the connection to "+str(serial_port_path)+": "+str(error))
+        if connection is not None:
+            try:
+                connection.close()
+            except (OSError, serial.SerialException):
+                pass
+        self.__link_state.close()
+        self.__connection_closed.set()
+        return None
+
+    def _close_connection(self, connection):
+        """_close_connection closes the serial connection after the writer send the reset,
+        called by the communication thread, or by the reactor thread of a uC_cluster
+        """
+        self.__link_state.close()
+        try:
+            connection.close()
+        except (OSError, serial.SerialException) as error:
+            # a lost connection can fail to close, it is gone anyway
+            logging.warning("could not close the connection cleanly: "+str(error))
+        # the packets received until now are delivered to the callbacks, also if their batch is incomplete
+        self.__subscriptions.flush_all()
+        self.__connection_closed.set()
+
+    def _connection_lost(self, error):
+        """_connection_lost marks the connection as closed after reading or writing failed (e.g. the uC was unplugged),
+        called by the communication threads, or by the reactor thread of a uC_cluster,
+        the next _write_pending returns None so the connection is closed like by close_connection()
+        """
+        if not self.__link_state.closed():
+            logging.error("the connection to the uC was lost: "+str(error))
+        self.__link_state.close()
+        self.__notifier.notify()
+
+    def _flush_subscriptions(self):
+        """_flush_subscriptions delivers the incomplete batches of the subscriptions that waited max_latency_us,
+        called by the reader thread, or by the reactor thread of a uC_cluster
+
+        :return: the time in seconds until the next incomplete batch is due, None if none waits
+        :rtype: float or None
+        """
+        return self.__subscriptions.flush_due()
+
+    def _write_pending(self, connection, connection_file_descriptor):
+        """_write_pending sends the waiting instant packets, or the timed packets that fit into the free spots on the uC, with one write,
+        called in a loop by the writer thread, or by the reactor thread of a uC_cluster
+
+        :return: the time in seconds until it needs to be called again, if nothing happens before (0 is immediately),
+            None if the connection was closed by the API or was lost
+        :rtype: float or None
+        """
+        # the connection was lost while the writer waited, nothing can be send anymore
+        if self.__link_state.closed():
+            return None
+        # the reader detected that the communication is misaligned
+        if self.__link_state.take_realign_request():
+            self.__write(connection, connection_file_descriptor, ALIGN_BYTEARRAY)
+        # first write the instant packets, all waiting packets (up to max_write_batch) are send with one write
+        if not self.__write_buffer.empty():
+            write_batch = []
+            number_of_packets = 0
+            close_connection = False
+            restart_clock = False
+            while number_of_packets < self.__max_write_batch and not self.__write_buffer.empty():
+                data_packet = self.__write_buffer.get()
+                # already encoded packets are send as they are
+                if isinstance(data_packet, memoryview):
+                    write_batch.append(data_packet)
+                    number_of_packets += len(data_packet)//9
+                    headers = data_packet[::9].tobytes()
+                    restart_clock = restart_clock or Data32bitHeader.IN_SET_TIME in headers or Data32bitHeader.IN_RESET in headers
+                # check and close the connection if requested by API, the packets before are still send
+                elif data_packet.header() == Data32bitHeader.UC_CLOSE_CONNECTION:
+                    close_connection = True
                     break
-            
-            # slow down the loop if there is nothing to do
-            if idle_read and (idle_write_pc or idle_write_uc > 0):
-                sleep(0.000003)
-                idle_read = False
-                idle_write_pc = False
-
-            
-                    
+                else:
+                    write_batch.append(data_packet.to_bytearray())
+                    number_of_packets += 1
+                    restart_clock = restart_clock or data_packet.header() == Data32bitHeader.IN_SET_TIME or data_packet.header() == Data32bitHeader.IN_RESET
+            if number_of_packets > 0:
+                self.__write(connection, connection_file_descriptor, b"".join(write_batch))
+                if restart_clock:
+                    # the timed packets of the next experiment are not compared with the ones send before
+                    self.timed_scheduler.restart_clock()
+                self.instant_write_batches.record(number_of_packets)
+                self.instant_water_marks.remove(number_of_packets)
+                logging.debug("send instant: %d packets", number_of_packets)
+            if close_connection:
+                self.__write(connection, connection_file_descriptor, Data32bitPacket(Data32bitHeader.IN_RESET).to_bytearray())
+                return None
+            return 0
+        # then write the timed packets, the scheduler releases them in execution time order
+        if self.timed_scheduler or not self.__write_buffer_timed.empty():
+            for data_packet in self.__write_buffer_timed.get_many():
+                self.timed_scheduler.push(data_packet)
+            free_spots = self.__link_state.free_spots()
+            # check if there is space in the uC input queue
+            if free_spots > 0:
+                self.__idle_write_uc = 0
+                # send the earliest timed packets, as many as there are free spots (up to max_write_batch), with one write,
+                # the rest stays in the scheduler
+                write_batch, number_of_packets = self.timed_scheduler.pop(min(free_spots, self.__max_write_batch))
+                # send the packets and decrease the free input queue spots reference in the API,
+                # the link state keeps the send packets to predict when their spots free up
+                write_bytes = b"".join(write_batch)
+                self.__write(connection, connection_file_descriptor, write_bytes)
+                self.__link_state.spots_sent(write_bytes)
+                self.timed_write_batches.record(number_of_packets)
+                self.timed_water_marks.remove(number_of_packets)
+                logging.debug("send timed: %d packets", number_of_packets)
+                return 0
+            # request the free input queue spots from the uC, 
+            # first request is send instantly, then every 200th loop run through
+            # to not overload the uC with requests, uC will also report the free input
+            # queue spots when it frees up space and the queue was full before
+            self.__idle_write_uc += 1
+            if self.__idle_write_uc%200 == 1 and self.__link_state.request_spots():
+                packet_to_send = Data32bitPacket(Data32bitHeader.IN_FREE_INSTRUCTION_SPOTS)
+                self.__write(connection, connection_file_descriptor, packet_to_send.to_bytearray())
+                logging.debug("send request: "+str(packet_to_send))
+            # waiting for free spots on the uC, the reader wakes the writer up when they are reported,
+            # but wake up regularly to request them again, or when the next spot is predicted to free up
+            next_free_in = self.__link_state.next_free_in()
+            if next_free_in is None:
+                return FREE_SPOTS_WAIT_TIMEOUT
+            return min(max(next_free_in, FREE_SPOTS_WAIT_TIMEOUT), IDLE_WAIT_TIMEOUT)
+        # nothing to send, wait until the main thread places a packet in a write buffer
+        return IDLE_WAIT_TIMEOUT
+
+    def __read_packets(self, connection):
+        """__read_packets reads everything that is availible and converts it to packet objects, used by the alignment and then the reader
+
+        :return: the received packets, None for a packet that could not be decoded
+        :rtype: list
+        """
+        if self.__process_io:
+            # the child process framed and decoded the stream, the packets are built from its columns without framing it again
+            headers, times, values = connection.read_columns()
+            self.__frame_decoder.count_frames(len(headers))
+            read_packets = []
+            for header, time, value in zip(headers, times, values):
+                if HEADER_KIND[header] == KIND_DATA32BIT and self.__packet_pool is None:
+                    read_packets.append(Data32bitPacket.from_unpacked((header, time, value)))
+                else:
+                    # the columns hold the raw bytes of the other packet layouts
+                    read_packets.append(self.__decode_frame(DATA32BIT_STRUCT.pack(header, time, value), 0))
+            return read_packets
+        # read everything that is availible with one read into the receive buffer
+        # the frame decoder cuts it into whole packets and removes the alignment padding,
+        # incomplete packets stay in the decoder until the rest arrives
+        frames = self.__frame_decoder.read_from(connection)
+        return [self.__decode_frame(frames, frame_offset) for frame_offset in range(0, len(frames), 9)]
+
+    def __decode_frame(self, frames, frame_offset):
+        """__decode_frame converts the 9 byte packet at frame_offset to a packet object
+
+        :return: the packet, None if it could not be decoded
+        """
+        byte_packet = frames[frame_offset:frame_offset+9]
+        # convert the byte packet to a packet object, unknown headers are counted and return None
+        entry = HEADER_TABLE[byte_packet[0]]
+        if entry is None:
+            count_unknown_header(byte_packet[0], byte_packet)
+            return None
+        try:
+            # with packet views only the header is checked, the rest is decoded on access, errors are always decoded to be logged
+            if self.__packet_views and entry[0] is not ErrorPacket:
+                return PacketView(frames, frame_offset)
+            elif self.__packet_pool is not None:
+                return self.__packet_pool.decode(byte_packet)
+            else:
+                return entry[0].from_bytearray(byte_packet)
+        except (KeyError, ValueError, struct.error) as error:
+            # a payload that does not fit its header, the stream is probably misaligned, other errors are bugs and are raised
+            logging.error("packet with header "+str(byte_packet[0])+" could not be decoded: "+str(error)+", bytes = "+bytes(byte_packet).hex())
+            return None
+
+    def _read_pending(self, connection):
+        """_read_pending reads everything that is availible, hands the received packets to the subscriptions and places them in the read buffer,
+        or hands them to the interfaces with route_in_io_thread, called by the reader thread when the connection is readable, or by the reactor thread of a uC_cluster
+        """
+        # the received packets are placed in the read buffer all at once
+        read_packets = []
+        for read_packet in self.__read_packets(connection):
+            if read_packet is None:
+                # packet was malformed, force alignment sequence
+                logging.error("packet is malformed, maybe misaligned, trying to recover by realigning")
+                self.__link_state.request_realign()
+                self.__notifier.notify()
+                continue
+            # packet is complete and valid
+            logging.debug("read: %s", read_packet)
+            # catch the special case of the uC reporting free input queue spots
+            if read_packet.header() is Data32bitHeader.OUT_FREE_INSTRUCTION_SPOTS:
+                # save the free input queue spots in the API, and wake up the writer if it waits for them
+                self.__link_state.report_free_spots(read_packet.value(), read_packet.time(), self.__write_buffer_timed.qsize())
+                self.__notifier.notify()
+            # late answers to the alignments that were send again while connecting
+            elif read_packet.header() is ErrorHeader.OUT_ALIGN_SUCCESS_VERSION and self.__unanswered_alignments > 0:
+                self.__unanswered_alignments -= 1
+                logging.debug("late answer to an alignment while connecting")
+            # catch the special case of the uC reporting an malformed packet from the API
+            elif read_packet.header() is ErrorHeader.OUT_ERROR_UNKNOWN_INSTRUCTION or read_packet.header() is ErrorHeader.OUT_ERROR_UNKNOWN_CONFIGURATION:
+                logging.error("uC is reporting that it cant understand a send packet, either API and firmware are a different version or communication is not aligned, trying to recover by realigning")
+                self.__link_state.request_realign()
+                self.__notifier.notify()
+            # keep track of the experiment state, so we know when to issue a warning for execution time squew
+            elif read_packet.header() == Data32bitHeader.IN_SET_TIME:
+                self.__link_state.set_experiment_running(read_packet.value(), read_packet.time())
+                logging.info("Experiment state changed to: "+str(read_packet.value()))
+                read_packets.append(read_packet)
+            # normal packet, send to the read buffer for further processing by the main thread
+            else:
+                read_packets.append(read_packet)
+        if read_packets:
+            # the callbacks get the values before the packets can be recycled by the packet pool
+            if self.__subscriptions:
+                self.__subscriptions.deliver(read_packets)
+            if self.__route_in_io_thread:
+                self.__process_read_packets(read_packets)
+            else:
+                self.__read_buffer.put_many(read_packets)
@@ -0,0 +1,535 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import logging
+import struct
+from collections import deque
+import serial
+from .header import *
+from .packet import *
+from .framing import FrameDecoder
+from .scheduler import TimedScheduler
+from .link import LinkState
+from .statistics import BatchHistogram
+from .uC import check_firmware_version
+from .transport import open_transport
+
+"""
+asyncio client for the uC, without background threads.
+
+the serial file descriptor is registered with the running asyncio event loop,
+received packets are routed to per interface event streams and send packets are
+written directly from the event loop (timed packets as soon as the uC has free spots).
+needs a serial connection with a file descriptor (linux, mac).
+"""
+
+"""
+maximum time in seconds to wait for the uC to align
+"""
+ALIGN_TIMEOUT = 10.0
+
+"""
+time in seconds after which the free spots are requested again if the uC reported none
+"""
+SPOTS_REQUEST_INTERVAL = 0.2
+
+"""
+number of bytes the serial connection did not take yet, above which send() waits
+"""
+MAX_OUTPUT_BYTES = 2**20
+
+
+class EventStream:
+    """ events received for one interface, iterate over them with
+
+        async for value, time in uc.async_from_chip[0].events():
+
+    the events are buffered until they are consumed, one consumer per stream
+    """
+    __slots__ = ("_name", "_events", "_waiter", "_closed")
+
+    def __init__(self, name):
+        self._name = name
+        self._events = deque()
+        self._waiter = None
+        self._closed = False
+
+    def push(self, event):
+        """ adds an event to the stream and wakes up the consumer, called by AsyncUC
+        """
+        self._events.append(event)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def close(self):
+        """ ends the iteration after all buffered events are consumed, called by AsyncUC
+        """
+        self._closed = True
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def events(self):
+        """ async iterator over the events, it ends when the connection is closed
+
+        @return: (async iterator) (value, time) tuples for interfaces, packet objects for the packet and error streams
+        """
+        while True:
+            while self._events:
+                yield self._events.popleft()
+            if self._closed:
+                return
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+            self._waiter = None
+
+    def __aiter__(self):
+        return self.events()
+
+    async def get(self):
+        """ waits for the next event
+
+        @return: the next event, None if the connection is closed and all events are consumed
+        """
+        while not self._events:
+            if self._closed:
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._events.popleft()
+
+    def name(self):
+        """ getter method for the name of the stream
+        """
+        return self._name
+
+    def pending(self):
+        """ getter method for the number of buffered events
+        """
+        return len(self._events)
+
+    def __str__(self):
+        return "[EventStream]: "+self._name+", pending events = "+str(len(self._events))+", closed = "+str(self._closed)
+
+
+class AsyncUC:
+    """
+    the class AsyncUC is the asyncio counterpart of uC_api, all I/O runs on the asyncio event loop
+
+        async with AsyncUC("/dev/ttyACM0") as uc:
+            await uc.configure(ConfigPacket(ConfigMainHeader.IN_CONF_ASYNC_FROM_CHIP0, ConfigSubHeader.CONF_ACTIVE, 0))
+            await uc.start_experiment()
+            async for word, time in uc.async_from_chip[0].events():
+                ...
+
+    received data packets are routed to the event streams async_from_chip, async_to_chip (the uC confirms
+    each send word), spi and pin, all other packets go to the packets stream and errors to the errors stream.
+    """
+    def __init__(self, serial_port_path, max_write_batch=1024, max_waiting_timed=65536, credit_prediction=True):
+        """__init__ creates the client, the connection is opened with connect() or async with
+
+        :param serial_port_path: the path of your system to the serial port, eg. on linux it might be /dev/ttyAMC0 or higher, on mac /dev/tty.usbmodem<XXXXX>,
+        or an URL of another transport with a file descriptor (raw://, pty://, tcp://, unix://) or a transport object, see transport.open_transport
+        :type serial_port_path: string or transport
+        :param max_write_batch: maximum number of packets that are coalesced into one serial write, defaults to 1024
+        :type max_write_batch: int, optional
+        :param max_waiting_timed: number of timed packets waiting for free spots on the uC, above which send() waits, defaults to 65536
+        :type max_waiting_timed: int, optional
+        :param credit_prediction: if True the free instruction spots on the uC are predicted from the execution times of the send timed packets, instead of requesting them from the uC, defaults to True
+        :type credit_prediction: bool, optional
+        """
+        self._serial_port_path = serial_port_path
+        self._max_write_batch = max_write_batch
+        self._max_waiting_timed = max_waiting_timed
+        self._loop = None
+        self._connection = None
+        self._file_descriptor = None
+        self._aligned = None
+        self._frame_decoder = FrameDecoder()
+        self._link_state = LinkState(credit_prediction)
+        # wakes up _flush_timed when the next spot on the uC is predicted to free up
+        self._prediction_timer = None
+        # encoded timed packets waiting for free spots on the uC, released in time order
+        self._timed = TimedScheduler()
+        self._waiting_timed = 0
+        self._last_timed_packet = 0
+        # bytes the serial connection did not take yet
+        self._output = bytearray()
+        self._drain_waiters = []
+        # pending configuration acknowledgements (header, config sub header) -> futures
+        self._acks = {}
+        self.packet_cache = PacketTemplateCache()
+        self.instant_write_batches = BatchHistogram()
+        self.timed_write_batches = BatchHistogram()
+        # the event streams of the interfaces
+        self.async_to_chip = [EventStream("async_to_chip"+str(async_id)) for async_id in range(8)]
+        self.async_from_chip = [EventStream("async_from_chip"+str(async_id)) for async_id in range(8)]
+        self.spi = [EventStream("spi"+str(spi_id)) for spi_id in range(3)]
+        self.pin = [EventStream("pin"+str(pin_id)) for pin_id in range(55)]
+        self.packets = EventStream("packets")
+        self.errors = EventStream("errors")
+        # the data packets are routed by header without creating packet objects
+        self._data32bit_routes = {}
+        for async_id in range(8):
+            self._data32bit_routes[int(Data32bitHeader.IN_ASYNC_TO_CHIP0)+async_id] = self.async_to_chip[async_id]
+            self._data32bit_routes[int(Data32bitHeader.OUT_ASYNC_FROM_CHIP0)+async_id] = self.async_from_chip[async_id]
+        for spi_id in range(3):
+            self._data32bit_routes[int(Data32bitHeader.OUT_SPI0)+spi_id] = self.spi[spi_id]
+
+    async def connect(self, timeout=ALIGN_TIMEOUT):
+        """connect opens the serial connection, registers it with the event loop and aligns the communication
+
+        :param timeout: maximum time in seconds to wait for the uC, defaults to 10
+        :type timeout: float, optional
+        :return: True if the uC responded, False if not
+        :rtype: bool
+        """
+        self._loop = asyncio.get_running_loop()
+        self._connection = open_transport(self._serial_port_path)
+        try:
+            self._file_descriptor = self._connection.fileno()
+        except (AttributeError, OSError):
+            logging.error("AsyncUC needs a serial connection with a file descriptor (linux, mac), use uC_api instead")
+            self._connection.close()
+            self._connection = None
+            return False
+        self._aligned = self._loop.create_future()
+        self._loop.add_reader(self._file_descriptor, self._on_readable)
+        logging.info("send: opening connection - aligning commuication")
+        self._write(ALIGN_BYTEARRAY)
+        try:
+            await asyncio.wait_for(asyncio.shield(self._aligned), timeout)
+        except asyncio.TimeoutError:
+            logging.error("uC is not responding for "+str(timeout)+" sec, wrong port?, no permission?")
+            self._disconnect()
+            return False
+        return True
+
+    async def close(self):
+        """close resets the uC, waits until everything is written and closes the connection
+        """
+        if self._connection is None:
+            return
+        if self._waiting_timed > 0:
+            logging.warning(str(self._waiting_timed)+" timed packets were not send before the connection was closed")
+        self._write(Data32bitPacket(Data32bitHeader.IN_RESET).to_bytearray())
+        try:
+            await asyncio.wait_for(self._wait_for_output(), 1.0)
+        except asyncio.TimeoutError:
+            logging.error("the uC did not take all packets before the connection was closed")
+        self._disconnect()
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise ConnectionError("uC is not responding on "+str(self._serial_port_path))
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def send(self, packet_to_send):
+        """send sends a packet to the uC, instant packets are written immediately,
+        timed packets as soon as the uC has free spots in its instruction buffer
+
+        waits only if too many bytes or timed packets are waiting (backpressure)
+
+        :param packet_to_send: the package to be send
+        :type packet_to_send: Packet, or any subclass
+        """
+        # reset the time reference for the timed instructions
+        if packet_to_send.header() == Data32bitHeader.IN_SET_TIME:
+            self._last_timed_packet = packet_to_send.value()
+        self._queue(packet_to_send.to_bytearray(), packet_to_send.time() != 0)
+        self._restart_clock(packet_to_send)
+        await self._drain()
+
+    async def send_many(self, packets_to_send, timed=True):
+        """send_many sends many packets, either packet objects or an already encoded buffer (see batch.encode_many)
+
+        :param packets_to_send: the packets, or the encoded packets N*9 bytes
+        :type packets_to_send: iterable of Packet, or bytes, bytearray or memoryview
+        :param timed: only for encoded buffers: if the packets are timed and sorted in time, defaults to True
+        :type timed: bool, optional
+        """
+        if isinstance(packets_to_send, (bytes, bytearray, memoryview)):
+            if len(packets_to_send) % 9 != 0 or len(packets_to_send) == 0:
+                logging.error("encoded buffer of "+str(len(packets_to_send))+" bytes does not contain complete packets, nothing is send")
+                return
+            self._queue(bytes(packets_to_send), timed)
+        else:
+            for packet_to_send in packets_to_send:
+                if packet_to_send.header() == Data32bitHeader.IN_SET_TIME:
+                    self._last_timed_packet = packet_to_send.value()
+                self._queue(packet_to_send.to_bytearray(), packet_to_send.time() != 0)
+                self._restart_clock(packet_to_send)
+        await self._drain()
+
+    async def send_cached(self, packet_class, header, *fields, time=0):
+        """send_cached sends a packet encoded with the packet template cache, see uC_api.send_cached
+        """
+        byte_array = self.packet_cache.encode(packet_class, header, *fields, time=time)
+        if byte_array is not None:
+            self._queue(byte_array, time != 0)
+            await self._drain()
+
+    async def configure(self, packet_to_send, timeout=None):
+        """configure sends a configuration packet and waits until the uC acknowledges it
+
+        :param packet_to_send: the configuration packet
+        :type packet_to_send: ConfigPacket
+        :param timeout: maximum time in seconds to wait for the acknowledgement, timed configurations are acknowledged when they are executed, defaults to None (no limit)
+        :type timeout: float, optional
+        :raises asyncio.TimeoutError: if the uC did not acknowledge in time
+        :raises RuntimeError: if the uC reported an error for the configuration
+        :return: the acknowledgement send by the uC
+        :rtype: ConfigPacket
+        """
+        key = (int(packet_to_send.header()), int(packet_to_send.config_header()))
+        ack = self._loop.create_future()
+        self._acks.setdefault(key, deque()).append(ack)
+        await self.send(packet_to_send)
+        try:
+            return await asyncio.wait_for(ack, timeout)
+        finally:
+            # remove the acknowledgement if it timed out
+            acks = self._acks.get(key)
+            if acks and ack in acks:
+                acks.remove(ack)
+
+    async def start_experiment(self):
+        """start_experiment resets the uC clock, enables that data is collected and that timed instructions are executed, see uC_api.start_experiment
+        """
+        await self.send(Data32bitPacket(header=Data32bitHeader.IN_SET_TIME, value=1))
+
+    async def stop_experiment(self, time = 0):
+        """stop_experiment stops recording and flushes all not jet excecuted timed instructions, see uC_api.stop_experiment
+        """
+        await self.send(Data32bitPacket(header=Data32bitHeader.IN_SET_TIME, value=0, time=time))
+
+    def link_state(self):
+        """link_state getter method for the credit state of the connection, see uC_api.link_state
+        """
+        return self._link_state
+
+    def _queue(self, byte_buffer, timed):
+        """ writes instant packets, queues timed packets for the free spots of the uC
+        """
+        if not timed:
+            self._write(byte_buffer)
+            self.instant_write_batches.record(len(byte_buffer)//9)
+            return
+        self._last_timed_packet = struct.unpack_from("<I", byte_buffer, len(byte_buffer)-8)[0]
+        # the timed buffers are merged in time order, see scheduler.TimedScheduler
+        self._timed.push(memoryview(byte_buffer))
+        self._waiting_timed += len(byte_buffer)//9
+        self._flush_timed()
+
+    def _restart_clock(self, packet_to_send):
+        """ an instant IN_SET_TIME or reset restarts the uC clock, the timed packets send from now on are not compared with the ones before
+        """
+        if packet_to_send.time() == 0 and (packet_to_send.header() == Data32bitHeader.IN_SET_TIME or packet_to_send.header() == Data32bitHeader.IN_RESET):
+            self._timed.restart_clock()
+
+    def _flush_timed(self):
+        """ writes as many timed packets as the uC has free spots, requests the free spots if there are none
+        """
+        while self._timed:
+            free_spots = self._link_state.free_spots()
+            if free_spots <= 0:
+                self._request_spots()
+                self._schedule_prediction()
+                break
+            write_batch, number_of_packets = self._timed.pop(min(free_spots, self._max_write_batch))
+            self._waiting_timed -= number_of_packets
+            write_bytes = b"".join(write_batch)
+            self._write(write_bytes)
+            self._link_state.spots_sent(write_bytes)
+            self.timed_write_batches.record(number_of_packets)
+        # the senders resume as soon as the timed packets are back at the limit, so they refill the scheduler while it is still
+        # draining, instead of waiting until it is empty
+        if self._waiting_timed <= self._max_waiting_timed:
+            self._wake_drain_waiters()
+
+    def _schedule_prediction(self):
+        """ flushes the timed packets again when the next spot on the uC is predicted to free up
+        """
+        next_free_in = self._link_state.next_free_in()
+        if next_free_in is not None and self._prediction_timer is None:
+            self._prediction_timer = self._loop.call_later(next_free_in, self._on_prediction)
+
+    def _on_prediction(self):
+        """ called when the next spot on the uC is predicted to free up
+        """
+        self._prediction_timer = None
+        if self._connection is not None:
+            self._flush_timed()
+
+    def _request_spots(self):
+        """ requests the free spots from the uC, if there is no request pending
+        """
+        if self._connection is not None and self._timed and self._link_state.request_spots():
+            self._write(Data32bitPacket(Data32bitHeader.IN_FREE_INSTRUCTION_SPOTS).to_bytearray())
+
+    def _write(self, byte_buffer):
+        """ writes to the serial connection, what the connection does not take is written when it becomes writable
+        """
+        if self._output:
+            self._output += byte_buffer
+            return
+        number_of_bytes = self._connection.write(byte_buffer)
+        if number_of_bytes is not None and number_of_bytes < len(byte_buffer):
+            self._output += memoryview(byte_buffer)[number_of_bytes:]
+            self._loop.add_writer(self._file_descriptor, self._on_writable)
+
+    def _on_writable(self):
+        """ event loop callback, writes the rest of the output
+        """
+        was_over = len(self._output) > MAX_OUTPUT_BYTES
+        del self._output[:self._connection.write(self._output)]
+        if not self._output:
+            self._loop.remove_writer(self._file_descriptor)
+            self._wake_drain_waiters()
+        elif was_over and len(self._output) <= MAX_OUTPUT_BYTES:
+            # the senders in _drain resume at the limit, _wait_for_output waits on until the output is empty
+            self._wake_drain_waiters()
+
+    async def _drain(self):
+        """ waits while too many bytes or timed packets are waiting
+        """
+        while self._connection is not None and (len(self._output) > MAX_OUTPUT_BYTES or self._waiting_timed > self._max_waiting_timed):
+            waiter = self._loop.create_future()
+            self._drain_waiters.append(waiter)
+            await waiter
+
+    async def _wait_for_output(self):
+        """ waits until the serial connection took all bytes
+        """
+        while self._connection is not None and self._output:
+            waiter = self._loop.create_future()
+            self._drain_waiters.append(waiter)
+            await waiter
+
+    def _wake_drain_waiters(self):
+        """ wakes up all senders waiting in _drain, they check their condition again
+        """
+        drain_waiters = self._drain_waiters
+        self._drain_waiters = []
+        for waiter in drain_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _on_readable(self):
+        """ event loop callback, reads everything availible and routes the packets
+        """
+        try:
+            frames = self._frame_decoder.read_from(self._connection)
+        except (OSError, serial.SerialException) as error:
+            logging.error("reading from the uC failed: "+str(error))
+            self._disconnect()
+            return
+        for frame_offset in range(0, len(frames), 9):
+            self._route(frames, frame_offset)
+
+    def _route(self, frames, frame_offset):
+        """ routes one received packet to its event stream
+        """
+        # the data packets of the interfaces are the bulk of the traffic, they are routed without packet objects
+        event_stream = self._data32bit_routes.get(frames[frame_offset])
+        if event_stream is not None:
+            unpacked = DATA32BIT_STRUCT.unpack_from(frames, frame_offset)
+            event_stream.push((unpacked[2], unpacked[1]))
+            return
+        read_packet = Packet.from_bytearray(frames[frame_offset:frame_offset+9])
+        if read_packet is None:
+            if self._aligned.done():
+                # packet was malformed, force alignment sequence
+                logging.error("packet is malformed, maybe misaligned, trying to recover by realigning")
+                self._write(ALIGN_BYTEARRAY)
+            return
+        header = read_packet.header()
+        # catch the special case of the uC reporting free input queue spots
+        if header is Data32bitHeader.OUT_FREE_INSTRUCTION_SPOTS:
+            self._link_state.report_free_spots(read_packet.value(), read_packet.time(), self._waiting_timed)
+            if read_packet.value() == 0 and self._timed:
+                self._loop.call_later(SPOTS_REQUEST_INTERVAL, self._request_spots)
+            self._flush_timed()
+        elif isinstance(read_packet, ErrorPacket):
+            if header is ErrorHeader.OUT_ALIGN_SUCCESS_VERSION:
+                check_firmware_version(read_packet)
+                if not self._aligned.done():
+                    self._aligned.set_result(True)
+                return
+            if header is ErrorHeader.OUT_ERROR_UNKNOWN_INSTRUCTION or header is ErrorHeader.OUT_ERROR_UNKNOWN_CONFIGURATION:
+                logging.error("uC is reporting that it cant understand a send packet, either API and firmware are a different version or communication is not aligned, trying to recover by realigning")
+                self._write(ALIGN_BYTEARRAY)
+            # fail the configuration that caused the error
+            acks = self._acks.get((read_packet.original_header(), read_packet.original_sub_header()))
+            if acks:
+                ack = acks.popleft()
+                if not ack.done():
+                    ack.set_exception(RuntimeError("uC reported an error for the configuration: "+str(read_packet)))
+            self.errors.push(read_packet)
+        elif isinstance(read_packet, ConfigPacket):
+            acks = self._acks.get((int(header), int(read_packet.config_header())))
+            if acks:
+                ack = acks.popleft()
+                if not ack.done():
+                    ack.set_result(read_packet)
+            else:
+                self.packets.push(read_packet)
+        elif header is PinHeader.OUT_PIN_LOW or header is PinHeader.OUT_PIN_HIGH:
+            self.pin[read_packet.pin_id()].push((read_packet.value(), read_packet.time()))
+        else:
+            # keep track of the experiment state, so we know when to issue a warning for execution time squew
+            if header is Data32bitHeader.IN_SET_TIME:
+                self._link_state.set_experiment_running(read_packet.value(), read_packet.time())
+                logging.info("Experiment state changed to: "+str(read_packet.value()))
+            self.packets.push(read_packet)
+
+    def _disconnect(self):
+        """ removes the connection from the event loop, closes it and ends all event streams
+        """
+        if self._connection is None:
+            return
+        self._loop.remove_reader(self._file_descriptor)
+        self._loop.remove_writer(self._file_descriptor)
+        self._connection.close()
+        self._connection = None
+        if self._prediction_timer is not None:
+            self._prediction_timer.cancel()
+            self._prediction_timer = None
+        self._link_state.close()
+        self._wake_drain_waiters()
+        for acks in self._acks.values():
+            for ack in acks:
+                ack.cancel()
+        self._acks.clear()
+        for event_stream in self.async_to_chip + self.async_from_chip + self.spi + self.pin + [self.packets, self.errors]:
+            event_stream.close()
+
+    def __str__(self):
+        return "AsyncUC" + \
+            "\nport: " + str(self._serial_port_path) + \
+            "\nconnected: " + str(self._connection is not None) + \
+            "\n" + str(self._link_state) + \
+            "\ntimed packets waiting: " + str(self._waiting_timed) + \
+            "\n" + str(self._timed) + \
+            "\ninstant writes: " + str(self.instant_write_batches) + \
+            "\ntimed writes: " + str(self.timed_write_batches) + "\n"
@@ -0,0 +1,247 @@
+#    This file is part of the Firmware project to interface with small Async or Neuromorphic chips
+#    Copyright (C) 2024 Ole Richter - University of Groningen
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import selectors
+import threading
+import serial
+from time import monotonic
+from .uC import uC_api, IDLE_WAIT_TIMEOUT
+from .notifier import Notifier, FALLBACK_POLL_INTERVAL
+
+
+class uC_cluster:
+    """
+    the class uC_cluster manages several uC boards, e.g. each driving a different chip, from one I/O thread (reactor)
+
+        cluster = uC_cluster(["/dev/ttyACM0", "/dev/ttyACM1"])
+        cluster[0].pin[13].activate("OUTPUT")
+        cluster.start_experiment()
+        ...
+        cluster.stop_experiment()
+        cluster.update_state()
+        cluster.close_connection()
+
+    every board is a uC_api object (cluster[i] or cluster.boards), with the same interfaces and functions,
+    but instead of two communication threads per board, one thread waits in a selector on all serial connections:
+    it reads from every readable board and writes the waiting packets of every board.
+    """
+    def __init__(self, serial_port_paths, **kwargs):
+        """__init__ creates a uC_api object for every serial port and starts the I/O thread, which opens the connections and aligns them one after the other
+
+        :param serial_port_paths: the paths of the serial ports of the boards, see uC_api
+        :type serial_port_paths: list of string
+        :param kwargs: the arguments for every uC_api object, e.g. api_level, high_water_mark or credit_prediction
+        """
+        # wakes up the I/O thread when a packet is placed in the write buffer of any board
+        self.__notifier = Notifier()
+        self.__lock = threading.Lock()
+        # held by the I/O thread while it writes, so packets placed under it are written in one pass over the boards
+        self.__write_lock = threading.Lock()
+        # boards that still need to be opened by the I/O thread: (board, serial port path)
+        self.__pending = []
+        self.boards = [uC_api(serial_port_path, reactor=self, **kwargs) for serial_port_path in serial_port_paths]
+        # (time, packets send, packets received) per board at the last throughput() call
+        self.__last_counts = [(monotonic(), 0, 0) for board in self.boards]
+        self.__reactor_thread = threading.Thread(target=self.__reactor_function)
+        self.__reactor_thread.start()
+
+    def notifier(self):
+        """notifier getter method for the notifier of the I/O thread, shared by all boards
+
+        :return: the notifier
+        :rtype: notifier.Notifier
+        """
+        return self.__notifier
+
+    def register(self, board, serial_port_path):
+        """register called by uC_api, the I/O thread opens the connection of the board and serves it from then on
+
+        :param board: the board
+        :type board: uC_api
+        :param serial_port_path: the path of the serial port of the board
+        :type serial_port_path: string
+        """
+        with self.__lock:
+            self.__pending.append((board, serial_port_path))
+        self.__notifier.notify()
+
+    def is_alive(self):
+        """is_alive checks if the I/O thread still serves the boards
+
+        :return: True until the connections of all boards are closed
+        :rtype: bool
+        """
+        return self.__reactor_thread.is_alive()
+
+    def start_experiment(self):
+        """start_experiment starts the experiment on all boards, the start packets are written in one pass over the boards,
+        see uC_api.start_experiment
+        """
+        # the instant write buffers need space, the I/O thread can not drain them while the packets are placed
+        for board in self.boards:
+            board.instant_water_marks.wait()
+        with self.__write_lock:
+            for board in self.boards:
+                board.start_experiment()
+
+    def stop_experiment(self, time = 0):
+        """stop_experiment stops the experiment on all boards, instant stops are written in one pass over the boards,
+        see uC_api.stop_experiment
+
+        :param time: the time in us after start_experiment when the experiments should be stopped, defaults to 0 (execute instantly)
+        :type time: int, optional
+        """
+        for board in self.boards:
+            board.instant_water_marks.wait()
+            if time != 0:
+                board.timed_water_marks.wait()
+        with self.__write_lock:
+            for board in self.boards:
+                board.stop_experiment(time)
+
+    def update_state(self):
+        """update_state processes all availible messages of all boards, see uC_api.update_state
+
+        level 2 only
+        """
+        for board in self.boards:
+            board.update_state()
+
+    def throughput(self):
+        """throughput the packets per second send to and received from every board, since the last call or the creation of the cluster
+
+        :return: per board (packets send/s, packets received/s), and the aggregate over all boards
+        :rtype: ([(float, float)], (float, float))
+        """
+        per_board = []
+        now = monotonic()
+        for board_id, board in enumerate(self.boards):
+            send = board.instant_write_batches.total() + board.timed_write_batches.total()
+            received = board.frame_decoder().frames()
+            last_time, last_send, last_received = self.__last_counts[board_id]
+            duration = max(now - last_time, 1e-9)
+            per_board.append(((send - last_send) / duration, (received - last_received) / duration))
+            self.__last_counts[board_id] = (now, send, received)
+        return (per_board, (sum(rate[0] for rate in per_board), sum(rate[1] for rate in per_board)))
+
+    def close_connection(self):
+        """close_connection closes the connections of all boards and stops the I/O thread, blocks until this is done
+        """
+        for board in self.boards:
+            board.close_connection()
+        self.__reactor_thread.join()
+        self.__notifier.close()
+
+    def __reactor_function(self):
+        """__reactor_function internal function of the I/O thread, serving all boards until their connections are closed
+        """
+        selector = selectors.DefaultSelector()
+        selector.register(self.__notifier.fileno(), selectors.EVENT_READ, None)
+        # board -> [connection, file descriptor (None without select), time of the next write]
+        connections = {}
+
+        def close(board):
+            # the connection was closed by the API or was lost, the other boards are still served
+            entry = connections.pop(board)
+            if entry[1] is not None:
+                selector.unregister(entry[1])
+            board._close_connection(entry[0])
+
+        while True:
+            # open and align the connections of new boards
+            with self.__lock:
+                pending = self.__pending
+                self.__pending = []
+            for board, serial_port_path in pending:
+                connection = board._open_connection(serial_port_path)
+                if connection is None:
+                    continue
+                # the serial connection can only be waited on with select if it has a file descriptor (not on windows)
+                try:
+                    connection_file_descriptor = connection.fileno()
+                except (AttributeError, OSError):
+                    connection_file_descriptor = None
+                connections[board] = [connection, connection_file_descriptor, 0.0]
+                if connection_file_descriptor is not None:
+                    selector.register(connection_file_descriptor, selectors.EVENT_READ, board)
+            if not connections:
+                break
+            # write the waiting packets of every board that is due, and find the earliest next write
+            now = monotonic()
+            timeout = IDLE_WAIT_TIMEOUT
+            with self.__write_lock:
+                for board, entry in list(connections.items()):
+                    if entry[2] <= now:
+                        try:
+                            wait_time = board._write_pending(entry[0], entry[1])
+                        except (OSError, serial.SerialException) as error:
+                            board._connection_lost(error)
+                            wait_time = None
+                        if wait_time is None:
+                            close(board)
+                            continue
+                        entry[2] = now + wait_time
+                    timeout = min(timeout, entry[2] - now)
+            # deliver the incomplete batches of the subscriptions that reached their latency bound, and wake up for the next one
+            for board in connections:
+                due_in = board._flush_subscriptions()
+                if due_in is not None:
+                    timeout = min(timeout, due_in)
+            # boards without a file descriptor (windows) are polled
+            polled = [board for board, entry in connections.items() if entry[1] is None]
+            if polled:
+                timeout = min(timeout, FALLBACK_POLL_INTERVAL)
+            woken = False
+            for key, events in selector.select(max(timeout, 0.0)):
+                if key.data is None:
+                    self.__notifier.clear()
+                    woken = True
+                else:
+                    self.__read(key.data, connections[key.data])
+            for board in polled:
+                self.__read(board, connections[board], poll=True)
+            if woken:
+                # a packet was placed in a write buffer or free spots were reported, every board checks its buffers
+                for entry in connections.values():
+                    entry[2] = 0.0
+        selector.close()
+
+    def __read(self, board, entry, poll=False):
+        """__read internal function of the I/O thread, receives the waiting packets of one board,
+        a failing connection (e.g. an unplugged uC) is closed by the next write pass, without stopping the other boards
+        """
+        try:
+            if not poll or entry[0].in_waiting > 0:
+                board._read_pending(entry[0])
+        except (OSError, serial.SerialException) as error:
+            board._connection_lost(error)
+            entry[2] = 0.0
+
+    def __getitem__(self, board_id):
+        return self.boards[board_id]
+
+    def __len__(self):
+        return len(self.boards)
+
+    def __iter__(self):
+        return iter(self.boards)
+
+    def __str__(self):
+        return "uC_cluster" + \
+            "".join("\nboard " + str(board_id) + ": send packets = " + str(board.instant_write_batches.total() + board.timed_write_batches.total()) + \
+                    ", received packets = " + str(board.frame_decoder().frames()) + \
+                    "\n" + str(board.link_state()) + "\n" + str(board.frame_decoder()) for board_id, board in enumerate(self.boards)) + "\n"